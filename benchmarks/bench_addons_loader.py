@@ -0,0 +1,84 @@
+import yaml
+
+from benchmarks.utils import ENVIRONMENT
+from managedtenants.core.addons_loader import load_addons
+from managedtenants.core.addons_loader.addon import Addon, UniqueYAMLKeyLoader
+from managedtenants.core.addons_loader.sss import Sss
+
+ROUNDS = 3
+
+
+def bare_addons(addons_dir):
+    """
+    Addons that skipped their constructor, so that each loading phase can be
+    benchmarked on its own.
+    """
+    res = []
+    for path in sorted(addons_dir.iterdir()):
+        addon = Addon.__new__(Addon)
+        addon.path = path
+        addon.collect_errors = False
+        addon.extra_resources_loader = None
+        addon.imageset_version = "latest"
+        addon.imagesets_path = path / "addonimagesets" / ENVIRONMENT
+        res.append(addon)
+    return res
+
+
+def read_metadata_files(addons_dir):
+    res = []
+    for path in sorted(addons_dir.glob(f"*/metadata/{ENVIRONMENT}/addon.yaml")):
+        with open(path, encoding="utf-8") as f:
+            res.append(f.read())
+    return res
+
+
+def test_yaml(benchmark, addons_dir):
+    contents = read_metadata_files(addons_dir)
+
+    def load_all():
+        return [yaml.load(c, Loader=UniqueYAMLKeyLoader) for c in contents]
+
+    benchmark.pedantic(load_all, rounds=ROUNDS)
+
+
+def test_schema(benchmark, addons_dir):
+    contents = read_metadata_files(addons_dir)
+    pairs = list(
+        zip(
+            bare_addons(addons_dir),
+            [yaml.load(c, Loader=UniqueYAMLKeyLoader) for c in contents],
+        )
+    )
+
+    def validate_all():
+        for addon, metadata in pairs:
+            addon._validate_schema_instance(metadata, "metadata")
+
+    benchmark.pedantic(validate_all, rounds=ROUNDS)
+
+
+def test_imageset(benchmark, addons_dir):
+    addons = bare_addons(addons_dir)
+
+    def load_all():
+        return [addon.load_imageset("latest") for addon in addons]
+
+    benchmark.pedantic(load_all, rounds=ROUNDS)
+
+
+def test_sss_render(benchmark, addons_dir, cli_args):
+    addons = load_addons(addons_dir, ENVIRONMENT, None, cli_args)
+
+    def render_all():
+        return [Sss(addon=addon) for addon in addons]
+
+    benchmark.pedantic(render_all, rounds=ROUNDS)
+
+
+def test_load_addons(benchmark, addons_dir, cli_args):
+    benchmark.pedantic(
+        load_addons,
+        args=(addons_dir, ENVIRONMENT, None, cli_args),
+        rounds=ROUNDS,
+    )
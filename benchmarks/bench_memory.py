@@ -0,0 +1,55 @@
+import gc
+import tracemalloc
+
+from benchmarks.utils import ENVIRONMENT
+from managedtenants.core.addons_loader import iter_addons, load_addons
+
+ROUNDS = 1
+
+
+def trace(func):
+    """
+    Runs `func` under tracemalloc.
+
+    :return: (peak bytes, bytes still allocated once `func` returned and its
+        result is alive)
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak, retained
+
+
+def report(benchmark, addons_dir, func):
+    n_addons = len(list(addons_dir.iterdir()))
+    peak, retained = benchmark.pedantic(
+        trace, args=(func,), rounds=ROUNDS, iterations=1
+    )
+    benchmark.extra_info["peak_bytes_per_100_addons"] = peak * 100 // n_addons
+    benchmark.extra_info["retained_bytes_per_100_addons"] = (
+        retained * 100 // n_addons
+    )
+
+
+def test_memory_load_addons(benchmark, addons_dir, cli_args):
+    """Every addon is kept, as for `run` and `bundles`."""
+    report(
+        benchmark,
+        addons_dir,
+        lambda: load_addons(addons_dir, ENVIRONMENT, None, cli_args),
+    )
+
+
+def test_memory_iter_addons(benchmark, addons_dir, cli_args):
+    """Addons are dropped once loaded, as for a plain `load`."""
+
+    def consume():
+        for _ in iter_addons(addons_dir, ENVIRONMENT, None, cli_args):
+            pass
+
+    report(benchmark, addons_dir, consume)
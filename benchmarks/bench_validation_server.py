@@ -0,0 +1,71 @@
+import http.client
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+
+import pytest
+import yaml
+
+from benchmarks.utils import ENVIRONMENT
+from managedtenants.core.validation_server import make_server
+
+ROUNDS = 3
+REQUESTS = 500
+
+
+@pytest.fixture(scope="module")
+def server_address():
+    server = make_server(port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address[:2]
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(scope="module")
+def payloads(metadata_variants):
+    return [
+        yaml.dump(metadata, Dumper=yaml.CSafeDumper).encode("utf-8")
+        for metadata in metadata_variants
+    ]
+
+
+def _client(server_address, payloads):
+    """Sends `payloads` on a single keep-alive connection."""
+    conn = http.client.HTTPConnection(*server_address)
+    try:
+        for payload in payloads:
+            conn.request("POST", "/validate/metadata", body=payload)
+            resp = conn.getresponse()
+            resp.read()
+            assert resp.status == 200
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("clients", [1, 8], ids=lambda n: f"{n}-clients")
+def test_validate_metadata_throughput(
+    benchmark, server_address, payloads, clients
+):
+    """Validates REQUESTS addon.yaml payloads spread across `clients`."""
+    per_client = [
+        list(islice(cycle(payloads), REQUESTS // clients))
+        for _ in range(clients)
+    ]
+
+    def run():
+        with ThreadPoolExecutor(max_workers=clients) as executor:
+            for res in executor.map(
+                lambda p: _client(server_address, p), per_client
+            ):
+                assert res is None
+
+    benchmark.extra_info["environment"] = ENVIRONMENT
+    benchmark.extra_info["requests"] = REQUESTS
+    benchmark.pedantic(run, rounds=ROUNDS)
+    # no stats with --benchmark-disable
+    if not benchmark.disabled:
+        benchmark.extra_info["requests_per_second"] = round(
+            REQUESTS / benchmark.stats.stats.mean
+        )
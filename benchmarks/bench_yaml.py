@@ -0,0 +1,32 @@
+import pytest
+import yaml
+
+from managedtenants.core.addons_loader.addon import UniqueYAMLKeyLoader
+
+ROUNDS = 5
+
+# Number of env entries (small mappings) added to the metadata.
+ENTRIES = [100, 1000, 10000]
+
+
+@pytest.fixture(scope="module", params=ENTRIES, ids=lambda n: f"{n}-entries")
+def large_metadata(request, metadata_variants):
+    """addon.yaml content with a large config.env list."""
+    metadata = dict(metadata_variants[0])
+    metadata["config"] = {
+        "env": [
+            {"name": f"VAR_{i}", "value": f"value-{i}"}
+            for i in range(request.param)
+        ]
+    }
+    return yaml.dump(metadata, Dumper=yaml.CSafeDumper)
+
+
+@pytest.mark.parametrize(
+    "loader",
+    [yaml.CSafeLoader, UniqueYAMLKeyLoader],
+    ids=["CSafeLoader", "UniqueYAMLKeyLoader"],
+)
+def test_load_large_metadata(benchmark, large_metadata, loader):
+    """CSafeLoader is the baseline, it does not check for duplicate keys."""
+    benchmark.pedantic(yaml.load, args=(large_metadata, loader), rounds=ROUNDS)
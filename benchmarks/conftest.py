@@ -0,0 +1,29 @@
+# Benchmarks for the addons loading pipeline. They live in bench_*.py files so
+# that they are not collected with the test suite, run them with
+# `make benchmark`.
+import argparse
+from itertools import cycle, islice
+
+import pytest
+
+from benchmarks.utils import SIZES, VARIANTS, draw_metadata, write_addon
+
+
+@pytest.fixture(scope="session")
+def metadata_variants():
+    return draw_metadata(VARIANTS)
+
+
+@pytest.fixture(scope="session", params=SIZES, ids=lambda n: f"{n}-addons")
+def addons_dir(request, tmp_path_factory, metadata_variants):
+    """Synthetic addons directory containing `SIZES` addons."""
+    n = request.param
+    root = tmp_path_factory.mktemp(f"addons-{n}")
+    for i, metadata in enumerate(islice(cycle(metadata_variants), n)):
+        write_addon(root / f"addon-{i}", metadata)
+    return root
+
+
+@pytest.fixture(scope="session")
+def cli_args():
+    return argparse.Namespace(only_changed=False, dry_run=True)
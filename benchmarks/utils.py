@@ -0,0 +1,49 @@
+import os
+import warnings
+
+import yaml
+from hypothesis.errors import NonInteractiveExampleWarning
+
+from tests.testutils.strategies import addon
+
+ENVIRONMENT = "stage"
+
+# Number of addons in the synthetic addons directories.
+SIZES = [
+    int(size) for size in os.getenv("BENCHMARK_SIZES", "10,100,1000").split(",")
+]
+
+# Drawing examples from the hypothesis strategies is slow, so a fixed number
+# of distinct metadata files is drawn and then reused for the whole tree.
+VARIANTS = int(os.getenv("BENCHMARK_VARIANTS", "20"))
+
+
+def draw_metadata(n):
+    strategy = addon(ENVIRONMENT)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", NonInteractiveExampleWarning)
+        return [strategy.example().metadata for _ in range(n)]
+
+
+def write_addon(addon_dir, metadata):
+    """
+    Writes an addon that points to the latest of its imagesets, so that the
+    benchmarks cover the imageset selection as well.
+    """
+    metadata = {**metadata, "addonImageSetVersion": "latest"}
+    metadata_dir = addon_dir / "metadata" / ENVIRONMENT
+    metadata_dir.mkdir(parents=True)
+    with open(metadata_dir / "addon.yaml", "w", encoding="utf-8") as f:
+        yaml.dump(metadata, f, Dumper=yaml.CSafeDumper)
+
+    imagesets_dir = addon_dir / "addonimagesets" / ENVIRONMENT
+    imagesets_dir.mkdir(parents=True)
+    for version in ("1.0.0", "1.1.0", "1.2.0"):
+        imageset = {
+            "name": f"benchmark-addon.v{version}",
+            "indexImage": f"quay.io/osd-addons/benchmark-addon-index:{version}",
+            "relatedImages": [],
+        }
+        path = imagesets_dir / f"benchmark-addon.v{version}.yml"
+        with open(path, "w", encoding="utf-8") as f:
+            yaml.dump(imageset, f, Dumper=yaml.CSafeDumper)
@@ -12,7 +12,7 @@ from managedtenants.bundles.exceptions import AddonBundlesError
 from managedtenants.bundles.imageset import ImageSet
 from managedtenants.bundles.utils import get_subdirs
 from managedtenants.data.paths import SCHEMAS_DIR
-from managedtenants.utils.git import get_short_hash
+from managedtenants.utils.git import BuildContext
 from managedtenants.utils.schema import load_schema
 
 
@@ -45,14 +45,26 @@ class AddonBundles:
       - there can be an unlimited number of dependency operators
       - if the `--single-bundle-per-operator` flag is provided, there can only
         be a single-bundle-per-operator
+      - bundles found in `validation_cache` skip operator-sdk and mtcli
+        validation
     """
 
-    def __init__(self, root_dir, debug=False, single_bundle=False):
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        root_dir,
+        debug=False,
+        single_bundle=False,
+        build_context=None,
+        validation_cache=None,
+    ):
         self.log = get_text_logger(
             "managedtenants-addon-bundles",
             level=logging.DEBUG if debug else logging.INFO,
         )
+        self.build_context = build_context or BuildContext()
         self.single_bundle = single_bundle
+        self.validation_cache = validation_cache
         self.root_dir = Path(root_dir)
         self.addon_name = self.root_dir.name
         self.main_bundle = self._parse_main_bundle()
@@ -91,6 +103,7 @@ class AddonBundles:
                 operator_name=self._get_bundle_operator_name(operator_dir),
                 version=path.name,
                 single_bundle=self.single_bundle,
+                validation_cache=self.validation_cache,
             )
             res.append(bundle)
 
@@ -234,7 +247,8 @@ class AddonBundles:
         merge request title and branch name.
         """
         return (
-            f"{self.addon_name}-{self._get_latest_version()}-{get_short_hash()}"
+            f"{self.addon_name}-{self._get_latest_version()}-"
+            f"{self.build_context.short_hash}"
         )
 
     def __str__(self):
@@ -1,25 +1,186 @@
-from sretoolbox.binaries import Mtcli, OperatorSDK, Opm
+import fcntl
+import hashlib
+import platform
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+from sretoolbox.binaries import KubectlPackage, Mtcli, OperatorSDK, Opm
+from sretoolbox.utils.logger import get_text_logger
+
+from managedtenants.bundles.exceptions import BinaryError
+from managedtenants.utils.cache import cache_dir
+
+LOG = get_text_logger("managedtenants-binary-deps")
+
+
+def tools_dir():
+    """
+    Download directory shared by the binaries: bin/ in cache_dir(), with a
+    subdirectory per binary and version.
+    """
+    return cache_dir() / "bin"
 
 
 class LazyBin:
     """
     Abstraction around sretoolbox to avoid pulling binaries from the internet
     before they actually need to be ran.
+
+    A downloaded binary must match its published sha256, pinned in `sha256`
+    for the platform. Several processes can share the download directory: a
+    lock file serializes the downloads, and the checksum recorded after a
+    download is checked before the cached binary is used. A cached binary
+    that does not match is downloaded again.
+
+    :param download_path: (optional) Default: tools_dir().
+    :param sha256: (optional) {platform_key(): published hexdigest}.
     """
 
-    def __init__(self, bin_class, version, download_path):
+    def __init__(self, bin_class, version, download_path=None, sha256=None):
         self.bin_class = bin_class
         self.version = version
         self.download_path = download_path
+        self.sha256 = sha256 or {}
         self.instance = None
+        self._lock = threading.Lock()
+
+    @property
+    def binary(self):
+        """File name of the binary, e.g. opm-1.24.0."""
+        return self.bin_class.binary_template.format(version=self.version)
+
+    @property
+    def published_sha256(self):
+        """Pinned sha256 of the binary for this platform, None if unknown."""
+        return self.sha256.get(platform_key())
+
+    def fetch(self):
+        """
+        Downloads the binary unless it is already there. Thread safe.
+
+        :return: the sretoolbox Binary.
+        :raise BinaryError: the download does not match its published sha256.
+        """
+        with self._lock:
+            if self.instance is None:
+                self.instance = self._fetch(
+                    Path(self.download_path or tools_dir())
+                )
+        return self.instance
 
     def run(self, cmd):
-        if self.instance is None:
-            self.instance = self.bin_class(self.version, self.download_path)
+        self.fetch().run(*cmd)
+
+    def _fetch(self, download_path):
+        # one directory per version: some file names, e.g.
+        # kubectl-package_linux_amd64, do not carry it
+        download_path = (
+            download_path / f"{self.bin_class.__name__.lower()}-{self.version}"
+        )
+        download_path.mkdir(parents=True, exist_ok=True)
+        path = download_path / self.binary
+        checksum_path = download_path / f"{self.binary}.sha256"
+
+        with _file_lock(download_path / f".{self.binary}.lock"):
+            if path.is_file() and not self._verify_cached(path, checksum_path):
+                LOG.warning(f"{path} does not match its checksum, removing it.")
+                path.unlink()
+                checksum_path.unlink(missing_ok=True)
+
+            before = _file_id(path)
+            instance = self.bin_class(self.version, download_path)
+            if Path(instance.command).resolve() != path.resolve():
+                # found on the $PATH
+                return instance
+
+            if _file_id(path) != before:
+                # (re)downloaded, the recorded checksum is stale
+                checksum_path.unlink(missing_ok=True)
+                checksum_path.write_text(self._verify_download(path))
+            elif not checksum_path.is_file():
+                checksum_path.write_text(_sha256(path))
+        return instance
+
+    def _verify_cached(self, path, checksum_path):
+        expected = self.published_sha256
+        if expected is None and checksum_path.is_file():
+            expected = checksum_path.read_text().strip()
+        return expected is None or _sha256(path) == expected
+
+    def _verify_download(self, path):
+        """:return: the sha256 of the downloaded binary."""
+        digest = _sha256(path)
+        expected = self.published_sha256
+        if expected is None:
+            LOG.warning(
+                f"No published sha256 pinned for {self.binary} on"
+                f" {platform_key()}, cannot verify the download."
+            )
+        elif digest != expected:
+            path.unlink()
+            raise BinaryError(
+                f"downloaded {path} has sha256 {digest}, published sha256 is"
+                f" {expected}."
+            )
+        return digest
+
+    def __str__(self):
+        return self.binary
+
+
+def platform_key():
+    """Key of the running platform in LazyBin.sha256, e.g. linux-x86_64."""
+    return f"{platform.system().lower()}-{platform.machine()}"
+
+
+@contextmanager
+def _file_lock(path):
+    with open(path, "a", encoding="utf-8") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _file_id(path):
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def prefetch(binaries=None, max_workers=None):
+    """
+    Fetches the binaries concurrently, so that the pipeline steps using them
+    do not wait on downloads.
+
+    :param binaries: (optional) LazyBins to fetch. Default: BINARIES.
+    :return: {binary name: command path}
+    """
+    binaries = BINARIES if binaries is None else binaries
+    with ThreadPoolExecutor(max_workers=max_workers or len(binaries)) as ex:
+        commands = ex.map(lambda b: b.fetch().command, binaries)
+        return dict(zip(map(str, binaries), commands))
 
-        self.instance.run(*cmd)
 
+# Pass the published sha256 of each download as sha256={platform_key():
+# hexdigest}, taken from the release page, when pinning a version. Binaries
+# without one are downloaded with a warning that they are unverified.
+OPM = LazyBin(Opm, version="1.24.0")
+MTCLI = LazyBin(Mtcli, version="0.10.0")
+OPERATOR_SDK = LazyBin(OperatorSDK, version="1.21.0")
+KUBECTL_PACKAGE = LazyBin(KubectlPackage, version="1.9.0")
 
-OPM = LazyBin(Opm, version="1.24.0", download_path="/tmp")
-MTCLI = LazyBin(Mtcli, version="0.10.0", download_path="/tmp")
-OPERATOR_SDK = LazyBin(OperatorSDK, version="1.21.0", download_path="/tmp")
+BINARIES = [OPM, MTCLI, OPERATOR_SDK, KUBECTL_PACKAGE]
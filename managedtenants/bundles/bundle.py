@@ -5,8 +5,10 @@ import semver
 import yaml
 
 from managedtenants.bundles.binary_deps import MTCLI, OPERATOR_SDK
+from managedtenants.bundles.context_tar import tree_digest
 from managedtenants.bundles.csv import CSV
 from managedtenants.bundles.exceptions import BundleError, CSVError
+from managedtenants.utils.hash import hash_sha256
 
 
 class Bundle:
@@ -17,6 +19,8 @@ class Bundle:
     :param path: path to bundle (e.g.: reference-addon/main/0.1.0/)
     :param operator_name: name of the operator owning the bundle
     :param version: bundle's semver
+    :param validation_cache: (optional) ResultCache of the bundles that
+        passed operator-sdk and mtcli validation, by content and versions.
     :raise BundleError: if it is invalid.
     """
 
@@ -29,6 +33,7 @@ class Bundle:
         version,
         image=None,
         single_bundle=False,
+        validation_cache=None,
     ):
         self.addon_name = addon_name
         self.path = Path(path)
@@ -36,6 +41,7 @@ class Bundle:
         self.version = version
         self.image = image
         self.single_bundle = single_bundle
+        self.validation_cache = validation_cache
         self.annotations = self._parse_metadata_annotations()
         self.csv = self._parse_csv()
         self.validate()
@@ -75,8 +81,7 @@ class Bundle:
 
     def validate(self):
         self._validate_semver()
-        self._validate_operator_sdk()
-        self._validate_mtcli()
+        self._validate_with_tools()
 
         if self.single_bundle:
             self._validate_single_bundle_pattern()
@@ -93,6 +98,25 @@ class Bundle:
                 f"invalid csv 'spec.version' starts with 'v' for {self}"
             )
 
+    def _validate_with_tools(self):
+        if self.validation_cache is None:
+            self._validate_operator_sdk()
+            self._validate_mtcli()
+            return
+
+        key = hash_sha256(
+            (
+                tree_digest({"bundle": self.path}),
+                OPERATOR_SDK.version,
+                MTCLI.version,
+            )
+        )
+        if key in self.validation_cache:
+            return
+        self._validate_operator_sdk()
+        self._validate_mtcli()
+        self.validation_cache.add(key)
+
     def _validate_operator_sdk(self):
         cmd = ["bundle", "validate", str(self.path)]
         try:
@@ -5,7 +5,7 @@ from sretoolbox.container import Image
 from sretoolbox.utils.logger import get_text_logger
 
 from managedtenants.bundles.exceptions import BundleBuilderError, DockerError
-from managedtenants.utils.git import get_short_hash
+from managedtenants.utils.git import BuildContext
 
 
 class BundleBuilder:
@@ -15,27 +15,36 @@ class BundleBuilder:
     :param docker_api: DockerAPI object to be used to build and push.
     :param dry_run: If True, skips pushing images.
     :param debug: Enable debug logging.
+    :param build_context: BuildContext shared by the bundles pipeline.
     """
 
+    # pylint: disable=too-many-arguments
     def __init__(
         self,
         docker_api,
         dry_run=False,
         debug=False,
         ssl_verify=True,
+        build_context=None,
     ):
         self.dry_run = dry_run
         self.docker_api = docker_api
         self.ssl_verify = ssl_verify
+        self.build_context = build_context or BuildContext()
         self.log = get_text_logger(
             "managedtenants-bundle-builder",
             level=logging.DEBUG if debug else logging.INFO,
         )
 
-    def build_and_push_all(self, bundles, hash_string=get_short_hash()):
+    def build_and_push_all(self, bundles, hash_string=None):
         """
         Builds all the bundles. Also sets the bundle.image field.
+
+        :param hash_string: Image tag suffix. Default: the commit hash of the
+            build context.
         """
+        if hash_string is None:
+            hash_string = self.build_context.short_hash
         self._build_all(bundles, hash_string)
         self._push_all(bundles)
 
@@ -7,12 +7,15 @@ from sretoolbox.utils.logger import get_text_logger
 from managedtenants.bundles.addon_bundles import AddonBundles
 from managedtenants.bundles.addon_package import AddonPackage
 from managedtenants.bundles.bundle_builder import BundleBuilder
-from managedtenants.bundles.docker_api import ContainerRuntime
+from managedtenants.bundles.docker_api import ContainerRuntime, OciAPI
 from managedtenants.bundles.exceptions import MtbundlesCLIError
 from managedtenants.bundles.imageset_creator import ImageSetCreator
 from managedtenants.bundles.index_builder import IndexBuilder
 from managedtenants.bundles.package_builder import PackageBuilder
-from managedtenants.utils.git import ChangeDetector
+from managedtenants.bundles.registry import LocalDockerRegistry
+from managedtenants.utils.cache import ResultCache, cache_dir
+from managedtenants.utils.git import BuildContext, ChangeDetector
+from managedtenants.utils.profiling import ADDON_FRAME_PREFIX, phase
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -25,49 +28,119 @@ class MtbundlesCLI:
             "mtbundles",
             level=logging.DEBUG if args.debug else logging.INFO,
         )
+        if args.mirror and not args.daemonless:
+            raise MtbundlesCLIError("--mirror requires --daemonless.")
+        if args.local_registry and (args.mirror or args.enable_gitlab):
+            raise MtbundlesCLIError(
+                "--local-registry cannot be used with --mirror or"
+                " --enable-gitlab."
+            )
+        # Offline mode: every image is pushed to a throwaway local registry
+        # instead of quay.io, so that opm can build a valid index.
+        self.local_registry = (
+            LocalDockerRegistry(debug=args.debug)
+            if args.local_registry
+            else None
+        )
+        if self.local_registry is not None:
+            self.registry = f"{self.local_registry.registry}/{args.quay_org}"
+            self.dry_run = False
+        else:
+            self.registry = f"quay.io/{args.quay_org}"
+            self.dry_run = args.dry_run
+        self.build_context = BuildContext()
+        self.bundle_validation_cache = ResultCache(
+            cache_dir() / "bundle-validation",
+            enabled=not args.no_validation_cache,
+        )
+        self.package_validation_cache = ResultCache(
+            cache_dir() / "package-validation",
+            enabled=not args.no_validation_cache,
+        )
         self.docker_api = self._init_docker_api()
+        # bundle and package images do not need a daemon, index images do
+        self.image_api = (
+            self._init_oci_api() if args.daemonless else self.docker_api
+        )
         self.bundle_builder = self._init_bundle_builder()
         self.index_builder = self._init_index_builder()
         self.package_builder = self._init_package_builder()
         self.imageset_creator = self._init_imageset_creator()
 
     def run(self):
+        if self.local_registry is None:
+            self._run()
+            return
+
+        self.log.info(
+            f"Starting local registry {self.local_registry.registry}."
+        )
+        self.local_registry.run()
+        try:
+            self._run()
+        finally:
+            self.local_registry.teardown()
+
+    def _run(self):
         target_addons = self._get_target_addons()
         n = len(target_addons)
+        if n > 0:
+            self.log.info(f"Building from {self.build_context}.")
 
         for i, addon_dir in enumerate(target_addons):
             self.log.info(
                 f"==> Building bundles for {addon_dir.name} ({i+1}/{n})..."
             )
+            with phase(f"{ADDON_FRAME_PREFIX}{addon_dir.name}"):
+                addon_bundles, index_image, package_image = self._build_addon(
+                    addon_dir
+                )
+
+            imageset_enabled_addons = self.args.imageset_enabled_addons
+            if self.args.enable_gitlab:
+                self.imageset_creator.create(
+                    addon_bundles,
+                    index_image,
+                    package_image,
+                    with_imagesets=addon_dir.name in imageset_enabled_addons,
+                )
+
+        if n > 0:
+            self.log.info(
+                f"Bundle validation cache: {self.bundle_validation_cache}."
+                f" Package validation cache: {self.package_validation_cache}."
+            )
+        if self.args.daemonless and not self.dry_run:
+            self.log.info(
+                f"Pushed bundle and package images: {self.image_api.stats}."
+            )
+
+    def _build_addon(self, addon_dir):
+        with phase("load_bundles"):
             addon_bundles = AddonBundles(
                 addon_dir,
                 debug=self.args.debug,
                 single_bundle=self.args.single_bundle,
+                build_context=self.build_context,
+                validation_cache=self.bundle_validation_cache,
             )
             bundles = addon_bundles.get_all_bundles()
 
+        with phase("bundle_images"):
             self.bundle_builder.build_and_push_all(bundles)
+        with phase("index_image"):
             index_image = self.index_builder.build_and_push(bundles)
 
-            package_image = None
-            for fd in addon_dir.iterdir():
-                if fd.name == "package":
-                    addon_package = AddonPackage(
-                        addon_dir / "package", debug=self.args.debug
-                    )
-                    package_image = self.package_builder.build_and_push(
-                        addon_package
-                    )
-                    continue
-
-            imageset_enabled_addons = self.args.imageset_enabled_addons
-            if self.args.enable_gitlab:
-                self.imageset_creator.create(
-                    addon_bundles,
-                    index_image,
-                    package_image,
-                    with_imagesets=addon_dir.name in imageset_enabled_addons,
+        package_image = None
+        if (addon_dir / "package").is_dir():
+            with phase("package_image"):
+                addon_package = AddonPackage(
+                    addon_dir / "package", debug=self.args.debug
+                )
+                package_image = self.package_builder.build_and_push(
+                    addon_package
                 )
+        return addon_bundles, index_image, package_image
 
     def _get_target_addons(self):
         """
@@ -99,34 +172,52 @@ class MtbundlesCLI:
 
     def _init_docker_api(self):
         return ContainerRuntime.from_env(
-            registry=f"quay.io/{self.args.quay_org}",
+            registry=self.registry,
+            quay_org=self.args.quay_org,
+            debug=self.args.debug,
+            force_push=self.args.force_push,
+            # the local registry uses a self-signed certificate
+            ssl_verify=self.local_registry is None,
+        )
+
+    def _init_oci_api(self):
+        return OciAPI.from_env(
+            registry=self.registry,
             quay_org=self.args.quay_org,
             debug=self.args.debug,
             force_push=self.args.force_push,
+            mirrors=self.args.mirror,
+            # the local registry uses a self-signed certificate
+            ssl_verify=self.local_registry is None,
         )
 
     def _init_bundle_builder(self):
         return BundleBuilder(
-            docker_api=self.docker_api,
-            dry_run=self.args.dry_run,
+            docker_api=self.image_api,
+            dry_run=self.dry_run,
             debug=self.args.debug,
+            ssl_verify=self.local_registry is None,
+            build_context=self.build_context,
         )
 
     def _init_index_builder(self):
         return IndexBuilder(
             docker_api=self.docker_api,
-            dry_run=self.args.dry_run,
+            dry_run=self.dry_run,
             debug=self.args.debug,
             build_with=self.args.build_with,
             base_image=self.args.base_index_image,
+            build_context=self.build_context,
         )
 
     def _init_package_builder(self):
         return PackageBuilder(
-            docker_api=self.docker_api,
-            dry_run=self.args.dry_run,
+            docker_api=self.image_api,
+            dry_run=self.dry_run,
             debug=self.args.debug,
             build_with=self.args.build_with,
+            build_context=self.build_context,
+            validation_cache=self.package_validation_cache,
         )
 
     def _init_imageset_creator(self):
@@ -0,0 +1,114 @@
+import hashlib
+import io
+import os
+import stat
+import tarfile
+
+DOCKERFILE = "Dockerfile"
+
+# Every entry gets the same owner and mtime, so the same files always produce
+# the same archive, and therefore the same image layers.
+_MTIME = 0
+_FILE_MODE = 0o644
+_EXEC_MODE = 0o755
+
+
+def context_tar(dockerfile, sources):
+    """
+    Builds an in-memory build context holding the Dockerfile and exactly the
+    given sources. Entries are sorted and their mtime, owner and permissions
+    are normalized. Nothing is written to the source directories, so
+    concurrent builds can run from a read-only checkout.
+
+    :param dockerfile: content of the Dockerfile, stored as `DOCKERFILE`.
+    :param sources: {path in the context: Path to a file or directory}
+    :return: the uncompressed tar, as a BytesIO positioned at 0.
+    """
+    return _write_tar(sources, {DOCKERFILE: dockerfile.encode("utf-8")})
+
+
+def layer_tar(sources):
+    """
+    Same as context_tar() without the Dockerfile: the content of an image
+    layer made of `sources`.
+    """
+    return _write_tar(sources)
+
+
+def tree_digest(sources):
+    """
+    sha256 hexdigest of layer_tar(sources): changes with the content, names
+    and permissions of the files, not with their mtime or owner. The archive
+    is hashed as it is written, it is never held in memory.
+    """
+    digest = _DigestWriter()
+    _write_tar_to(digest, sources)
+    return digest.sha256.hexdigest()
+
+
+class _DigestWriter:
+    """Write-only file object hashing what is written to it."""
+
+    def __init__(self):
+        self.sha256 = hashlib.sha256()
+        self._size = 0
+
+    def write(self, data):
+        self.sha256.update(data)
+        self._size += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._size
+
+
+def _write_tar(sources, extra_files=None):
+    fileobj = io.BytesIO()
+    _write_tar_to(fileobj, sources, extra_files)
+    fileobj.seek(0)
+    return fileobj
+
+
+def _write_tar_to(fileobj, sources, extra_files=None):
+    with tarfile.open(
+        fileobj=fileobj, mode="w", format=tarfile.PAX_FORMAT
+    ) as tar:
+        for arcname, content in sorted((extra_files or {}).items()):
+            _add_bytes(tar, arcname, content)
+        for arcname, path in sorted(sources.items()):
+            _add_tree(tar, arcname, path)
+
+
+def _add_tree(tar, arcname, path):
+    st = os.lstat(path)
+    if stat.S_ISDIR(st.st_mode):
+        tar.addfile(_tarinfo(arcname, tarfile.DIRTYPE, _EXEC_MODE))
+        for child in sorted(os.listdir(path)):
+            _add_tree(tar, f"{arcname}/{child}", os.path.join(path, child))
+    elif stat.S_ISLNK(st.st_mode):
+        info = _tarinfo(arcname, tarfile.SYMTYPE, 0o777)
+        info.linkname = os.readlink(path)
+        tar.addfile(info)
+    elif stat.S_ISREG(st.st_mode):
+        mode = _EXEC_MODE if st.st_mode & stat.S_IXUSR else _FILE_MODE
+        info = _tarinfo(arcname, tarfile.REGTYPE, mode)
+        info.size = st.st_size
+        with open(path, "rb") as f:
+            tar.addfile(info, f)
+    # sockets, fifos and devices have no place in an image
+
+
+def _add_bytes(tar, arcname, content):
+    info = _tarinfo(arcname, tarfile.REGTYPE, _FILE_MODE)
+    info.size = len(content)
+    tar.addfile(info, io.BytesIO(content))
+
+
+def _tarinfo(arcname, entry_type, mode):
+    info = tarfile.TarInfo(arcname)
+    info.type = entry_type
+    info.mode = mode
+    info.mtime = _MTIME
+    info.uid = info.gid = 0
+    info.uname = info.gname = ""
+    return info
@@ -4,25 +4,31 @@ import io
 import json
 import logging
 import os
+import re
+import shutil
 import tarfile
+from concurrent.futures import ThreadPoolExecutor
 
 import docker
-import docker.api.build
 import podman
 import podman.errors
 from podman import PodmanClient
-from requests.exceptions import HTTPError
+from requests.exceptions import HTTPError, RequestException
 from sretoolbox.utils.logger import get_text_logger
 
-from managedtenants.bundles.exceptions import DockerError, QuayAPIError
-from managedtenants.bundles.quay_api import QuayAPI
-
-# Hack to allow dockerfile as string
-# https://github.com/docker/docker-py/issues/2105#issuecomment-613685891
-docker.api.build.process_dockerfile = lambda dockerfile, path: (
-    "Dockerfile",
-    dockerfile,
+from managedtenants.bundles.context_tar import DOCKERFILE, context_tar
+from managedtenants.bundles.exceptions import (
+    DockerError,
+    QuayAPIError,
+    RegistryError,
 )
+from managedtenants.bundles.oci import (
+    OciImage,
+    PushStats,
+    RegistryClient,
+    split_reference,
+)
+from managedtenants.bundles.quay_api import QuayAPI
 
 
 class ContainerRuntime(abc.ABC):
@@ -33,15 +39,17 @@ class ContainerRuntime(abc.ABC):
         quay_org,
         debug,
         force_push,
+        ssl_verify=True,
     ):
         self.registry = registry
         self.force_push = force_push
+        self.ssl_verify = ssl_verify
         self.log = get_text_logger(
             "managedtenants-docker",
             level=logging.DEBUG if debug else logging.INFO,
         )
         if self._is_quay_registry():
-            self.quay_api = QuayAPI(org=quay_org, debug=debug)
+            self.quay_api = QuayAPI.shared(org=quay_org, debug=debug)
 
     @staticmethod
     def from_env(
@@ -49,6 +57,7 @@ class ContainerRuntime(abc.ABC):
         quay_org,
         debug=False,
         force_push=False,
+        ssl_verify=True,
     ):
         if os.getenv("CONTAINER_RUNTIME") == "podman":
             try:
@@ -67,6 +76,7 @@ class ContainerRuntime(abc.ABC):
                 quay_org=quay_org,
                 debug=debug,
                 force_push=force_push,
+                ssl_verify=ssl_verify,
             )
 
         return DockerAPI(
@@ -75,6 +85,7 @@ class ContainerRuntime(abc.ABC):
             quay_org=quay_org,
             debug=debug,
             force_push=force_push,
+            ssl_verify=ssl_verify,
         )
 
     def build_bundle(self, bundle):
@@ -83,9 +94,15 @@ class ContainerRuntime(abc.ABC):
         COPY manifests /manifests/
         COPY metadata /metadata/
         """
+        context = context_tar(
+            dockerfile,
+            {
+                "manifests": bundle.path / "manifests",
+                "metadata": bundle.path / "metadata",
+            },
+        )
         return self._build(
-            path=bundle.path,
-            dockerfile=dockerfile,
+            context=context,
             tag=bundle.image.url_tag,
             labels=bundle.annotations,
         )
@@ -93,16 +110,16 @@ class ContainerRuntime(abc.ABC):
     def build_package(self, addon_package):
         dockerfile = """
         FROM scratch
-        ADD . /package
+        COPY package /package/
         """
+        context = context_tar(dockerfile, {"package": addon_package.path})
         return self._build(
-            path=addon_package.path,
-            dockerfile=dockerfile,
+            context=context,
             tag=addon_package.image.url_tag,
         )
 
     @abc.abstractmethod
-    def _build(self, path, dockerfile, tag, labels=None):
+    def _build(self, context, tag, labels=None):
         pass
 
     @abc.abstractmethod
@@ -114,9 +131,33 @@ class ContainerRuntime(abc.ABC):
         pass
 
     @abc.abstractmethod
-    def extract_file_from_container(self, tag, path):
+    def extract_file_from_container(self, tag, path, dest):
         pass
 
+    def remote_digest(self, image):
+        """
+        Looks the image tag up in the registry, with the credentials of the
+        runtime for that registry, if any.
+
+        :param image: Sretoolbox Image(..) to look up.
+        :return: the manifest digest, None if the tag does not exist.
+        :raise DockerError: the registry could not be queried.
+        """
+        host, repo, tag = split_reference(image.url_tag)
+        try:
+            client = RegistryClient(
+                host,
+                *self._registry_credentials(host),
+                ssl_verify=self.ssl_verify,
+            )
+            return client.manifest_digest(repo, tag)
+        except (RegistryError, RequestException) as e:
+            raise DockerError(f"Failed to look up {image.url_tag}, got {e}.")
+
+    def _registry_credentials(self, host):
+        """:return: (username, password) for `host`, () if there are none."""
+        return ()
+
     def _image_exists(self, image):
         # The Image(...) sretoolbox library requires a valid quay registry.
         if not self._is_quay_registry():
@@ -136,11 +177,48 @@ class ContainerRuntime(abc.ABC):
         return self.registry.startswith("quay.io")
 
 
-def _get_credentials(path):
+class _ChunksReader(io.RawIOBase):
+    """Read-only file object over an iterable of bytes chunks."""
+
+    def __init__(self, chunks):
+        super().__init__()
+        self._chunks = iter(chunks)
+        self._buffer = memoryview(b"")
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buffer:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._buffer = memoryview(chunk)
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+
+def _extract_from_archive(chunks, path, dest):
+    """
+    Copies the `path` file of a tar archive received as `chunks`, as
+    returned by get_archive(), into `dest` as the archive streams in.
+    """
+    name = os.path.basename(path)
+    with tarfile.open(fileobj=_ChunksReader(chunks), mode="r|") as tar:
+        for member in tar:
+            if member.name == name and member.isfile():
+                shutil.copyfileobj(tar.extractfile(member), dest)
+                return
+    raise DockerError(f"{path} not found in the container archive.")
+
+
+def _get_credentials(path, host="quay.io"):
     with open(path, "r", encoding="utf-8") as f:
         creds = base64.b64decode(
-            json.loads(f.read())["auths"]["quay.io"]["auth"]
-        ).split(b":")
+            json.loads(f.read())["auths"][host]["auth"]
+        ).split(b":", 1)
 
     return {
         "username": creds[0].decode("utf-8"),
@@ -159,6 +237,7 @@ class DockerAPI(ContainerRuntime):
                            If not present, the client does not login.
     :param force_push: overwrite an existing remote image.
     :param debug: Enable debug logging.
+    :param ssl_verify: verify the registry certificate on lookups.
     :raise ValueError: If an invalid empty username is provided.
     """
 
@@ -170,17 +249,28 @@ class DockerAPI(ContainerRuntime):
         quay_org,
         debug,
         force_push,
+        ssl_verify=True,
     ):
-        super().__init__(registry, quay_org, debug, force_push)
+        super().__init__(registry, quay_org, debug, force_push, ssl_verify)
         self.dockercfg_path = dockercfg_path
         self.client = docker.from_env()
 
-    def _build(self, path, dockerfile, tag, labels=None):
+    def _registry_credentials(self, host):
+        if self.dockercfg_path is None:
+            return ()
+        try:
+            creds = _get_credentials(
+                os.path.join(self.dockercfg_path, "config.json"), host=host
+            )
+        except (OSError, KeyError, IndexError, ValueError):
+            return ()
+        return creds["username"], creds["password"]
+
+    def _build(self, context, tag, labels=None):
         """
-        Build a docker image using in-memory dockerfile.
+        Build a docker image from an in-memory build context.
 
-        :param path: Path to the context directory.
-        :param dockerfile: A file object to use as the Dockerfile.
+        :param context: Tar file object, as returned by context_tar().
         :param tag: Tag for the built image.
         :param labels: (Optional) image labels.
 
@@ -188,8 +278,9 @@ class DockerAPI(ContainerRuntime):
         """
         try:
             out_image, log_generator = self.client.images.build(
-                path=str(path),  # Path(..) obj are not allowed
-                dockerfile=dockerfile,
+                fileobj=context,
+                custom_context=True,
+                dockerfile=DOCKERFILE,
                 labels=labels if labels is not None else {},
                 tag=tag,
             )
@@ -200,9 +291,7 @@ class DockerAPI(ContainerRuntime):
             return out_image
 
         except docker.errors.BuildError as e:
-            raise DockerError(
-                f"Failed to build image for path {path}, got {e}."
-            )
+            raise DockerError(f"Failed to build image {tag}, got {e}.")
 
     def push(self, image, ensure_repo=True):
         """
@@ -246,28 +335,22 @@ class DockerAPI(ContainerRuntime):
         if image.attrs.get("Size", -1) == 0:
             raise DockerError(f"Built an empty image: {tag}.")
 
-    def extract_file_from_container(self, tag, path):
+    def extract_file_from_container(self, tag, path, dest):
         """
-        Creates a temporary container and returns the given file as an
-        io.BytesIO object.
+        Creates a temporary container and streams the given file into `dest`,
+        without holding the whole archive in memory.
 
         :tag str: image from which to create the container
         :path str: path of the file to be extracted from container
-        :returns: in-memory fileobj of the extracted file
+        :dest: writable binary file object
         """
         try:
-            in_memory_tar = io.BytesIO()
             container = self.client.containers.create(tag)
-            tar_bytes, _ = container.get_archive(path)
-
-            for tb in tar_bytes:
-                in_memory_tar.write(tb)
-
-            container.remove(force=True)
-
-            in_memory_tar.seek(0)
-            with tarfile.open(fileobj=in_memory_tar) as tf:
-                return tf.extractfile(os.path.basename(path))
+            try:
+                chunks, _ = container.get_archive(path)
+                _extract_from_archive(chunks, path, dest)
+            finally:
+                container.remove(force=True)
 
         except docker.errors.ImageNotFound as e:
             raise DockerError(
@@ -280,6 +363,10 @@ class DockerAPI(ContainerRuntime):
             )
 
 
+# podman reports the built image id as the last line of the build log
+_PODMAN_IMAGE_ID = re.compile(r"^([0-9a-f]{64})\n$")
+
+
 class PodmanAPI(ContainerRuntime):
     # pylint: disable=too-many-arguments
     def __init__(
@@ -290,47 +377,66 @@ class PodmanAPI(ContainerRuntime):
         quay_org,
         debug,
         force_push,
+        ssl_verify=True,
     ):
-        super().__init__(registry, quay_org, debug, force_push)
+        super().__init__(registry, quay_org, debug, force_push, ssl_verify)
         self._user = user
         self._password = password
         self.client = PodmanClient.from_env()
 
-    def _build(self, path, dockerfile, tag, labels=None):
+    def _registry_credentials(self, host):
+        if host != self.registry.split("/", 1)[0]:
+            return ()
+        return self._user, self._password
+
+    def _build(self, context, tag, labels=None):
         """
-        Build a docker image using in-memory dockerfile.
+        Build an image from an in-memory build context.
+
+        podman-py only accepts a context directory, or a lone Containerfile,
+        so the context tar is posted to the build endpoint directly.
 
-        :param path: Path to the context directory.
-        :param dockerfile: A file object to use as the Dockerfile.
+        :param context: Tar file object, as returned by context_tar().
         :param tag: Tag for the built image.
         :param labels: (Optional) image labels.
 
         :raise DockerError: on a build error or if the built image has Size 0.
         """
-        temp_file = path / "Containerfile"
-
-        with open(temp_file, "w+", encoding="utf-8") as f:
-            f.write(dockerfile)
-
         try:
-            out_image, log_generator = self.client.images.build(
-                path=str(path),  # Path(..) obj are not allowed
-                dockerfile="Containerfile",
-                labels=labels if labels is not None else {},
-                tag=tag,
+            response = self.client.api.post(
+                "/build",
+                params={
+                    "dockerfile": DOCKERFILE,
+                    "t": tag,
+                    "labels": json.dumps(labels if labels is not None else {}),
+                },
+                data=context,
+                headers={"Content-type": "application/x-tar"},
+                stream=True,
             )
-            for log in log_generator:
+            response.raise_for_status()
+
+            image_id = None
+            for line in response.iter_lines():
+                log = json.loads(line)
                 self.log.debug(log)
+                if "error" in log:
+                    raise DockerError(
+                        f"Failed to build image {tag}, got {log['error']}."
+                    )
+                match = _PODMAN_IMAGE_ID.match(log.get("stream", ""))
+                if match:
+                    image_id = match.group(1)
 
+            if image_id is None:
+                raise DockerError(
+                    f"Failed to build image {tag}, no image id returned."
+                )
             self.check_image_size_non_zero(tag)
-            return out_image
+            return self.client.images.get(image_id)
 
-        except podman.errors.BuildError as e:
-            raise DockerError(
-                f"Failed to build image for path {path}, got {e}."
-            )
-        finally:
-            os.remove(temp_file)
+        except podman.errors.APIError as e:
+            raise DockerError(f"Failed to build image {tag}, got {e}.")
 
     def push(self, image, ensure_repo=True):
         """
@@ -376,28 +482,22 @@ class PodmanAPI(ContainerRuntime):
         if image.attrs.get("Size", -1) == 0:
             raise DockerError(f"Built an empty image: {tag}.")
 
-    def extract_file_from_container(self, tag, path):
+    def extract_file_from_container(self, tag, path, dest):
         """
-        Creates a temporary container and returns the given file as an
-        io.BytesIO object.
+        Creates a temporary container and streams the given file into `dest`,
+        without holding the whole archive in memory.
 
         :tag str: image from which to create the container
         :path str: path of the file to be extracted from container
-        :returns: in-memory fileobj of the extracted file
+        :dest: writable binary file object
         """
         try:
-            in_memory_tar = io.BytesIO()
             container = self.client.containers.create(tag)
-            tar_bytes, _ = container.get_archive(path)
-
-            for tb in tar_bytes:
-                in_memory_tar.write(tb)
-
-            container.remove(force=True)
-
-            in_memory_tar.seek(0)
-            with tarfile.open(fileobj=in_memory_tar) as tf:
-                return tf.extractfile(os.path.basename(path))
+            try:
+                chunks, _ = container.get_archive(path)
+                _extract_from_archive(chunks, path, dest)
+            finally:
+                container.remove(force=True)
 
         except podman.errors.ImageNotFound as e:
             raise DockerError(
@@ -408,3 +508,214 @@ class PodmanAPI(ContainerRuntime):
             raise DockerError(
                 f"Failed to read file from index image {tag} got {e}"
             )
+
+
+class OciAPI(ContainerRuntime):
+    """
+    Daemonless runtime for bundle and package images. Both are FROM scratch
+    images with a single layer, so they are assembled in memory (see
+    OciImage) and pushed with the registry v2 API, without docker or podman.
+
+    Images are pushed to `registry` first, then to every mirror concurrently.
+    Mirrors on the same registry host mount the blobs from the first
+    repository instead of uploading them again.
+
+    Index images still need a daemon: opm builds them.
+
+    :param mirrors: (optional) other "host/org" to push every image to.
+    :param credentials: (optional) {registry host: (username, password)}.
+    :param ssl_verify: verify the registry certificate.
+    :param insecure: talk plain http to the registries.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        registry,
+        quay_org,
+        debug,
+        force_push,
+        mirrors=(),
+        credentials=None,
+        ssl_verify=True,
+        insecure=False,
+    ):
+        super().__init__(registry, quay_org, debug, force_push, ssl_verify)
+        # {url_tag: OciImage}, the images built and not pushed yet
+        self.images = {}
+        # blobs of all the pushes
+        self.stats = PushStats()
+        self.targets = [registry, *mirrors]
+        self._clients = {}
+        self._quay_apis = {}
+        for target in self.targets:
+            host, org = target.split("/", 1)
+            self._clients[target] = RegistryClient(
+                host,
+                *(credentials or {}).get(host, ()),
+                ssl_verify=ssl_verify,
+                insecure=insecure,
+            )
+            if target == registry and self._is_quay_registry():
+                self._quay_apis[target] = self.quay_api
+            elif target.startswith("quay.io"):
+                self._quay_apis[target] = QuayAPI.shared(org=org, debug=debug)
+
+    @staticmethod
+    def from_env(
+        registry,
+        quay_org,
+        debug=False,
+        force_push=False,
+        mirrors=(),
+        ssl_verify=True,
+    ):
+        """
+        Reads the registry credentials from REGISTRY_AUTH_FILE, or from the
+        config.json of DOCKER_CONF. Pushes anonymously to the registries it
+        has no credentials for.
+        """
+        auth_file = os.getenv("REGISTRY_AUTH_FILE") or os.path.join(
+            os.getenv("DOCKER_CONF", ".docker"), "config.json"
+        )
+        credentials = {}
+        if os.path.isfile(auth_file):
+            for target in [registry, *mirrors]:
+                host = target.split("/", 1)[0]
+                try:
+                    creds = _get_credentials(auth_file, host=host)
+                except KeyError:
+                    continue
+                except Exception as e:
+                    raise DockerError(f"Failed to get credentials: {e}")
+                credentials[host] = (creds["username"], creds["password"])
+
+        return OciAPI(
+            registry=registry,
+            quay_org=quay_org,
+            debug=debug,
+            force_push=force_push,
+            mirrors=mirrors,
+            credentials=credentials,
+            ssl_verify=ssl_verify,
+        )
+
+    def build_bundle(self, bundle):
+        return self._add(
+            bundle.image.url_tag,
+            OciImage.from_sources(
+                {
+                    "manifests": bundle.path / "manifests",
+                    "metadata": bundle.path / "metadata",
+                },
+                labels=bundle.annotations,
+            ),
+        )
+
+    def build_package(self, addon_package):
+        return self._add(
+            addon_package.image.url_tag,
+            OciImage.from_sources({"package": addon_package.path}),
+        )
+
+    def _add(self, tag, image):
+        self.images[tag] = image
+        self.log.debug(f"Assembled {tag}: {image.digest}.")
+        self.check_image_size_non_zero(tag)
+        return image
+
+    def _build(self, context, tag, labels=None):
+        raise DockerError(
+            f"Cannot build {tag} from a Dockerfile without docker or podman."
+        )
+
+    def push(self, image, ensure_repo=True):
+        """
+        Push an image assembled by build_bundle() or build_package() to the
+        registry and its mirrors.
+
+        :param image: Sretoolbox Image(..) to be pushed.
+
+        :raise DockerError: failed to push image.
+        """
+        oci_image = self.images.get(image.url_tag)
+        if oci_image is None:
+            raise DockerError(f"{image.url_tag} was not built.")
+
+        _, repo, tag = split_reference(image.url_tag)
+        name = repo.rsplit("/", 1)[-1]
+        primary, *mirrors = self.targets
+
+        self.stats += self._push_to(primary, name, tag, oci_image, ensure_repo)
+        if mirrors:
+            # the primary repository has every blob by now
+            with ThreadPoolExecutor(max_workers=len(mirrors)) as executor:
+                futures = [
+                    executor.submit(
+                        self._push_to,
+                        mirror,
+                        name,
+                        tag,
+                        oci_image,
+                        ensure_repo,
+                        mount_from=primary,
+                    )
+                    for mirror in mirrors
+                ]
+                for future in futures:
+                    self.stats += future.result()
+        del self.images[image.url_tag]
+
+    # pylint: disable=too-many-arguments
+    def _push_to(
+        self, target, name, tag, oci_image, ensure_repo, mount_from=None
+    ):
+        host, org = target.split("/", 1)
+        repo = f"{org}/{name}"
+        url_tag = f"{target}/{name}:{tag}"
+        client = self._clients[target]
+        source = None
+        if mount_from is not None and mount_from.split("/", 1)[0] == host:
+            source = f"{mount_from.split('/', 1)[1]}/{name}"
+
+        try:
+            quay_api = self._quay_apis.get(target)
+            if quay_api is not None and ensure_repo:
+                self.log.info(f"Ensuring quay repo: {org}/{name}.")
+                quay_api.ensure_repo(name)
+
+            existing = client.manifest_digest(repo, tag)
+            if existing is not None and not self.force_push:
+                self.log.info(
+                    f"Skipping pushing {url_tag} as it already exists."
+                )
+                return PushStats(
+                    skipped=sum(len(blob) for _, blob in oci_image.blobs())
+                )
+
+            stats = client.push_image(repo, tag, oci_image, mount_from=source)
+            self.log.info(f"Pushed {url_tag}@{oci_image.digest}: {stats}.")
+            return stats
+
+        except QuayAPIError as e:
+            raise DockerError(f"Failed to ensure quay repo {repo} got {e}.")
+
+        except (RegistryError, RequestException) as e:
+            raise DockerError(f"Failed to push {url_tag}, got {e}.")
+
+    def remote_digest(self, image):
+        """Same as ContainerRuntime.remote_digest(), with the credentials."""
+        _, repo, tag = split_reference(image.url_tag)
+        try:
+            return self._clients[self.registry].manifest_digest(repo, tag)
+        except (RegistryError, RequestException) as e:
+            raise DockerError(f"Failed to look up {image.url_tag}, got {e}.")
+
+    def check_image_size_non_zero(self, tag):
+        if self.images[tag].n_files == 0:
+            raise DockerError(f"Built an empty image: {tag}.")
+
+    def extract_file_from_container(self, tag, path, dest):
+        raise DockerError(
+            f"Cannot extract {path} from {tag} without docker or podman."
+        )
@@ -44,3 +44,11 @@ class QuayAPIError(Exception):
 
 class LocalDockerRegistryError(Exception):
     pass
+
+
+class RegistryError(Exception):
+    """Used when there are errors with the registry v2 API."""
+
+
+class BinaryError(Exception):
+    pass
@@ -2,14 +2,14 @@ import logging
 import os
 import sqlite3
 import subprocess
-import tempfile
 
 from sretoolbox.container import Image
 from sretoolbox.utils.logger import get_text_logger
 
 from managedtenants.bundles.binary_deps import OPM
 from managedtenants.bundles.exceptions import DockerError, IndexBuilderError
-from managedtenants.utils.git import get_short_hash
+from managedtenants.bundles.sql_catalog import INDEX_DB_PATH, SQLCatalog
+from managedtenants.utils.git import BuildContext
 
 
 class IndexBuilder:
@@ -21,19 +21,19 @@ class IndexBuilder:
         dry_run=False,
         debug=False,
         build_with="digest",
+        build_context=None,
     ):
         self.dry_run = dry_run
         self.docker_api = docker_api
         self.build_with = build_with
+        self.build_context = build_context or BuildContext()
         self.log = get_text_logger(
             "managedtenants-index-builder",
             level=logging.DEBUG if debug else logging.INFO,
         )
         self.base_image = base_image
 
-    def build_and_push(
-        self, bundles, hash_string=get_short_hash(), skip_validation=False
-    ):
+    def build_and_push(self, bundles, hash_string=None, skip_validation=False):
         """
         Build and push an index image. The base image is named binary-image by
         opm and is later used to generate a final dockerfile using this
@@ -41,13 +41,16 @@ class IndexBuilder:
         https://github.com/operator-framework/operator-registry/blob/5566e4b6832a7fc08c12d3c79fc0a0b8c6a2e7aa/alpha/action/generate_dockerfile.go#L42-L63
 
         :params bundles: List of Bundle to be added to the index image.
+        :params hash_string: Image tag. Default: the commit hash of the build
+            context.
         :return: An Index image that has been pushed.
         """
+        if hash_string is None:
+            hash_string = self.build_context.short_hash
 
         index_image = self._build(bundles, hash_string, skip_validation)
         return self._push(index_image)
 
-    # pylint: disable=unused-argument
     def _build(self, bundles, hash_string, skip_validation=False):
         if len(bundles) == 0:
             raise IndexBuilderError("invalid empty bundles list")
@@ -91,10 +94,11 @@ class IndexBuilder:
         try:
             OPM.run(cmd)
 
-            # (sblaisdo) the index image is always broken on --dry-run as opm
-            #            tooling requires bundles to be hosted on a registry
-            # if not skip_validation:
-            #     self._validate_sql_catalog(index_image.url_tag, len(bundles))
+            # the index image is always broken on --dry-run as opm tooling
+            # requires bundles to be hosted on a registry, use
+            # --local-registry to get a valid one
+            if not skip_validation and not self.dry_run:
+                self._validate_sql_catalog(index_image.url_tag, len(bundles))
             return index_image
 
         except subprocess.CalledProcessError as e:
@@ -125,75 +129,30 @@ class IndexBuilder:
         """
         Validates an sql based index_image. Makes sure it contains bundles.
         """
-        db_name = "/database/index.db"
-        try:
-            in_memory_db = self.docker_api.extract_file_from_container(
-                tag, db_name
-            )
-
-        except DockerError as e:
-            err_msg = f"failed to validate {tag}, got {e}."
-            self.log.error(err_msg)
-            raise IndexBuilderError(err_msg)
-
         try:
-            with SQLCatalog(in_memory_db) as catalog:
-                bundles = catalog.get_bundles()
-                self.log.debug(bundles)
-
+            with SQLCatalog.from_image(self.docker_api, tag) as catalog:
+                bundles = catalog.bundles()
                 if len(bundles) != n_bundles:
                     err_msg = (
-                        f"expected {db_name} to contain {n_bundles} bundles"
-                        f" but found {len(bundles)}."
+                        f"expected {INDEX_DB_PATH} to contain {n_bundles}"
+                        f" bundles but found {len(bundles)}."
                     )
                     self.log.error(err_msg)
                     raise IndexBuilderError(err_msg)
 
-                self.log.debug(f"Found {len(bundles)} bundles:")
-                for bundle in bundles:
-                    self.log.debug(bundle)
+                self.log.debug(f"Found {len(bundles)} bundles in {tag}:")
+                for line in catalog.describe():
+                    self.log.debug(line)
+
+        except DockerError as e:
+            err_msg = f"failed to validate {tag}, got {e}."
+            self.log.error(err_msg)
+            raise IndexBuilderError(err_msg)
 
         except sqlite3.Error as e:
             err_msg = (
-                "failed to query bundles from '/database/index.db' inside of ",
-                f"{tag}, got {e}.",
+                f"failed to query bundles from '{INDEX_DB_PATH}' inside of"
+                f" {tag}, got {e}."
             )
             self.log.error(err_msg)
             raise IndexBuilderError(err_msg)
-
-
-# (sblaisdo) OPM 1.19.5 uses a busybox distroless container. It does not have
-# sqlite3 or a package manager so it's easier to simply create a temp container
-# and validate the index.db on the host.
-class SQLCatalog:
-    """
-    Abstract an SQL catalog.
-    """
-
-    def __init__(self, in_memory_db):
-        """
-        Initialize a database connection from an in_memory_db fileobj.
-        """
-        # sqlite3 module only works with path-like object and does not support
-        # fileobj so we unfortunately have to do some temp I/O gymnastics
-        try:
-            with tempfile.NamedTemporaryFile() as tmp:
-                tmp.write(in_memory_db.read())
-                self.db = sqlite3.connect(tmp.name)
-                self.cursor = self.db.cursor()
-
-        except sqlite3.Error as e:
-            raise e
-
-    def get_bundles(self):
-        try:
-            self.cursor.execute("SELECT * from properties;")
-            return self.cursor.fetchall()
-        except sqlite3.Error as e:
-            raise e
-
-    def __enter__(self):
-        return self
-
-    def __exit__(self, *exc):
-        self.db.close()
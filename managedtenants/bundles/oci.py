@@ -0,0 +1,334 @@
+import base64
+import gzip
+import hashlib
+import io
+import json
+import re
+import tarfile
+from urllib.parse import urljoin
+
+import requests
+
+from managedtenants.bundles.context_tar import layer_tar
+from managedtenants.bundles.exceptions import RegistryError
+
+OCI_MANIFEST = "application/vnd.oci.image.manifest.v1+json"
+OCI_CONFIG = "application/vnd.oci.image.config.v1+json"
+OCI_LAYER = "application/vnd.oci.image.layer.v1.tar+gzip"
+OCI_INDEX = "application/vnd.oci.image.index.v1+json"
+DOCKER_MANIFEST = "application/vnd.docker.distribution.manifest.v2+json"
+DOCKER_MANIFEST_LIST = (
+    "application/vnd.docker.distribution.manifest.list.v2+json"
+)
+# docker and podman push docker manifests, and registries answer 404 for a
+# manifest whose media type was not accepted
+MANIFEST_TYPES = [
+    OCI_MANIFEST,
+    OCI_INDEX,
+    DOCKER_MANIFEST,
+    DOCKER_MANIFEST_LIST,
+]
+
+_CHALLENGE_PARAM = re.compile(r'(\w+)="([^"]*)"')
+
+
+def sha256_digest(data):
+    return f"sha256:{hashlib.sha256(data).hexdigest()}"
+
+
+def _dumps(content):
+    # the digest of a document depends on its exact bytes
+    return json.dumps(content, sort_keys=True, separators=(",", ":")).encode(
+        "utf-8"
+    )
+
+
+def split_reference(reference):
+    """
+    Splits "host/repo/name:tag" into ("host", "repo/name", "tag").
+
+    sretoolbox's Image only knows about dotted registry hosts, so this also
+    handles "localhost:5000/repo/name:tag".
+    """
+    host, _, rest = reference.partition("/")
+    name, _, tag = rest.rpartition(":")
+    if not host or not name or "/" in tag:
+        raise ValueError(f"invalid image reference: {reference}")
+    return host, name, tag
+
+
+class OciImage:
+    """
+    An OCI image made of a single layer, which is all a bundle or package
+    image needs (FROM scratch + COPY). The layer, config and manifest are
+    assembled in memory with no timestamps, so the same sources and labels
+    always produce the same digest.
+
+    :param layer: uncompressed layer tar, see context_tar.layer_tar().
+    :param labels: (optional) image labels, e.g. bundle.annotations.
+    """
+
+    def __init__(self, layer, labels=None):
+        with tarfile.open(fileobj=io.BytesIO(layer)) as tar:
+            self.n_files = sum(1 for member in tar if member.isfile())
+
+        self.layer = gzip.compress(layer, mtime=0)
+        self.config = _dumps(
+            {
+                "architecture": "amd64",
+                "os": "linux",
+                "config": {"Labels": labels or {}},
+                "rootfs": {
+                    "type": "layers",
+                    "diff_ids": [sha256_digest(layer)],
+                },
+            }
+        )
+        self.manifest = _dumps(
+            {
+                "schemaVersion": 2,
+                "mediaType": OCI_MANIFEST,
+                "config": self._descriptor(OCI_CONFIG, self.config),
+                "layers": [self._descriptor(OCI_LAYER, self.layer)],
+            }
+        )
+        self.digest = sha256_digest(self.manifest)
+
+    @classmethod
+    def from_sources(cls, sources, labels=None):
+        """
+        :param sources: {path in the image: Path to a file or directory}
+        """
+        return cls(layer_tar(sources).getvalue(), labels=labels)
+
+    @staticmethod
+    def _descriptor(media_type, blob):
+        return {
+            "mediaType": media_type,
+            "digest": sha256_digest(blob),
+            "size": len(blob),
+        }
+
+    def blobs(self):
+        """:return: [(digest, content)] of the layer and the config."""
+        return [
+            (sha256_digest(self.layer), self.layer),
+            (sha256_digest(self.config), self.config),
+        ]
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.digest})"
+
+
+class PushStats:
+    """Bytes of blobs uploaded, mounted from another repository or skipped."""
+
+    __slots__ = ("uploaded", "mounted", "skipped")
+
+    def __init__(self, uploaded=0, mounted=0, skipped=0):
+        self.uploaded = uploaded
+        self.mounted = mounted
+        self.skipped = skipped
+
+    def __iadd__(self, other):
+        self.uploaded += other.uploaded
+        self.mounted += other.mounted
+        self.skipped += other.skipped
+        return self
+
+    def __str__(self):
+        return (
+            f"uploaded {self.uploaded:,} bytes, mounted {self.mounted:,}"
+            f" bytes, skipped {self.skipped:,} bytes"
+        )
+
+
+class RegistryClient:
+    """
+    Minimal client of the registry v2 API, enough to push OCI images without
+    a container daemon. Handles both basic and token (bearer) auth.
+
+    :param host: registry host, e.g. "quay.io" or "localhost:5000".
+    :param username: (optional) registry username or robot account.
+    :param password: (optional) registry password or token.
+    :param ssl_verify: verify the registry certificate.
+    :param insecure: talk plain http to the registry.
+
+    :raise RegistryError: only one of username and password is set.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        host,
+        username=None,
+        password=None,
+        ssl_verify=True,
+        insecure=False,
+        timeout=60,
+    ):
+        self.host = host
+        self.base_url = f"{'http' if insecure else 'https'}://{host}/v2"
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.verify = ssl_verify
+        if (username is None) != (password is None):
+            raise RegistryError(
+                f"{host} credentials need both a username and a password"
+            )
+        self._credentials = (
+            (username, password) if username is not None else None
+        )
+        # {scopes: Authorization header}
+        self._authorizations = {}
+
+    def blob_exists(self, repo, digest):
+        response = self._request(
+            "HEAD", f"{self.base_url}/{repo}/blobs/{digest}", repo
+        )
+        if response.status_code == 404:
+            return False
+        self._check(response, f"check blob {digest} in {repo}")
+        return True
+
+    def upload_blob(self, repo, digest, content, mount_from=None):
+        """
+        Monolithic upload: one POST to start the upload, one PUT.
+
+        :param mount_from: (optional) repository of the same registry that
+            may already have the blob. The registry then links it into `repo`
+            (cross-repository mount) and nothing is uploaded.
+        :return: True if the blob was mounted, False if it was uploaded.
+        """
+        url = f"{self.base_url}/{repo}/blobs/uploads/"
+        scopes = [repo]
+        if mount_from is not None:
+            url = f"{url}?mount={digest}&from={mount_from}"
+            scopes.append(mount_from)
+        response = self._request("POST", url, *scopes)
+        self._check(response, f"start blob upload in {repo}")
+        if response.status_code == 201:
+            return True
+
+        location = urljoin(self.base_url, response.headers["Location"])
+        separator = "&" if "?" in location else "?"
+        response = self._request(
+            "PUT",
+            f"{location}{separator}digest={digest}",
+            repo,
+            data=content,
+            headers={"Content-Type": "application/octet-stream"},
+        )
+        self._check(response, f"upload blob {digest} to {repo}")
+        return False
+
+    def manifest_digest(self, repo, reference):
+        """:return: the digest of the manifest, None if it does not exist."""
+        response = self._request(
+            "HEAD",
+            f"{self.base_url}/{repo}/manifests/{reference}",
+            repo,
+            headers={"Accept": ", ".join(MANIFEST_TYPES)},
+        )
+        if response.status_code == 404:
+            return None
+        self._check(response, f"check manifest {repo}:{reference}")
+        return response.headers.get("Docker-Content-Digest")
+
+    def put_manifest(self, repo, reference, manifest, media_type=OCI_MANIFEST):
+        response = self._request(
+            "PUT",
+            f"{self.base_url}/{repo}/manifests/{reference}",
+            repo,
+            data=manifest,
+            headers={"Content-Type": media_type},
+        )
+        self._check(response, f"push manifest {repo}:{reference}")
+
+    def push_image(self, repo, tag, image, mount_from=None):
+        """
+        Pushes the blobs the registry does not have yet, then the manifest.
+
+        :param mount_from: (optional) see upload_blob().
+        :return: PushStats of the blobs.
+        """
+        stats = PushStats()
+        for digest, content in image.blobs():
+            if self.blob_exists(repo, digest):
+                stats.skipped += len(content)
+            elif self.upload_blob(repo, digest, content, mount_from):
+                stats.mounted += len(content)
+            else:
+                stats.uploaded += len(content)
+        self.put_manifest(repo, tag, image.manifest)
+        return stats
+
+    def _request(self, method, url, repo, *pull_repos, headers=None, **kwargs):
+        """
+        Sends a request, authenticating for push on `repo` and pull on
+        `pull_repos` when the registry asks for it.
+        """
+        scopes = (
+            f"repository:{repo}:pull,push",
+            *(f"repository:{r}:pull" for r in pull_repos),
+        )
+        headers = dict(headers or {})
+        if scopes in self._authorizations:
+            headers["Authorization"] = self._authorizations[scopes]
+
+        response = self.session.request(
+            method, url, headers=headers, timeout=self.timeout, **kwargs
+        )
+        if response.status_code != 401:
+            return response
+
+        # not authenticated yet, or the cached token expired: authenticate
+        # once more and retry
+        self._authorizations.pop(scopes, None)
+        self._authorizations[scopes] = self._authenticate(response, scopes)
+        headers["Authorization"] = self._authorizations[scopes]
+        return self.session.request(
+            method, url, headers=headers, timeout=self.timeout, **kwargs
+        )
+
+    def _authenticate(self, response, scopes):
+        """:return: the Authorization header answering the 401 challenge."""
+        challenge = response.headers.get("WWW-Authenticate", "")
+        scheme, _, params = challenge.partition(" ")
+        params = dict(_CHALLENGE_PARAM.findall(params))
+
+        if scheme.lower() == "basic":
+            if self._credentials is None:
+                raise RegistryError(f"{self.host} requires credentials")
+            token = base64.b64encode(
+                ":".join(self._credentials).encode("utf-8")
+            ).decode("ascii")
+            return f"Basic {token}"
+
+        if scheme.lower() != "bearer" or "realm" not in params:
+            raise RegistryError(
+                f"unsupported auth challenge from {self.host}: {challenge}"
+            )
+
+        token_response = self.session.get(
+            params["realm"],
+            params={
+                "service": params.get("service"),
+                "scope": list(scopes),
+            },
+            auth=self._credentials,
+            timeout=self.timeout,
+        )
+        self._check(token_response, f"get a token from {params['realm']}")
+        body = token_response.json()
+        token = body.get("token") or body.get("access_token")
+        if token is None:
+            raise RegistryError(f"no token returned by {params['realm']}")
+        return f"Bearer {token}"
+
+    @staticmethod
+    def _check(response, action):
+        if response.status_code >= 400:
+            raise RegistryError(
+                f"failed to {action}: {response.status_code} {response.text}"
+            )
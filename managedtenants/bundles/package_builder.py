@@ -1,12 +1,15 @@
 import logging
 import subprocess
 
-from sretoolbox.binaries import KubectlPackage
 from sretoolbox.container import Image
 from sretoolbox.utils.logger import get_text_logger
 
+from managedtenants.bundles.binary_deps import KUBECTL_PACKAGE
+from managedtenants.bundles.context_tar import tree_digest
 from managedtenants.bundles.exceptions import DockerError
-from managedtenants.utils.git import get_short_hash
+from managedtenants.utils.cache import ResultCache, cache_dir
+from managedtenants.utils.git import BuildContext
+from managedtenants.utils.hash import hash_sha256
 
 
 class PackageBuilderError(Exception):
@@ -14,52 +17,110 @@ class PackageBuilderError(Exception):
 
 
 class PackageBuilder:
+    """
+    Validate, build and push package images.
+
+    Package images are tagged with a hash of the package directory content.
+    When the registry already has that tag, the image is reused: nothing is
+    validated, built nor pushed. Validated hashes are also recorded in
+    `validation_cache`, so a package only ever gets validated once per
+    kubectl-package version.
+
+    :param docker_api: ContainerRuntime used to build, push and look up.
+    :param dry_run: If True, skips pushing images.
+    :param debug: Enable debug logging.
+    :param build_context: BuildContext shared by the bundles pipeline.
+    :param validation_cache: (optional) ResultCache of the validated package
+        hashes. Default: package-validation/ in the cache_dir().
+    """
+
+    # pylint: disable=too-many-arguments
     def __init__(
         self,
         docker_api,
         dry_run=False,
         debug=False,
         build_with="digest",
+        build_context=None,
+        validation_cache=None,
     ):
         self.dry_run = dry_run
         self.docker_api = docker_api
         self.build_with = build_with
-        self.kubectl_package = KubectlPackage(
-            version="1.9.0", download_path="/tmp"
+        self.build_context = build_context or BuildContext()
+        self.validation_cache = validation_cache or ResultCache(
+            cache_dir() / "package-validation"
         )
         self.log = get_text_logger(
             "managedtenants-package-builder",
             level=logging.DEBUG if debug else logging.INFO,
         )
 
-    def build_and_push(self, addon_package):
-        package_image = self._build(addon_package)
-        return self._push(package_image=package_image)
+    def build_and_push(self, addon_package, hash_string=None):
+        """
+        Also sets the addon_package.image field.
 
-    def _build(self, addon_package, hash_string=get_short_hash()):
+        :param hash_string: Image tag. Default: the first 12 characters of
+            the package content hash.
+        """
+        content_hash = tree_digest({"package": addon_package.path})
+        if hash_string is None:
+            hash_string = content_hash[:12]
         package_image = Image(
-            f"{self.docker_api.registry}/"
-            f"{addon_package.image_name}:{hash_string}"
+            (
+                f"{self.docker_api.registry}/"
+                f"{addon_package.image_name}:{hash_string}"
+            ),
+            ssl_verify=self.docker_api.ssl_verify,
         )
-
         addon_package.image = package_image
 
-        command = [
-            "validate",
-            f"{addon_package.path.resolve()}",
-        ]
-        self.log.info(f'Validating package image "{package_image.url_tag}"')
+        if self._exists(package_image):
+            return package_image
+
+        self._validate(addon_package, content_hash)
+        self._build(addon_package)
+        return self._push(package_image=package_image)
+
+    def _exists(self, package_image):
+        if self.docker_api.force_push:
+            return False
+
+        try:
+            digest = self.docker_api.remote_digest(package_image)
+        except DockerError as e:
+            self.log.warning(f"Rebuilding {package_image.url_tag}: {e}")
+            return False
+
+        if digest is None:
+            return False
+        self.log.info(
+            f'Reusing package image "{package_image.url_tag}" ({digest}),'
+            " its content did not change."
+        )
+        return True
+
+    def _validate(self, addon_package, content_hash):
+        key = hash_sha256((content_hash, KUBECTL_PACKAGE.version))
+        if key in self.validation_cache:
+            self.log.info(
+                f'Package "{addon_package.path}" was already validated.'
+            )
+            return
+
+        self.log.info(f'Validating package "{addon_package.path}".')
         try:
-            self.kubectl_package.run(*command)
+            KUBECTL_PACKAGE.run(["validate", f"{addon_package.path.resolve()}"])
         except subprocess.CalledProcessError as exp:
             self.log.error(exp.output.decode())
             raise
+        self.validation_cache.add(key)
 
+    def _build(self, addon_package):
         self.log.info(
-            f'Building package image "{package_image.url_tag}": {command}'
+            f'Building package image "{addon_package.image.url_tag}".'
         )
         _ = self.docker_api.build_package(addon_package)
-        return package_image
 
     def _push(self, package_image):
         if self.dry_run:
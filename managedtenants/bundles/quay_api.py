@@ -2,6 +2,7 @@
 # qontract-reconcile takes a long time to install because it has so many
 # dependencies. Pipelines will be faster if we simply redefine QuayApi here.
 import logging
+import threading
 
 import requests
 from sretoolbox.utils import retry
@@ -26,9 +27,18 @@ class QuayAPI:
     """
     Abstraction around the Quay.io API.
 
+    The repositories of the org are listed once, on the first repo_exists()
+    call, and kept up to date on repo_create(). This saves a GET per
+    repository. The inventory is shared by all the threads using the client,
+    and by all the users of QuayAPI.shared() for the org. A repository
+    created by someone else after the listing is handled by repo_create().
+
     View swagger docs here: https://docs.quay.io/api/swagger/.
     """
 
+    _shared = {}
+    _shared_lock = threading.Lock()
+
     def __init__(
         self, org="osd-addons", token=None, base_url="quay.io", debug=False
     ):
@@ -54,11 +64,28 @@ class QuayAPI:
             "Authorization": f"Bearer {self.token}",
         }
         self.api_url = f"https://{base_url}/api/v1"
+        # names of the org repositories, None until listed
+        self._repos = None
+        self._repos_lock = threading.RLock()
         self.log = get_text_logger(
             "managedtenants-quay",
             level=logging.DEBUG if debug else logging.INFO,
         )
 
+    @classmethod
+    def shared(cls, org="osd-addons", base_url="quay.io", debug=False):
+        """
+        Returns the QuayAPI of the org, created on the first call, so that
+        the org repositories are only listed once per process.
+
+        :raise ValueError: invalid empty token
+        """
+        with cls._shared_lock:
+            key = (org, base_url)
+            if key not in cls._shared:
+                cls._shared[key] = cls(org=org, base_url=base_url, debug=debug)
+            return cls._shared[key]
+
     def ensure_repo(self, repo_name, dry_run=False):
         """
         Validates that the required quay repository exists.
@@ -73,12 +100,14 @@ class QuayAPI:
         if dry_run:
             return True
 
-        if not self.repo_exists(repo_name):
-            self.log.info(
-                "Creating Quay repository %s",
-                f"{self.org}/{repo_name}",
-            )
-            return self.repo_create(repo_name)
+        # two threads must not both try to create the same repository
+        with self._repos_lock:
+            if not self.repo_exists(repo_name):
+                self.log.info(
+                    "Creating Quay repository %s",
+                    f"{self.org}/{repo_name}",
+                )
+                return self.repo_create(repo_name)
 
         self.log.info(
             "Quay repository %s already exists.",
@@ -88,27 +117,46 @@ class QuayAPI:
 
     def repo_exists(self, repo_name):
         """
-        Checks if a repo exists.
+        Checks if a repo exists, in the org inventory.
 
         :param repo_name: Name of the repository
         :type repo_name: str
-        :return: response.status_code is 2XX
+        :return: the repository is in the org
         :rtype: bool
         :raise QuayApiError: the operation failed
         """
-        url = f"{self.api_url}/repository/{self.org}/{repo_name}"
-        params = {
-            "includeTags": False,
-            "includeStats": False,
-        }
-        response = self._api(
-            method=requests.get, url=url, dont_raise_for=[404], params=params
-        )
-        return _is_200(response.status_code)
+        with self._repos_lock:
+            if self._repos is None:
+                self._repos = set(self.list_repos())
+                self.log.debug(
+                    f"Found {len(self._repos)} repositories in {self.org}."
+                )
+            return repo_name in self._repos
+
+    def list_repos(self):
+        """
+        Lists the repositories of the org. Quay paginates the listing with a
+        `next_page` cursor, so the pages are fetched one after the other.
+
+        :return: names of the repositories
+        :rtype: list
+        :raise QuayApiError: the operation failed
+        """
+        url = f"{self.api_url}/repository"
+        params = {"namespace": self.org}
+        repos = []
+        while True:
+            body = self._api(method=requests.get, url=url, params=params).json()
+            repos.extend(repo["name"] for repo in body.get("repositories", []))
+            if not body.get("next_page"):
+                return repos
+            params = {"namespace": self.org, "next_page": body["next_page"]}
 
     def repo_create(self, repo_name):
         """
-        Creates a public repository called repo_name.
+        Creates a public repository called repo_name. A repository that
+        already exists, e.g. created by a concurrent job since the org was
+        listed, counts as created.
 
         :param repo_name: Name of the repository
         :type repo_name: str
@@ -124,8 +172,22 @@ class QuayAPI:
             "repository": repo_name,
             "description": "",
         }
-        response = self._api(requests.post, url, json=params)
-        return _is_200(response.status_code)
+        response = self._api(
+            requests.post, url, dont_raise_for=[400], json=params
+        )
+        if response.status_code == 400:
+            if not _already_exists(response):
+                _raise_for_status(response, requests.post, url, json=params)
+            self.log.info(
+                "Quay repository %s was created concurrently.",
+                f"{self.org}/{repo_name}",
+            )
+        created = _is_200(response.status_code) or response.status_code == 400
+        if created:
+            with self._repos_lock:
+                if self._repos is not None:
+                    self._repos.add(repo_name)
+        return created
 
     @retry(hook=retry_hook)
     def _api(self, method, url, dont_raise_for=None, **kwargs):
@@ -146,6 +208,15 @@ def _is_200(status_code):
     return 200 <= status_code < 300
 
 
+def _already_exists(response):
+    try:
+        body = response.json()
+    except ValueError:
+        return False
+    message = body.get("error_message") or body.get("detail") or ""
+    return "already exists" in message.lower()
+
+
 def _raise_for_status(response, method, url, **kwargs):
     try:
         response.raise_for_status()
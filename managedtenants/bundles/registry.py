@@ -1,9 +1,12 @@
 import logging
+import time
 
 import docker
+import requests
 from sretoolbox.utils.logger import get_text_logger
 
 from managedtenants.bundles.exceptions import LocalDockerRegistryError
+from managedtenants.data.paths import BUNDLES_DIR
 
 
 class LocalDockerRegistry:
@@ -19,7 +22,9 @@ class LocalDockerRegistry:
     def __init__(self, name="mtbundles-local-registry", port=5555, debug=False):
         self.client = docker.from_env()
         self.port = port
-        self.registry = f"localhost:{port}"
+        # Not "localhost": sretoolbox's Image only recognizes dotted registry
+        # hosts, and docker trusts 127.0.0.0/8 registries without a CA.
+        self.registry = f"127.0.0.1:{port}"
         self.name = name
         self.log = get_text_logger(
             "managedtenants-bundle-registry",
@@ -40,16 +45,36 @@ class LocalDockerRegistry:
                     "REGISTRY_HTTP_TLS_KEY": "/certs/registry.key",
                 },
                 volumes={
-                    "sharedCertsVol": {"bind": "/certs", "mode": "ro"},
+                    str(BUNDLES_DIR / "certs"): {
+                        "bind": "/certs",
+                        "mode": "ro",
+                    },
                 },
             )
             self.log.debug(f"Created container: {self.container.id}")
+            self.wait_ready()
 
         except docker.errors.APIError as e:
             err_msg = f"failed to run local registry: {e}"
             self.log.error(err_msg)
             raise LocalDockerRegistryError(err_msg)
 
+    def wait_ready(self, timeout=30):
+        """Waits for the registry to answer on its /v2/ endpoint."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                requests.get(
+                    f"https://{self.registry}/v2/", verify=False, timeout=1
+                )
+                return
+            except requests.exceptions.RequestException as e:
+                if time.monotonic() > deadline:
+                    err_msg = f"local registry is not ready: {e}"
+                    self.log.error(err_msg)
+                    raise LocalDockerRegistryError(err_msg)
+                time.sleep(0.2)
+
     def teardown(self):
         try:
             if self.container is not None:
@@ -0,0 +1,182 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+from collections import namedtuple
+
+INDEX_DB_PATH = "/database/index.db"
+
+Package = namedtuple("Package", ["name", "default_channel"])
+Channel = namedtuple("Channel", ["package", "name", "head"])
+CatalogBundle = namedtuple("CatalogBundle", ["name", "version", "bundlepath"])
+UpgradeEdge = namedtuple(
+    "UpgradeEdge", ["package", "channel", "from_bundle", "to_bundle"]
+)
+
+# Lookups by package and by bundle name scan channel_entry without them.
+_INDEXES = [
+    (
+        "CREATE INDEX IF NOT EXISTS mt_channel_entry_package"
+        " ON channel_entry(package_name, channel_name)"
+    ),
+    (
+        "CREATE INDEX IF NOT EXISTS mt_channel_entry_bundle"
+        " ON channel_entry(operatorbundle_name)"
+    ),
+]
+
+
+# (sblaisdo) OPM 1.19.5 uses a busybox distroless container. It does not have
+# sqlite3 or a package manager so it's easier to extract the index.db and
+# inspect it on the host.
+class SQLCatalog:
+    """
+    Inspects an opm sqlite catalog (the index.db of an index image): its
+    packages, channels, bundles and upgrade edges.
+
+    Use from_image() or from_fileobj() to work on a private copy of the
+    database, removed on close(). The constructor opens an existing file
+    read-only.
+
+    :param db_path: path to the index.db.
+    :param read_only: open the database read-only.
+    """
+
+    def __init__(self, db_path, read_only=True):
+        mode = "ro" if read_only else "rw"
+        self.db = sqlite3.connect(f"file:{db_path}?mode={mode}", uri=True)
+        self._workdir = None
+
+    @classmethod
+    def from_image(cls, docker_api, tag, path=INDEX_DB_PATH):
+        """
+        Streams the database out of the `tag` image.
+
+        :param docker_api: ContainerRuntime the image was built with.
+        """
+        return cls._from_copy(
+            lambda f: docker_api.extract_file_from_container(tag, path, f)
+        )
+
+    @classmethod
+    def from_fileobj(cls, fileobj):
+        return cls._from_copy(lambda f: shutil.copyfileobj(fileobj, f))
+
+    @classmethod
+    def _from_copy(cls, write):
+        # sqlite3 only opens paths (Connection.deserialize() needs 3.11), the
+        # copy lives as long as the catalog
+        workdir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(workdir.name, "index.db")
+        try:
+            with open(db_path, "wb") as f:
+                write(f)
+            catalog = cls(db_path, read_only=False)
+        except BaseException:
+            workdir.cleanup()
+            raise
+
+        catalog._workdir = workdir
+        try:
+            with catalog.db:
+                for statement in _INDEXES:
+                    catalog.db.execute(statement)
+        except BaseException:
+            # e.g. not an opm catalog
+            catalog.close()
+            raise
+        return catalog
+
+    def packages(self):
+        return [
+            Package(*row)
+            for row in self.db.execute(
+                "SELECT name, default_channel FROM package ORDER BY name"
+            )
+        ]
+
+    def channels(self, package=None):
+        query = (
+            "SELECT package_name, name, head_operatorbundle_name FROM channel"
+        )
+        return [
+            Channel(*row)
+            for row in self._execute(
+                query, "package_name", package, "package_name, name"
+            )
+        ]
+
+    def bundles(self, package=None):
+        if package is None:
+            rows = self.db.execute(
+                "SELECT name, version, bundlepath FROM operatorbundle"
+                " ORDER BY name"
+            )
+        else:
+            rows = self.db.execute(
+                (
+                    "SELECT DISTINCT ob.name, ob.version, ob.bundlepath FROM"
+                    " channel_entry ce JOIN operatorbundle ob ON ob.name ="
+                    " ce.operatorbundle_name WHERE ce.package_name = ? ORDER BY"
+                    " ob.name"
+                ),
+                (package,),
+            )
+        return [CatalogBundle(*row) for row in rows]
+
+    def upgrade_edges(self, package=None):
+        """The replaces (and skips) edges of every channel."""
+        query = (
+            "SELECT DISTINCT ce.package_name, ce.channel_name,"
+            " prev.operatorbundle_name, ce.operatorbundle_name"
+            " FROM channel_entry ce"
+            " JOIN channel_entry prev ON prev.entry_id = ce.replaces"
+        )
+        return [
+            UpgradeEdge(*row)
+            for row in self._execute(
+                query, "ce.package_name", package, "1, 2, 3, 4"
+            )
+        ]
+
+    def get_bundles(self):
+        """:return: [(name, bundlepath)], one per bundle."""
+        return [(b.name, b.bundlepath) for b in self.bundles()]
+
+    def describe(self):
+        """:return: a human readable summary, one line per item."""
+        lines = []
+        for package in self.packages():
+            lines.append(
+                f"package {package.name} (default channel:"
+                f" {package.default_channel})"
+            )
+            for channel in self.channels(package.name):
+                lines.append(f"  channel {channel.name} -> {channel.head}")
+            for bundle in self.bundles(package.name):
+                lines.append(f"  bundle {bundle.name}: {bundle.bundlepath}")
+            for edge in self.upgrade_edges(package.name):
+                lines.append(
+                    f"  edge {edge.channel}: {edge.from_bundle} ->"
+                    f" {edge.to_bundle}"
+                )
+        return lines
+
+    def _execute(self, query, column, value, order_by):
+        if value is None:
+            return self.db.execute(f"{query} ORDER BY {order_by}")
+        return self.db.execute(
+            f"{query} WHERE {column} = ? ORDER BY {order_by}", (value,)
+        )
+
+    def close(self):
+        self.db.close()
+        if self._workdir is not None:
+            self._workdir.cleanup()
+            self._workdir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -5,18 +5,23 @@ from pathlib import Path
 
 from sretoolbox.utils.logger import get_text_logger
 
-from managedtenants import PostTask, PreTask, Task
-from managedtenants.bundles.cli import MtbundlesCLI
-from managedtenants.core import runner
-from managedtenants.core.addons_loader import load_addons
-from managedtenants.core.addons_loader.exceptions import AddonsLoaderError
 from managedtenants.core.status import Status
-from managedtenants.core.tasks_loader import load_tasks
 from managedtenants.core.version import VERSION
 from managedtenants.data.environments import ENVIRONMENTS
+from managedtenants.data.formats import REPORT_FORMATS, SSS_OUTPUT_FORMATS
+from managedtenants.utils.profiling import PhaseProfile, set_sink
+
+# Only the modules needed to build the argument parser are imported here. Each
+# subcommand imports what it needs when it runs, so `--version` or `load` do
+# not pay for the container tooling (docker, podman, gitlab...) used by
+# `bundles`. tests/cli/test_import_time.py keeps an eye on it.
+# pylint: disable=import-outside-toplevel
 
 APP_LOG = get_text_logger("name")
 
+# Subcommands that never read the addons dir.
+_SUBCOMMANDS_WITHOUT_ADDONS = {"serve", "tools"}
+
 
 class Cli:
     def __init__(self):
@@ -40,8 +45,11 @@ class Cli:
         parser.add_argument(
             "--addons-dir",
             type=self._validate_addons_dir,
-            required=True,
-            help='[path] "path" for the addons directory',
+            default=None,
+            help=(
+                '[path] "path" for the addons directory. Required by all the'
+                " subcommands but serve and tools"
+            ),
         )
         parser.add_argument(
             "--ocm-api", help="Override the environments OCM API"
@@ -73,12 +81,84 @@ class Cli:
             default=False,
             help="Enable the debug messages",
         )
+        parser.add_argument(
+            "--profile",
+            metavar="DIR",
+            default=None,
+            help=(
+                "[path] time the addons loading phases and write a per-addon"
+                " breakdown (phases.json) and collapsed stacks for flamegraphs"
+                " (profile.collapsed) to DIR"
+            ),
+        )
 
         subcommands = parser.add_subparsers(
             title="subcommands", help="subcommand help", dest="subcommand"
         )
 
-        subcommands.add_parser("load", help="Loads the addons inventory")
+        load_parser = subcommands.add_parser(
+            "load", help="Loads the addons inventory"
+        )
+        load_parser.add_argument(
+            "--output",
+            choices=SSS_OUTPUT_FORMATS,
+            default=None,
+            help=(
+                "Stream the rendered SelectorSyncSet of each addon, one"
+                " document per addon"
+            ),
+        )
+        load_parser.add_argument(
+            "--output-file",
+            default="-",
+            help="[path] file to write --output to. Default: stdout",
+        )
+        load_parser.add_argument(
+            "--all-errors",
+            action="store_true",
+            default=False,
+            help=(
+                "Validate all the addons in parallel and report all their"
+                " errors instead of stopping at the first one"
+            ),
+        )
+        load_parser.add_argument(
+            "--diff-against",
+            metavar="GIT_REF",
+            default=None,
+            help=(
+                "Only load the addons changed since GIT_REF and print a"
+                " structural diff of their rendered SelectorSyncSets"
+            ),
+        )
+
+        watch_parser = subcommands.add_parser(
+            "watch",
+            help=(
+                "Loads the addons inventory once and reloads the addons whose"
+                " files change"
+            ),
+        )
+        watch_parser.add_argument(
+            "--interval",
+            type=float,
+            default=0.5,
+            help="Seconds between two checks of the addons dir. Default: 0.5",
+        )
+
+        serve_parser = subcommands.add_parser(
+            "serve",
+            help=(
+                "Serves the metadata, imageset and mtbundles schema validation"
+                " over HTTP"
+            ),
+        )
+        serve_parser.add_argument(
+            "--host", default="127.0.0.1", help="Address to listen on"
+        )
+        serve_parser.add_argument(
+            "--port", type=int, default=8080, help="Port to listen on"
+        )
 
         run_parser = subcommands.add_parser("run", help="Runs the tasks")
         run_parser.add_argument(
@@ -91,6 +171,46 @@ class Cli:
             ),
         )
 
+        run_parser.add_argument(
+            "--report",
+            metavar="PATH",
+            default=None,
+            help="[path] write a per-task timing and HTTP usage report",
+        )
+        run_parser.add_argument(
+            "--report-format",
+            choices=REPORT_FORMATS,
+            default="json",
+            help="Format of the --report file",
+        )
+        run_parser.add_argument(
+            "--top",
+            type=int,
+            default=10,
+            help="Number of slowest tasks to print at the end of the run",
+        )
+
+        tools_parser = subcommands.add_parser(
+            "tools", help="Manages the binaries used by `bundles`"
+        )
+        tools_subcommands = tools_parser.add_subparsers(
+            title="tools subcommands", dest="tools_subcommand", required=True
+        )
+        prefetch_parser = tools_subcommands.add_parser(
+            "prefetch",
+            help=(
+                "Downloads opm, mtcli, operator-sdk and kubectl-package in"
+                " parallel to $MANAGEDTENANTS_CACHE_DIR/bin (default:"
+                " ~/.cache/managedtenants/bin), shared by concurrent runs"
+            ),
+        )
+        prefetch_parser.add_argument(
+            "--jobs",
+            type=int,
+            default=None,
+            help="Number of parallel downloads. Default: one per binary",
+        )
+
         bundles_parser_examples = [
             "Examples:",
             "# Build all bundles and index images locally.",
@@ -99,6 +219,12 @@ class Cli:
                 " --build-with tag"
             ),
             "",
+            (
+                "# Build and validate all bundles and index images against a"
+                " local registry."
+            ),
+            "$ managedtenants --addons-dir=PATH bundles --local-registry",
+            "",
             (
                 "# Build and push all bundles and index images to a custom quay"
                 " org."
@@ -123,7 +249,10 @@ class Cli:
                 "managedtenants --addons-dir ADDONS_DIR [--addon-name"
                 " ADDON_NAME] [--dry-run] [--debug]"
                 " bundles [-h] [--build-with {tag,digest}] [--quay-org QUAY_ORG"
-                "] [--force-push] [--enable-gitlab] [--base-index-image IMAGE]"
+                "] [--force-push] [--daemonless] [--mirror REGISTRY/ORG]"
+                " [--local-registry] [--no-validation-cache]"
+                " [--enable-gitlab]"
+                " [--base-index-image IMAGE]"
             ),
         )
         bundles_parser.add_argument(
@@ -140,6 +269,48 @@ class Cli:
             default=False,
             help="Overwrite an existing image in the quay repository.",
         )
+        bundles_parser.add_argument(
+            "--daemonless",
+            action="store_true",
+            default=False,
+            help=(
+                "Assemble the bundle and package images in memory and push"
+                " them with the registry API, without docker or podman."
+                " Index images are still built by opm."
+            ),
+        )
+        bundles_parser.add_argument(
+            "--mirror",
+            action="append",
+            default=[],
+            metavar="REGISTRY/ORG",
+            help=(
+                "Also push the bundle and package images to REGISTRY/ORG, e.g."
+                " quay.io/osd-addons-staging. Can be repeated. Requires"
+                " --daemonless."
+            ),
+        )
+        bundles_parser.add_argument(
+            "--local-registry",
+            action="store_true",
+            default=False,
+            help=(
+                "Push every image to a local registry started for the run"
+                " instead of quay.io, and validate the resulting index"
+                " image. Nothing leaves the machine. Requires docker."
+            ),
+        )
+        bundles_parser.add_argument(
+            "--no-validation-cache",
+            action="store_true",
+            default=False,
+            help=(
+                "Validate every bundle and package, even those that passed"
+                " validation before with the same content and tool versions."
+                " The cache lives in $MANAGEDTENANTS_CACHE_DIR (default:"
+                " ~/.cache/managedtenants)."
+            ),
+        )
         bundles_parser.add_argument(
             "--enable-gitlab",
             action="store_true",
@@ -180,6 +351,11 @@ class Cli:
         )
 
         self.args = parser.parse_args()
+        if (
+            self.args.addons_dir is None
+            and self.args.subcommand not in _SUBCOMMANDS_WITHOUT_ADDONS
+        ):
+            parser.error("the following arguments are required: --addons-dir")
 
         self.search = None
         self.tasks_path = None
@@ -208,8 +384,37 @@ class Cli:
         raise argparse.ArgumentTypeError(f"not found: {path}")
 
     def run(self):
+        if self.args.profile is None:
+            self._run_subcommand()
+            return
+
+        profile = PhaseProfile()
+        set_sink(profile)
+        try:
+            self._run_subcommand()
+        finally:
+            set_sink(None)
+            profile_dir = Path(self.args.profile)
+            profile_dir.mkdir(parents=True, exist_ok=True)
+            profile.write_breakdown(profile_dir / "phases.json")
+            profile.write_collapsed(profile_dir / "profile.collapsed")
+
+    def _run_subcommand(self):
         if self.args.subcommand == "load":
-            self._load_addons()
+            if self.args.diff_against is not None:
+                self._diff_addons()
+            elif self.args.all_errors:
+                self._validate_addons()
+            elif self.args.output is not None:
+                self._dump_addons()
+            else:
+                self._load_addons(keep=False)
+
+        elif self.args.subcommand == "watch":
+            self._watch_addons()
+
+        elif self.args.subcommand == "serve":
+            self._serve()
 
         elif self.args.subcommand == "run":
             if ":" in self.args.tasks_reference:
@@ -226,17 +431,34 @@ class Cli:
         elif self.args.subcommand == "bundles":
             self._build_bundles()
 
-    def _load_addons(self):
+        elif self.args.subcommand == "tools":
+            self._prefetch_tools()
+
+    def _load_addons(self, keep=True):
+        """
+        :param keep: Return the loaded addons. Otherwise the addons are only
+            validated and dropped one by one as they are loaded.
+        """
+        from managedtenants.core.addons_loader import iter_addons, load_addons
+        from managedtenants.core.addons_loader.exceptions import (
+            AddonsLoaderError,
+        )
+
         addons_path = Path(self.args.addons_dir)
         addon_name = self.args.addon_name
         try:
             APP_LOG.info("Loading %s...", self.args.environment)
-            addons_factory = load_addons(
+            loader = load_addons if keep else iter_addons
+            addons_factory = loader(
                 path=addons_path,
                 environment=self.args.environment,
                 addon_name=addon_name,
                 args=self.args,
             )
+            if not keep:
+                for _ in addons_factory:
+                    pass
+                addons_factory = None
             APP_LOG.info("Loading %s OK", self.args.environment)
             return addons_factory
         except AddonsLoaderError as details:
@@ -247,42 +469,176 @@ class Cli:
             self.status |= Status.ADDONS_LOAD_ERROR
         sys.exit(self.status)
 
-    def _run(self):
-        addons_factory = self._load_addons()
-        tasks_factory = load_tasks(
-            addons_factory=addons_factory,
+    def _validate_addons(self):
+        from managedtenants.core.addons_loader import validate_addons
+
+        APP_LOG.info("Validating %s...", self.args.environment)
+        invalid_addons = validate_addons(
+            path=Path(self.args.addons_dir),
+            environment=self.args.environment,
+            addon_name=self.args.addon_name,
             args=self.args,
-            tasks_path=self.tasks_path,
-            task_type=PreTask,
-            search=self.search,
         )
-        if tasks_factory:
-            APP_LOG.info("== PRETASKS ".ljust(80, "="))
-            runner.run(tasks_factory=tasks_factory)
+        if not invalid_addons:
+            APP_LOG.info("Validating %s OK", self.args.environment)
+            return
 
-        tasks_factory = load_tasks(
-            addons_factory=addons_factory,
-            args=self.args,
-            tasks_path=self.tasks_path,
-            task_type=Task,
-            search=self.search,
+        for addon_name, errors in sorted(invalid_addons.items()):
+            APP_LOG.error("[%s] %s error(s):", addon_name, len(errors))
+            for error in errors:
+                APP_LOG.error("[%s]   - %s", addon_name, error)
+        APP_LOG.error(
+            "Validating %s FAILED: %s invalid addon(s)",
+            self.args.environment,
+            len(invalid_addons),
         )
-        if tasks_factory:
-            APP_LOG.info("== TASKS ".ljust(80, "="))
-            runner.run(tasks_factory=tasks_factory)
+        self.status |= Status.ADDONS_LOAD_ERROR
+        sys.exit(self.status)
 
-        tasks_factory = load_tasks(
-            addons_factory=addons_factory,
-            args=self.args,
-            tasks_path=self.tasks_path,
-            task_type=PostTask,
-            search=self.search,
+    def _dump_addons(self):
+        from managedtenants.core.addons_loader import iter_addons
+        from managedtenants.core.addons_loader.exceptions import (
+            AddonsLoaderError,
         )
-        if tasks_factory:
-            APP_LOG.info("== POSTTASKS ".ljust(80, "="))
-            runner.run(tasks_factory=tasks_factory)
+        from managedtenants.core.addons_loader.sss import write_sss
+
+        to_stdout = self.args.output_file == "-"
+        try:
+            addons_factory = iter_addons(
+                path=Path(self.args.addons_dir),
+                environment=self.args.environment,
+                addon_name=self.args.addon_name,
+                args=self.args,
+            )
+            if to_stdout:
+                # logs also go to stdout and would corrupt the documents
+                write_sss(addons_factory, self.args.output, sys.stdout)
+                return
+
+            APP_LOG.info("Loading %s...", self.args.environment)
+            with open(self.args.output_file, "w", encoding="utf-8") as f:
+                count = write_sss(addons_factory, self.args.output, f)
+            APP_LOG.info(
+                "Loading %s OK: wrote %s addons to %s",
+                self.args.environment,
+                count,
+                self.args.output_file,
+            )
+            return
+        except AddonsLoaderError as details:
+            APP_LOG.error("[%s] %s", type(details).__name__, details)
+            self.status |= Status.ADDONS_LOAD_ERROR
+        except Exception:  # pylint: disable=broad-except
+            APP_LOG.exception("[ERROR]")
+            self.status |= Status.ADDONS_LOAD_ERROR
+        sys.exit(self.status)
+
+    def _diff_addons(self):
+        from managedtenants.core.addons_loader.exceptions import (
+            AddonsLoaderError,
+        )
+        from managedtenants.core.sss_diff import diff_addons
+        from managedtenants.utils.git import GitError
+
+        ref = self.args.diff_against
+        try:
+            APP_LOG.info("Diffing %s against %s...", self.args.environment, ref)
+            diffs = diff_addons(
+                addons_dir=Path(self.args.addons_dir),
+                environment=self.args.environment,
+                ref=ref,
+                addon_name=self.args.addon_name,
+            )
+        except (AddonsLoaderError, GitError) as details:
+            APP_LOG.error("[%s] %s", type(details).__name__, details)
+            self.status |= Status.ADDONS_LOAD_ERROR
+            sys.exit(self.status)
+
+        for addon_name, changes in diffs:
+            print(f"=== {addon_name} ({ref} -> working tree)")
+            if not changes:
+                print("no changes")
+            for change in changes:
+                print(change)
+        APP_LOG.info("Diffing %s OK", self.args.environment)
+
+    def _watch_addons(self):
+        from managedtenants.core.watcher import AddonsWatcher
+
+        watcher = AddonsWatcher(
+            addons_dir=Path(self.args.addons_dir),
+            environment=self.args.environment,
+            log=APP_LOG,
+            addon_name=self.args.addon_name,
+        )
+        APP_LOG.info("Loading %s...", self.args.environment)
+        watcher.load_all()
+        APP_LOG.info(
+            "Watching %s addons in %s (%s with errors), press Ctrl-C to stop",
+            len(watcher.addons) + len(watcher.errors),
+            self.args.addons_dir,
+            len(watcher.errors),
+        )
+        try:
+            watcher.watch(interval=self.args.interval)
+        except KeyboardInterrupt:
+            pass
+
+    def _serve(self):
+        from managedtenants.core.validation_server import make_server
+
+        server = make_server(host=self.args.host, port=self.args.port)
+        host, port = server.server_address[:2]
+        APP_LOG.info("Serving schema validation on http://%s:%s", host, port)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+    def _run(self):
+        from managedtenants import PostTask, PreTask, Task
+        from managedtenants.core import runner
+        from managedtenants.core.report import RunReport
+        from managedtenants.core.tasks_loader import load_tasks
+
+        addons_factory = self._load_addons()
+        report = RunReport()
+        try:
+            for title, task_type in [
+                ("PRETASKS", PreTask),
+                ("TASKS", Task),
+                ("POSTTASKS", PostTask),
+            ]:
+                tasks_factory = load_tasks(
+                    addons_factory=addons_factory,
+                    args=self.args,
+                    tasks_path=self.tasks_path,
+                    task_type=task_type,
+                    search=self.search,
+                )
+                runner.run(
+                    tasks_factory=tasks_factory, title=title, report=report
+                )
+        finally:
+            # also report on failures, runner.run() exits on the first one
+            report.log_slowest(APP_LOG, self.args.top)
+            if self.args.report is not None:
+                report.write(self.args.report, self.args.report_format)
+
+    def _prefetch_tools(self):
+        from managedtenants.bundles.binary_deps import prefetch
+
+        APP_LOG.info("Prefetching binaries...")
+        commands = prefetch(max_workers=self.args.jobs)
+        for name, command in commands.items():
+            APP_LOG.info("%s: %s", name, command)
+        APP_LOG.info("Prefetching binaries OK")
 
     def _build_bundles(self):
+        from managedtenants.bundles.cli import MtbundlesCLI
+
         cli = MtbundlesCLI(args=self.args)
         cli.run()
 
@@ -1,30 +1,154 @@
+import argparse
+import glob
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 
-import jsonschema
 import yaml
 
-from managedtenants.data.paths import SCHEMAS_DIR
-from managedtenants.utils.schema import load_schema
+from managedtenants.utils.schema import get_validator, load_documents, locate
 
+STDIN = "-"
 
-def main():
+# Below this number of files, spawning worker processes costs more than it
+# saves.
+MIN_FILES_PER_JOB = 8
+
+
+def expand_paths(patterns):
+    """
+    Expands globs (including "**") and directories into the sorted list of
+    files to validate. "-" stands for stdin.
+    """
+    res = []
+    for pattern in patterns:
+        if pattern == STDIN:
+            res.append(STDIN)
+            continue
+        for path in sorted(glob.glob(pattern, recursive=True)) or [pattern]:
+            if os.path.isdir(path):
+                res.extend(
+                    sorted(
+                        glob.glob(
+                            os.path.join(path, "**", "*.y*ml"), recursive=True
+                        )
+                    )
+                )
+            else:
+                res.append(path)
+    return list(dict.fromkeys(res))
+
+
+def validate_content(content, filename):
+    """
+    Validates every document of a YAML stream against the imageset schema.
+
+    :return: ([(filename, line, message), ...], number of documents)
+        where line is 1-based, None when it does not apply.
+    """
     try:
-        data = yaml.safe_load(sys.stdin)
+        documents = load_documents(content)
+    except yaml.MarkedYAMLError as exc:
+        line = exc.problem_mark.line + 1 if exc.problem_mark else 1
+        return [(filename, line, f"Invalid yaml: {exc.problem}")], 0
     except yaml.YAMLError as exc:
-        print(f"Invalid yaml: {exc}")
-        sys.exit(1)
+        return [(filename, 1, f"Invalid yaml: {exc}")], 0
+
+    # "---" separators produce empty documents, ignore them unless the
+    # whole stream is empty
+    documents = [(node, data) for node, data in documents if data is not None]
+    if not documents:
+        return [(filename, 1, "Schema validation failed: empty document")], 0
+
+    validator = get_validator("imageset")
+    errors = []
+    for node, data in documents:
+        for error in validator.iter_errors(data):
+            errors.append(
+                (
+                    filename,
+                    locate(node, error.absolute_path),
+                    f"Schema validation failed: {error.message}",
+                )
+            )
+    return sorted(errors, key=lambda e: e[1]), len(documents)
 
+
+def validate_file(path):
+    if path == STDIN:
+        return validate_content(sys.stdin.read(), "<stdin>")
     try:
-        jsonschema.validate(
-            instance=data,
-            schema=load_schema("imageset"),
-            resolver=jsonschema.RefResolver(
-                base_uri=f"file://{SCHEMAS_DIR}/",
-                referrer="imageset.schema.yaml",
+        with open(path, encoding="utf-8") as f:
+            content = f.read()
+    except OSError as exc:
+        return [(path, None, f"Unreadable file: {exc.strerror}")], 0
+    return validate_content(content, path)
+
+
+def _validate_all(paths, jobs):
+    if jobs <= 1 or STDIN in paths:
+        yield from map(validate_file, paths)
+        return
+
+    # each worker compiles the validator once and reuses it for all the files
+    # it is sent
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(
+            validate_file, paths, chunksize=max(1, len(paths) // (jobs * 4))
+        )
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="validate-imageset",
+        description=(
+            "Validates addon imagesets against the imageset schema. Reads a"
+            " single stream from stdin when no path is given."
+        ),
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        default=[STDIN],
+        help=(
+            "Files, directories or globs (e.g."
+            " 'addons/*/addonimagesets/**/*.yml') to validate. Files may"
+            " contain several YAML documents. Use '-' for stdin."
+        ),
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of files validated in parallel. Default: number of CPUs",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    paths = expand_paths(args.paths)
+
+    jobs = min(args.jobs, max(1, len(paths) // MIN_FILES_PER_JOB))
+
+    n_errors = n_documents = 0
+    for errors, documents in _validate_all(paths, jobs):
+        n_documents += documents
+        for filename, line, message in errors:
+            location = filename if line is None else f"{filename}:{line}"
+            print(f"{location}: {message}")
+        n_errors += len(errors)
+
+    if len(paths) > 1:
+        print(
+            (
+                f"{n_errors} errors in {n_documents} imagesets from"
+                f" {len(paths)} files"
             ),
+            file=sys.stderr,
         )
-    except (jsonschema.SchemaError, jsonschema.ValidationError) as exc:
-        print(f"Schema validation failed {exc}")
+    if n_errors:
         sys.exit(1)
 
 
@@ -1,13 +1,76 @@
+from concurrent.futures import ProcessPoolExecutor
+
 from managedtenants.core.addons_loader.addon import Addon
+from managedtenants.core.addons_loader.exceptions import AddonsLoaderError
 from managedtenants.utils.git import ChangeDetector
+from managedtenants.utils.profiling import ADDON_FRAME_PREFIX, phase
 
 
 def instantiate_addon(args):
-    # TODO: Remove `imageset_latest_only` arg
-    return Addon(path=args[0], environment=args[1], imageset_latest_only=True)
+    with phase(f"{ADDON_FRAME_PREFIX}{args[0].name}"):
+        # TODO: Remove `imageset_latest_only` arg
+        return Addon(
+            path=args[0], environment=args[1], imageset_latest_only=True
+        )
+
+
+def collect_addon_errors(args):
+    """
+    Loads an addon in collect_errors mode.
+
+    :return: (addon name, [error messages]), no errors for a valid addon.
+    """
+    path, environment = args
+    try:
+        Addon(
+            path=path,
+            environment=environment,
+            imageset_latest_only=True,
+            collect_errors=True,
+        )
+    except AddonsLoaderError as details:
+        return path.name, getattr(details, "errors", [str(details)])
+    except Exception as details:  # pylint: disable=broad-except
+        return path.name, [f"[{type(details).__name__}] {details}"]
+    return path.name, []
+
+
+def validate_addons(path, environment, addon_name, args):
+    """
+    Validates all the addons in parallel and reports every error of every
+    addon, instead of stopping at the first one.
+
+    :return: {addon name: [error messages]} for the invalid addons.
+    """
+    addons_to_load = get_addons_to_load(path, environment, addon_name, args)
+    with ProcessPoolExecutor() as executor:
+        results = executor.map(
+            collect_addon_errors,
+            addons_to_load,
+            chunksize=max(1, len(addons_to_load) // 64),
+        )
+        return {name: errors for name, errors in results if errors}
 
 
 def load_addons(path, environment, addon_name, args):
+    # force list to not lazily evaluate the returned iterator
+    return list(iter_addons(path, environment, addon_name, args))
+
+
+def iter_addons(path, environment, addon_name, args):
+    """
+    Returns an iterator that instantiates each addon only when it is
+    consumed. Callers that do not keep a reference to the yielded addons only
+    ever hold a single addon in memory.
+    """
+    addons_to_load = get_addons_to_load(path, environment, addon_name, args)
+    return map(instantiate_addon, addons_to_load)
+
+
+def get_addons_to_load(path, environment, addon_name, args):
+    """
+    Returns the (addon path, environment) pairs to load.
+    """
     addons_to_load = []
 
     for candidate in get_candidates(path, args):
@@ -20,12 +83,7 @@ def load_addons(path, environment, addon_name, args):
             if env_path.name != environment:
                 continue
             addons_to_load.append((candidate, environment))
-
-    if not addons_to_load:
-        return []
-
-    # force list to not lazily evaluate the returned iterator of map()
-    return list(map(instantiate_addon, addons_to_load))
+    return addons_to_load
 
 
 def get_candidates(path, args):
@@ -4,17 +4,20 @@ import jsonschema
 import semver
 import yaml
 from jinja2 import FileSystemLoader
-from sretoolbox.container import Image
+from jsonschema.exceptions import best_match
 
 from managedtenants.core.addon_manager import AddonManager
 from managedtenants.core.addons_loader.bundle import Bundle
-from managedtenants.core.addons_loader.exceptions import AddonLoadError
+from managedtenants.core.addons_loader.exceptions import (
+    AddonLoadError,
+    AddonValidationError,
+)
 from managedtenants.core.addons_loader.package import Package
 from managedtenants.core.addons_loader.sss import Sss
-from managedtenants.data.paths import SCHEMAS_DIR
 from managedtenants.utils.general_utils import parse_version_from_imageset_name
 from managedtenants.utils.hash import hash_dir_sha256, hash_sha256
-from managedtenants.utils.schema import load_schema
+from managedtenants.utils.profiling import phase
+from managedtenants.utils.schema import format_error_path, get_validator
 
 # IDs of addons that are managed by the addon-operator
 # These addon IDs _MUST_ be stable and not changed or bad things will happen
@@ -23,7 +26,87 @@ _ADDON_OPERATOR_ADDON_IDS = []
 _PERMITTED_SUBSCRIPTION_CONFIGS = ["env"]
 
 
+_YAML_STR = "tag:yaml.org,2002:str"
+_YAML_SEQ = "tag:yaml.org,2002:seq"
+_YAML_MAP = "tag:yaml.org,2002:map"
+
+
+class _SlowPath(Exception):
+    """The document uses YAML features the fast path does not handle."""
+
+
 class UniqueYAMLKeyLoader(yaml.CSafeLoader):
+    """
+    Rejects mappings with duplicate keys.
+
+    Plain documents (maps, seqs and scalar keys, i.e. every addon.yaml) are
+    constructed in a single iterative pass over the node tree composed by the
+    C parser, checking the keys along the way. This skips the generators and
+    per-node bookkeeping of the pure Python SafeConstructor. Anything else
+    (merge keys, complex keys, custom tags...) goes through the regular
+    constructor and construct_mapping() below.
+    """
+
+    def construct_document(self, node):
+        try:
+            return self._construct_plain_document(node)
+        except _SlowPath:
+            return super().construct_document(node)
+        finally:
+            self.constructed_objects = {}
+            self.recursive_objects = {}
+
+    def _construct_plain_document(self, root):
+        # {id(node): list or dict}, keeps aliases pointing to the same object
+        containers = {}
+        pending = []
+
+        def construct(node):
+            tag = node.tag
+            if tag == _YAML_STR:
+                return node.value
+            obj = containers.get(id(node))
+            if obj is not None:
+                return obj
+            if tag == _YAML_MAP:
+                obj = {}
+            elif tag == _YAML_SEQ:
+                obj = []
+            elif isinstance(node, yaml.ScalarNode):
+                return self.construct_object(node, deep=True)
+            else:
+                raise _SlowPath()
+            containers[id(node)] = obj
+            pending.append((node, obj))
+            return obj
+
+        res = construct(root)
+        while pending:
+            node, obj = pending.pop()
+            if isinstance(obj, list):
+                obj.extend(map(construct, node.value))
+                continue
+
+            duplicates = []
+            for key_node, value_node in node.value:
+                if key_node.tag == _YAML_STR:
+                    key = key_node.value
+                elif isinstance(key_node, yaml.ScalarNode) and key_node.tag in (
+                    self.yaml_constructors
+                ):
+                    key = self.construct_object(key_node, deep=True)
+                else:
+                    # merge keys, complex keys
+                    raise _SlowPath()
+                if key in obj:
+                    duplicates.append(key)
+                obj[key] = construct(value_node)
+            if duplicates:
+                raise yaml.error.MarkedYAMLError(
+                    f"Duplicate key(s) found in addon.yaml : {duplicates}"
+                )
+        return res
+
     def construct_mapping(self, node, deep=False):
         mapping = set()
         duplicates = []
@@ -40,16 +123,44 @@ class UniqueYAMLKeyLoader(yaml.CSafeLoader):
 
 
 class Addon:
+    """
+    :param collect_errors: Run all the validations of a step and raise a
+        single AddonValidationError listing all their errors, instead of
+        raising on the first one.
+    """
+
+    # Thousands of addons can be loaded at once, don't give each one a dict.
+    __slots__ = (
+        "path",
+        "collect_errors",
+        "extra_resources_loader",
+        "metadata",
+        "imageset_version",
+        "imageset_latest_only",
+        "imagesets_path",
+        "imageset",
+        "bundles",
+        "package",
+        "catalog_image",
+        "image_tag",
+        "manager",
+        "sss",
+    )
+
+    # pylint: disable=too-many-arguments
     def __init__(
         self,
         path,
         environment,
         override_manager=None,
         imageset_latest_only=False,
+        collect_errors=False,
     ):
         self.path = path
+        self.collect_errors = collect_errors
         self.extra_resources_loader = None
-        self.metadata = self.load_metadata(environment=environment)
+        with phase("load_metadata"):
+            self.metadata = self.load_metadata(environment=environment)
 
         if "addonImageSetVersion" in self.metadata:
             self.imageset_version = self.metadata.get("addonImageSetVersion")
@@ -76,7 +187,8 @@ class Addon:
                 self.imagesets_path = (
                     self.path / f"addonimagesets/{environment}"
                 )
-                self.imageset = self.load_imageset(self.imageset_version)
+                with phase("load_imageset"):
+                    self.imageset = self.load_imageset(self.imageset_version)
                 self.package = None
                 self.bundles = None
                 self.catalog_image = self.imageset["indexImage"]
@@ -92,7 +204,8 @@ class Addon:
             # we have to clean this up
             self.imagesets_path = None
             self.imageset = None
-            self.bundles = self.load_bundles(metadata=self.metadata)
+            with phase("load_bundles"):
+                self.bundles = self.load_bundles(metadata=self.metadata)
             self.package = Package(addon=self)
             self.catalog_image = self.get_image_name(environment=environment)
         self.image_tag = (  # Used with .format(hash=...)
@@ -100,9 +213,12 @@ class Addon:
         )
 
         # We can only run these validations after the imageset is loaded.
-        self._validate_additional_catalogue_srcs()
-        self._validate_secret_names()
-        self._validate_pullSecretName()
+        with phase("validate"):
+            self._run_validations(
+                self._validate_additional_catalogue_srcs,
+                self._validate_secret_names,
+                self._validate_pullSecretName,
+            )
 
         if self.metadata["id"] not in _ADDON_OPERATOR_ADDON_IDS:
             self.manager = AddonManager.UKNOWN
@@ -112,7 +228,8 @@ class Addon:
         if override_manager is not None:
             self.manager = override_manager
 
-        self.sss = Sss(addon=self)
+        with phase("sss"):
+            self.sss = Sss(addon=self)
 
     @property
     def name(self):
@@ -183,6 +300,11 @@ class Addon:
 
         hash_tag = hash_sha256(items=(bundles_hash, metadata_hash))
 
+        # sretoolbox.container pulls in skopeo and distutils, only pay for
+        # it when an image name is actually needed.
+        # pylint: disable=import-outside-toplevel
+        from sretoolbox.container import Image
+
         return Image(
             f'{self.metadata["quayRepo"]}:{environment}-{hash_tag[:7]}'
         )
@@ -192,20 +314,42 @@ class Addon:
         metadata_dir = self.path / "metadata" / environment
 
         try:
-            with open(metadata_path, encoding="utf8") as file_obj:
-                metadata = yaml.load(
-                    file_obj.read(), Loader=UniqueYAMLKeyLoader
-                )
+            with phase("yaml"), open(metadata_path, encoding="utf8") as f:
+                metadata = yaml.load(f.read(), Loader=UniqueYAMLKeyLoader)
         except yaml.error.MarkedYAMLError as details:
             raise AddonLoadError(f"{metadata_path}: {details}")
 
-        self._validate_schema_instance(metadata, "metadata")
-        self._validate_extra_resources(environment, metadata)
+        self._run_validations(
+            lambda: self._validate_schema_instance(metadata, "metadata"),
+            lambda: self._validate_extra_resources(environment, metadata),
+        )
 
         if "extraResources" in metadata:
             self.extra_resources_loader = FileSystemLoader(str(metadata_dir))
         return metadata
 
+    def _run_validations(self, *validations):
+        """
+        Runs every validation, even after one failed when collecting errors.
+        """
+        errors = []
+        for validate in validations:
+            try:
+                validate()
+            except AddonValidationError as details:
+                errors.extend(details.errors)
+            except AddonLoadError as details:
+                if not self.collect_errors:
+                    raise
+                errors.append(str(details))
+        if errors:
+            raise AddonValidationError(self.path, errors)
+
+    def _raise_errors(self, errors):
+        if self.collect_errors:
+            raise AddonValidationError(self.path, errors)
+        raise AddonLoadError(errors[0])
+
     def _validate_additional_catalogue_srcs(self):
         additional_catalog_srcs = self.get_additional_catalog_srcs()
         if additional_catalog_srcs:
@@ -253,9 +397,10 @@ class Addon:
         def is_not_none(arg):
             return arg is not None
 
-        imageset_yamls = map(self.load_yaml, self.get_available_imagesets())
-        valid_imagesets = filter(is_not_none, imageset_yamls)
-        imageset = self.get_target_imageset(imagesets_iter=valid_imagesets)
+        with phase("yaml"):
+            imageset_yamls = map(self.load_yaml, self.get_available_imagesets())
+            valid_imagesets = filter(is_not_none, imageset_yamls)
+            imageset = self.get_target_imageset(imagesets_iter=valid_imagesets)
         self._validate_schema_instance(imageset, "imageset")
         return imageset
 
@@ -297,37 +442,54 @@ class Addon:
 
     def _validate_schema_instance(self, instance, schema_name):
         try:
-            jsonschema.validate(
-                instance=instance,
-                schema=load_schema(schema_name),
-                resolver=jsonschema.RefResolver(
-                    base_uri=f"file://{SCHEMAS_DIR}/",
-                    referrer=f"{schema_name}.schema.yaml",
-                ),
-            )
+            with phase("schema"):
+                errors = list(get_validator(schema_name).iter_errors(instance))
         except ValueError as details:
             raise AddonLoadError(
                 f"Invalid schema name error: {details}"
             ) from details
         except jsonschema.exceptions.SchemaError as details:
+            # raised by get_validator() when it loads an invalid schema
             raise AddonLoadError(
                 f"{schema_name} schema error: {details.message}"
             ) from details
-        except jsonschema.exceptions.ValidationError as details:
+
+        if not errors:
+            return
+        if not self.collect_errors:
+            # same error as jsonschema.validate() would raise
             raise AddonLoadError(
-                f"{self.path} validation error: {details.message}"
-            ) from details
+                f"{self.path} validation error: {best_match(errors).message}"
+            )
+        self._raise_errors(
+            [
+                f"{schema_name} validation error at"
+                f" {format_error_path(error.absolute_path)}: {error.message}"
+                for error in sorted(
+                    errors, key=lambda e: list(map(str, e.path))
+                )
+            ]
+        )
 
     def _validate_extra_resources(self, environment, metadata):
-        if "extraResources" not in metadata:
+        resources = metadata.get("extraResources")
+        # also runs when collecting errors after a failed schema validation,
+        # which already reports a malformed extraResources
+        if not isinstance(resources, list):
             return
 
-        for resource in metadata["extraResources"]:
-            resource_path = self.path / "metadata" / environment / resource
-            if not resource_path.is_file():
-                raise AddonLoadError(
-                    f"referenced resource {resource_path} not found"
-                )
+        errors = []
+        with phase("extra_resources"):
+            for resource in resources:
+                if not isinstance(resource, str):
+                    continue
+                resource_path = self.path / "metadata" / environment / resource
+                if not resource_path.is_file():
+                    errors.append(
+                        f"referenced resource {resource_path} not found"
+                    )
+        if errors:
+            self._raise_errors(errors)
 
     @staticmethod
     def instantiate_bundle(args):
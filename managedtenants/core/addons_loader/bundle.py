@@ -1,11 +1,13 @@
 from managedtenants.core.addons_loader.exceptions import BundleLoadError
 from managedtenants.core.addons_loader.manifest import Manifest
+from managedtenants.utils.profiling import phase
 
 
 class Bundle:
     def __init__(self, path, metadata):
         self.path = path
-        self.manifests = self._load_manifests(metadata=metadata)
+        with phase(f"bundle:{self.name}"):
+            self.manifests = self._load_manifests(metadata=metadata)
 
     @property
     def name(self):
@@ -8,6 +8,20 @@ class AddonLoadError(AddonsLoaderError):
     pass
 
 
+class AddonValidationError(AddonLoadError):
+    """
+    Raised by addons loaded with `collect_errors=True`, lists every
+    validation error found instead of the first one only.
+    """
+
+    def __init__(self, path, errors):
+        super().__init__(
+            f"{path}: {len(errors)} validation error(s):\n  - "
+            + "\n  - ".join(errors)
+        )
+        self.errors = errors
+
+
 class BundleLoadError(AddonsLoaderError):
     pass
 
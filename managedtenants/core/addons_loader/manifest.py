@@ -5,6 +5,7 @@ from jinja2 import Environment, FileSystemLoader, StrictUndefined
 from jinja2.exceptions import UndefinedError
 
 from managedtenants.core.addons_loader.exceptions import ManifestLoadError
+from managedtenants.utils.profiling import phase
 
 
 class Manifest:
@@ -26,17 +27,21 @@ class Manifest:
         return json.dumps(self.data, indent=4)
 
     def _get_data(self):
-        data = self._load()
-        self._validate_csv_install_mode(data)
-        return data
+        with phase("manifest"):
+            data = self._load()
+            self._validate_csv_install_mode(data)
+            return data
 
     def _load(self):
         if self.path.suffix == ".j2":
             try:
-                loader = FileSystemLoader(searchpath=str(self.path.parent))
-                env = Environment(loader=loader, undefined=StrictUndefined)
-                template = env.get_template(str(self.name))
-                content = template.render(**self._metadata["bundleParameters"])
+                with phase("render"):
+                    loader = FileSystemLoader(searchpath=str(self.path.parent))
+                    env = Environment(loader=loader, undefined=StrictUndefined)
+                    template = env.get_template(str(self.name))
+                    content = template.render(
+                        **self._metadata["bundleParameters"]
+                    )
             except UndefinedError as details:
                 raise ManifestLoadError(
                     f"error templating {self.path}: {details.message}"
@@ -45,7 +50,8 @@ class Manifest:
             with open(self.path, encoding="utf-8") as file_obj:
                 content = file_obj.read()
         try:
-            return yaml.load(content, Loader=yaml.CSafeLoader)
+            with phase("yaml"):
+                return yaml.load(content, Loader=yaml.CSafeLoader)
         except yaml.error.MarkedYAMLError as details:
             raise ManifestLoadError(f"{self.path}: {details}") from details
 
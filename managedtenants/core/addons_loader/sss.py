@@ -1,7 +1,6 @@
 import json
 import re
-from collections import ChainMap, defaultdict
-from copy import deepcopy
+from collections import ChainMap, defaultdict, namedtuple
 
 import yaml
 from jinja2 import ChoiceLoader, Environment, FileSystemLoader, StrictUndefined
@@ -10,16 +9,35 @@ from sretoolbox.utils.logger import get_text_logger
 
 from managedtenants.core.addon_manager import AddonManager
 from managedtenants.core.addons_loader.exceptions import SssLoadError
+from managedtenants.data.formats import SSS_OUTPUT_FORMATS
 from managedtenants.data.paths import DATA_DIR
+from managedtenants.utils.profiling import phase
 
 APP_LOG = get_text_logger("app")
 
 
 class Sss:
+    """
+    The SSS is rendered and validated when the addon is loaded, but only the
+    rendered text is kept: the parsed documents are several times larger and
+    are only built again when `data` is first accessed. From then on only
+    the parsed documents are kept.
+    """
+
+    __slots__ = ("_addon", "_sss_filename", "_content", "_data")
+
     def __init__(self, addon):
         self._addon = addon
         self._sss_filename = "selectorsyncset.yaml.j2"
-        self.data = self._get_data()
+        self._data = None
+        self._content = self._render()
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = yaml.load(self._content, Loader=yaml.CSafeLoader)
+            self._content = None
+        return self._data
 
     @property
     def yaml(self):
@@ -32,7 +50,10 @@ class Sss:
     def walker(self):
         return SssWalker(data=self.data)
 
-    def _get_data(self):
+    def index(self, delete=False):
+        return SssIndex.from_sss(self._addon.name, self.data, delete=delete)
+
+    def _render(self):
         try:
             loader = FileSystemLoader(searchpath=str(str(DATA_DIR)))
             if self._addon.extra_resources_loader is not None:
@@ -48,19 +69,23 @@ class Sss:
             )
             # pylint: disable=unnecessary-lambda
             env.filters["merge_dicts"] = lambda d1, d2: ChainMap(d1, d2)
-            template = env.get_template(str(self._sss_filename))
-            content = template.render(
-                AddonManager=AddonManager, ADDON=self._addon
-            )
+            with phase("template"):
+                template = env.get_template(str(self._sss_filename))
+            with phase("render"):
+                content = template.render(
+                    AddonManager=AddonManager, ADDON=self._addon
+                )
         except UndefinedError as details:
             raise SssLoadError(
                 f"error templating {self._sss_filename}: {details.message}"
             ) from details
 
         try:
-            content_yaml = yaml.load(content, Loader=yaml.CSafeLoader)
-            self._validate_deadmans_snitch(content_yaml)
-            return content_yaml
+            with phase("yaml"):
+                content_yaml = yaml.load(content, Loader=yaml.CSafeLoader)
+            with phase("validate"):
+                self._validate_deadmans_snitch(content_yaml)
+            return content
         except yaml.error.MarkedYAMLError as details:
             APP_LOG.info(
                 "Invalid YAML for addon %s. Here is the raw template:",
@@ -105,6 +130,47 @@ class Sss:
         return f"{self.__class__.__name__}({repr(self._addon.name)})"
 
 
+def write_sss(addons, output_format, stream):
+    """
+    Writes the rendered SSS of every addon to `stream`, one document per
+    addon, as soon as each addon is produced by the `addons` iterable.
+
+    - yaml: multi-document YAML stream ("---" separated)
+    - json: a JSON array
+    - ndjson: one JSON document per line
+
+    :return: the number of documents written.
+    """
+    if output_format not in SSS_OUTPUT_FORMATS:
+        raise ValueError(
+            f"Invalid output format '{output_format}'. Please use one of:"
+            f" {','.join(SSS_OUTPUT_FORMATS)}"
+        )
+
+    count = 0
+    if output_format == "json":
+        stream.write("[")
+    for addon in addons:
+        if output_format == "yaml":
+            yaml.dump(
+                addon.sss.data,
+                stream,
+                Dumper=yaml.CSafeDumper,
+                explicit_start=True,
+            )
+        elif output_format == "json":
+            stream.write(",\n" if count else "\n")
+            json.dump(addon.sss.data, stream, indent=4)
+        else:
+            json.dump(addon.sss.data, stream, separators=(",", ":"))
+            stream.write("\n")
+        stream.flush()
+        count += 1
+    if output_format == "json":
+        stream.write("\n]\n")
+    return count
+
+
 PAGERDUTY_KIND = "PagerDutyIntegration"
 DEADMANSSNITCH_KIND = "DeadmansSnitchIntegration"
 SSS_KIND = "SelectorSyncSet"
@@ -115,6 +181,9 @@ class SssWalker:
     Helper class to walk the rendered SSS template data.
     The idea is to transform lists in dictionaries so we can avoid looping over
     the rendered data all over the place.
+
+    The walked data is a view sharing the resources of `data`, it must not be
+    modified.
     """
 
     def __init__(self, data):
@@ -173,8 +242,9 @@ class SssWalker:
             }
         }
         """
-        sss = deepcopy(data)
-        old_resources = deepcopy(data["spec"]["resources"])
+        sss = dict(data)
+        sss["spec"] = dict(data["spec"])
+        old_resources = data["spec"]["resources"]
         sss["spec"]["resources"] = defaultdict(list)
 
         if old_resources is None:
@@ -188,3 +258,164 @@ class SssWalker:
 
     def __getitem__(self, item):
         return self.data[item]
+
+
+CATALOG_SOURCE_KIND = "CatalogSource"
+SUBSCRIPTION_KIND = "Subscription"
+OPERATOR_GROUP_KIND = "OperatorGroup"
+NAMESPACE_KIND = "Namespace"
+
+
+class SssResource(
+    namedtuple(
+        "SssResource", ["addon", "kind", "name", "namespace", "resource"]
+    )
+):
+    """A resource of a rendered SelectorSyncSet and the addon it belongs to."""
+
+    __slots__ = ()
+
+    @property
+    def labels(self):
+        return self.resource["metadata"].get("labels") or {}
+
+
+class SssIndex:
+    """
+    Hash indexes over the resources of rendered SelectorSyncSets, built once
+    so that looking resources up by name, namespace or label does not scan
+    them. Resources of several addons can be added to the same index for
+    fleet-wide queries.
+
+    Every lookup returns a list of SssResource, in insertion order. The
+    resources are shared with the rendered data and must not be modified.
+
+    Example:
+        index = SssIndex.from_addons(addons)
+        index.get("Subscription", "addon-foo")
+        index.by_namespace("Secret", "redhat-foo")
+        index.select({"app": "foo"}, kind="Deployment")
+    """
+
+    def __init__(self):
+        self._by_kind = defaultdict(list)
+        self._by_name = defaultdict(list)
+        self._by_namespace = defaultdict(list)
+        self._by_addon = defaultdict(list)
+        # {(label key, label value): {id(SssResource): SssResource}}
+        self._by_label = defaultdict(dict)
+
+    @classmethod
+    def from_sss(cls, addon_name, data, delete=False):
+        index = cls()
+        index.add(addon_name, data, delete=delete)
+        return index
+
+    @classmethod
+    def from_addons(cls, addons, delete=False):
+        index = cls()
+        for addon in addons:
+            index.add(addon.name, addon.sss.data, delete=delete)
+        return index
+
+    def add(self, addon_name, data, delete=False):
+        """
+        Indexes the resources of the deploy SelectorSyncSet of the rendered
+        `data`, or those of the delete one if `delete` is set.
+        """
+        for item in data["items"]:
+            if item["kind"] != SSS_KIND:
+                continue
+            if item["metadata"]["name"].endswith("delete") != delete:
+                continue
+            for resource in item["spec"]["resources"] or []:
+                self._add_resource(addon_name, resource)
+
+    def _add_resource(self, addon_name, resource):
+        metadata = resource["metadata"]
+        entry = SssResource(
+            addon=addon_name,
+            kind=resource["kind"],
+            name=metadata["name"],
+            namespace=metadata.get("namespace"),
+            resource=resource,
+        )
+        self._by_kind[entry.kind].append(entry)
+        self._by_name[(entry.kind, entry.name)].append(entry)
+        self._by_namespace[(entry.kind, entry.namespace)].append(entry)
+        self._by_addon[(addon_name, entry.kind)].append(entry)
+        for label in entry.labels.items():
+            self._by_label[label][id(entry)] = entry
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._by_kind.values())
+
+    def kinds(self):
+        return sorted(self._by_kind)
+
+    def by_kind(self, kind, addon=None):
+        if addon is not None:
+            return list(self._by_addon.get((addon, kind), ()))
+        return list(self._by_kind.get(kind, ()))
+
+    def by_name(self, kind, name):
+        """All the resources named `name`, one per addon defining it."""
+        return list(self._by_name.get((kind, name), ()))
+
+    def by_namespace(self, kind, namespace):
+        """
+        The resources of `kind` in `namespace`. Use None for cluster-scoped
+        resources.
+        """
+        return list(self._by_namespace.get((kind, namespace), ()))
+
+    def get(self, kind, name, addon=None):
+        """
+        The single resource matching `kind`/`name` (and `addon`), None when
+        there is none.
+
+        :raise LookupError: when several addons define such a resource and
+            `addon` is not given.
+        """
+        entries = self._by_name.get((kind, name), ())
+        if addon is not None:
+            entries = [e for e in entries if e.addon == addon]
+        if len(entries) > 1:
+            raise LookupError(
+                f"{len(entries)} {kind} named {name}:"
+                f" {', '.join(sorted(e.addon for e in entries))}"
+            )
+        return entries[0] if entries else None
+
+    def select(self, selector, kind=None):
+        """
+        The resources whose labels match every key/value of `selector`
+        (an equality based matchLabels selector).
+        """
+        postings = [self._by_label.get(label, {}) for label in selector.items()]
+        if not postings:
+            return self.by_kind(kind) if kind is not None else self._all()
+
+        # walk the shortest posting and look the others up
+        postings.sort(key=len)
+        return [
+            entry
+            for key, entry in postings[0].items()
+            if (kind is None or entry.kind == kind)
+            and all(key in posting for posting in postings[1:])
+        ]
+
+    def _all(self):
+        return [e for entries in self._by_kind.values() for e in entries]
+
+    def catalog_sources(self, addon=None):
+        return self.by_kind(CATALOG_SOURCE_KIND, addon=addon)
+
+    def subscriptions(self, addon=None):
+        return self.by_kind(SUBSCRIPTION_KIND, addon=addon)
+
+    def operator_groups(self, addon=None):
+        return self.by_kind(OPERATOR_GROUP_KIND, addon=addon)
+
+    def namespaces(self, addon=None):
+        return self.by_kind(NAMESPACE_KIND, addon=addon)
@@ -0,0 +1,153 @@
+import json
+import time
+import xml.etree.ElementTree as ET
+from collections import Counter
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from managedtenants.data.formats import REPORT_FORMATS
+
+
+class TaskRecord:
+    """Timing and HTTP usage of a single task run."""
+
+    def __init__(self, name, phase):
+        self.name = name
+        self.phase = phase
+        self.status = None
+        self.message = ""
+        self.duration = 0.0
+        self.http_calls = Counter()
+        self.http_bytes_sent = 0
+        self.http_bytes_received = 0
+
+    def add_http_call(self, request, response, stream=False):
+        self.http_calls[urlsplit(request.url).netloc] += 1
+        body = request.body or b""
+        self.http_bytes_sent += len(body)
+        if stream:
+            # don't consume streamed bodies, rely on the advertised length
+            length = response.headers.get("Content-Length", 0)
+            self.http_bytes_received += int(length)
+        else:
+            self.http_bytes_received += len(response.content or b"")
+
+    def response_hook(self, response, *args, **kwargs):
+        """`requests` response hook recording the call."""
+        self.add_http_call(
+            response.request, response, stream=kwargs.get("stream", False)
+        )
+
+    @property
+    def total_http_calls(self):
+        return sum(self.http_calls.values())
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "phase": self.phase,
+            "status": self.status,
+            "message": self.message,
+            "duration": round(self.duration, 6),
+            "http_calls": self.total_http_calls,
+            "http_calls_by_host": dict(self.http_calls),
+            "http_bytes_sent": self.http_bytes_sent,
+            "http_bytes_received": self.http_bytes_received,
+        }
+
+
+class RunReport:
+    """
+    Collects a TaskRecord for every task executed by the runner.
+
+    HTTP calls are counted by a response hook on the `requests.Session` of
+    the task, installed while the task runs. Tasks issue their calls, and
+    build their OcmCli, with the session of their Environment.
+    """
+
+    def __init__(self):
+        self.records = []
+
+    @contextmanager
+    def trace(self, name, phase, session=None):
+        """
+        Times the task and, if `session` is given, counts its HTTP calls.
+        """
+        record = TaskRecord(name=name, phase=phase)
+        self.records.append(record)
+
+        if session is not None:
+            session.hooks["response"].append(record.response_hook)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.duration = time.perf_counter() - start
+            if session is not None:
+                session.hooks["response"].remove(record.response_hook)
+
+    def slowest(self, n):
+        return sorted(self.records, key=lambda r: r.duration, reverse=True)[:n]
+
+    def log_slowest(self, logger, n):
+        if n <= 0 or not self.records:
+            return
+        banner = f"== {n} SLOWEST TASKS ".ljust(80, "=")
+        logger.info(banner)
+        for record in self.slowest(n):
+            logger.info(
+                "%8.3fs %s %s (%s HTTP calls, %s bytes received)",
+                record.duration,
+                record.status,
+                record.name,
+                record.total_http_calls,
+                record.http_bytes_received,
+            )
+
+    def write(self, path, report_format="json"):
+        if report_format not in REPORT_FORMATS:
+            raise ValueError(
+                f"Invalid report format '{report_format}'. Please use one of:"
+                f" {','.join(REPORT_FORMATS)}"
+            )
+
+        if report_format == "json":
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, indent=4)
+            return
+
+        self.to_junit().write(path, encoding="utf-8", xml_declaration=True)
+
+    def to_dict(self):
+        return {
+            "tasks": [record.to_dict() for record in self.records],
+            "duration": round(sum(r.duration for r in self.records), 6),
+            "http_calls": sum(r.total_http_calls for r in self.records),
+        }
+
+    def to_junit(self):
+        statuses = Counter(record.status for record in self.records)
+        testsuite = ET.Element(
+            "testsuite",
+            name="managedtenants",
+            tests=str(len(self.records)),
+            failures=str(statuses["FAIL"] + statuses["ASSERTION_ERROR"]),
+            errors=str(statuses["ERROR"]),
+            skipped=str(statuses["SKIP"]),
+            time=f"{sum(r.duration for r in self.records):.6f}",
+        )
+        for record in self.records:
+            testcase = ET.SubElement(
+                testsuite,
+                "testcase",
+                classname=record.phase or "",
+                name=record.name,
+                time=f"{record.duration:.6f}",
+            )
+            if record.status == "SKIP":
+                ET.SubElement(testcase, "skipped", message=record.message)
+            elif record.status in ("FAIL", "ASSERTION_ERROR"):
+                ET.SubElement(testcase, "failure", message=record.message)
+            elif record.status == "ERROR":
+                ET.SubElement(testcase, "error", message=record.message)
+        return ET.ElementTree(testsuite)
@@ -3,34 +3,58 @@ import sys
 from sretoolbox.utils.logger import get_text_logger
 
 from managedtenants.core import tasks_loader
+from managedtenants.core.report import RunReport
 from managedtenants.core.status import Status
 
 APP_LOG = get_text_logger("app")
 
 
-def run(tasks_factory):
-    status = Status.ALL_OK
-
-    for task in tasks_factory:
-        try:
-            APP_LOG.info("%s...", task.name)
-            task.run()
-            APP_LOG.info("%s OK", task.name)
-
-        except tasks_loader.exceptions.TaskSkip as details:
-            APP_LOG.warning("%s SKIP: %s", task.name, details)
-
-        except tasks_loader.exceptions.TaskFail as details:
-            APP_LOG.error("%s FAIL: %s", task.name, details)
-            status |= Status.TASK_ERROR
-            sys.exit(status)
-
-        except AssertionError as details:
-            APP_LOG.error("%s ASSERTION_ERROR: %s", task.name, details)
-            status |= Status.ASSERTION_ERROR
-            sys.exit(status)
+def run(tasks_factory, title=None, report=None):
+    """
+    Runs the tasks as they are produced by `tasks_factory`. The `title` banner
+    is only logged if there is at least one task to run.
 
-        except Exception:  # pylint: disable=broad-except
-            APP_LOG.exception("%s ERROR", task.name)
-            status |= Status.TASK_ERROR
+    Every task is timed and recorded in `report`, if provided.
+    """
+    status = Status.ALL_OK
+    report = report if report is not None else RunReport()
+
+    for i, task in enumerate(tasks_factory):
+        if i == 0 and title is not None:
+            banner = f"== {title} ".ljust(80, "=")
+            APP_LOG.info(banner)
+
+        with report.trace(
+            name=task.name, phase=title, session=task.environment.session
+        ) as record:
+            try:
+                APP_LOG.info("%s...", task.name)
+                task.run()
+                record.status = "OK"
+
+            except tasks_loader.exceptions.TaskSkip as details:
+                record.status, record.message = "SKIP", str(details)
+
+            except tasks_loader.exceptions.TaskFail as details:
+                record.status, record.message = "FAIL", str(details)
+                status |= Status.TASK_ERROR
+
+            except AssertionError as details:
+                record.status = "ASSERTION_ERROR"
+                record.message = str(details)
+                status |= Status.ASSERTION_ERROR
+
+            except Exception as details:  # pylint: disable=broad-except
+                APP_LOG.exception("%s ERROR", task.name)
+                record.status, record.message = "ERROR", repr(details)
+                status |= Status.TASK_ERROR
+
+        if record.status == "OK":
+            APP_LOG.info("%s OK (%.3fs)", task.name, record.duration)
+        elif record.status == "SKIP":
+            APP_LOG.warning("%s SKIP: %s", task.name, record.message)
+        elif record.status != "ERROR":
+            APP_LOG.error("%s %s: %s", task.name, record.status, record.message)
+
+        if status != Status.ALL_OK:
             sys.exit(status)
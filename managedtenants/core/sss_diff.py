@@ -0,0 +1,141 @@
+import json
+import tempfile
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from managedtenants.core.addons_loader import instantiate_addon
+from managedtenants.utils.git import (
+    export_entries,
+    get_changed_entries,
+    list_entries,
+)
+
+ADDED = "+"
+REMOVED = "-"
+CHANGED = "~"
+
+
+class DiffEntry(namedtuple("DiffEntry", ["op", "path", "old", "new"])):
+    """A single difference between two rendered documents."""
+
+    __slots__ = ()
+
+    def __str__(self):
+        if self.op == ADDED:
+            return f"{ADDED} {self.path}: {_dumps(self.new)}"
+        if self.op == REMOVED:
+            return f"{REMOVED} {self.path}: {_dumps(self.old)}"
+        return (
+            f"{CHANGED} {self.path}: {_dumps(self.old)} -> {_dumps(self.new)}"
+        )
+
+
+def _dumps(value):
+    return json.dumps(value, sort_keys=True)
+
+
+def structural_diff(old, new, path=""):
+    """
+    Yields a DiffEntry for every difference between `old` and `new`.
+
+    Mappings are compared key by key. Lists of Kubernetes objects are matched
+    by "<kind>/<metadata.name>" so that reordering or inserting a resource
+    does not show up as a change of every following item; other lists are
+    compared positionally.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in sorted(old.keys() | new.keys(), key=str):
+            child = f"{path}.{key}" if path else str(key)
+            if key not in new:
+                yield DiffEntry(REMOVED, child, old[key], None)
+            elif key not in old:
+                yield DiffEntry(ADDED, child, None, new[key])
+            else:
+                yield from structural_diff(old[key], new[key], child)
+
+    elif isinstance(old, list) and isinstance(new, list):
+        old_items, new_items = _index_list(old), _index_list(new)
+        if old_items is None or new_items is None:
+            old_items = dict(enumerate(old))
+            new_items = dict(enumerate(new))
+        keys = list(old_items)
+        keys.extend(k for k in new_items if k not in old_items)
+        for key in keys:
+            child = f"{path}[{key}]"
+            if key not in new_items:
+                yield DiffEntry(REMOVED, child, old_items[key], None)
+            elif key not in old_items:
+                yield DiffEntry(ADDED, child, None, new_items[key])
+            else:
+                yield from structural_diff(
+                    old_items[key], new_items[key], child
+                )
+
+    elif old != new:
+        yield DiffEntry(CHANGED, path, old, new)
+
+
+def _index_list(items):
+    """
+    Index a list of Kubernetes objects by "<kind>/<name>". Returns None if the
+    list does not exclusively contain uniquely named objects.
+    """
+    res = {}
+    for item in items:
+        try:
+            key = f"{item['kind']}/{item['metadata']['name']}"
+        except (KeyError, TypeError):
+            return None
+        if key in res:
+            return None
+        res[key] = item
+    return res
+
+
+def render_sss(path, environment):
+    """
+    Loads a single addon and returns its rendered SSS data, or None if the
+    addon does not exist for `environment`.
+    """
+    if not (path / "metadata" / environment).is_dir():
+        return None
+    return instantiate_addon((path, environment)).sss.data
+
+
+def diff_addons(addons_dir, environment, ref, addon_name=None):
+    """
+    Renders the SSS of every addon whose files changed between `ref` and the
+    working tree, at both revisions, and returns a list of
+    (addon_name, [DiffEntry, ...]) tuples.
+
+    Unchanged addons are never loaded. The old revision is read straight from
+    the git object store and both revisions are rendered in parallel worker
+    processes.
+    """
+    addons_dir = Path(addons_dir)
+    names = sorted(get_changed_entries(addons_dir, ref))
+    if addon_name is not None:
+        names = [name for name in names if name == addon_name]
+    if not names:
+        return []
+
+    with tempfile.TemporaryDirectory(prefix="mt-diff-") as tmp:
+        old_dir = Path(tmp)
+        export_entries(
+            addons_dir,
+            ref,
+            sorted(set(names) & list_entries(addons_dir, ref)),
+            old_dir,
+        )
+        envs = [environment] * len(names)
+        with ProcessPoolExecutor() as executor:
+            old = executor.map(render_sss, [old_dir / n for n in names], envs)
+            new = executor.map(
+                render_sss, [addons_dir / n for n in names], envs
+            )
+            return [
+                (name, list(structural_diff(old_data or {}, new_data or {})))
+                for name, old_data, new_data in zip(names, old, new)
+                if old_data is not None or new_data is not None
+            ]
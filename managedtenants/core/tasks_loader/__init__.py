@@ -1,9 +1,16 @@
-import imp  # pylint: disable=deprecated-module
+import importlib.util
 import inspect
 import sys
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
 
+from managedtenants.core.tasks_loader.environment import Environment
 from managedtenants.core.tasks_loader.post_task import PostTask
 from managedtenants.core.tasks_loader.pre_task import PreTask
+from managedtenants.core.tasks_loader.task import Task
+
+TASK_TYPES = (PreTask, Task, PostTask)
 
 
 def discover_tasks(tasks):
@@ -12,50 +19,94 @@ def discover_tasks(tasks):
     return sorted((item for item in tasks.iterdir() if item.suffix == ".py"))
 
 
+@contextmanager
+def _prepend_sys_path(path):
+    """
+    Allows task files to import their sibling modules while they are being
+    imported, without leaking `path` into sys.path afterwards.
+    """
+    sys.path.insert(0, str(path))
+    try:
+        yield
+    finally:
+        if str(path) in sys.path:
+            sys.path.remove(str(path))
+
+
+def _import_task_module(task_file):
+    # A task file may already have been imported by a sibling task module.
+    module = sys.modules.get(task_file.stem)
+    module_file = getattr(module, "__file__", None)
+    if module_file is not None:
+        if Path(module_file).resolve() == task_file.resolve():
+            return module
+
+    spec = importlib.util.spec_from_file_location(task_file.stem, task_file)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[task_file.stem] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@lru_cache(maxsize=None)
+def discover_task_classes(tasks_path):
+    """
+    Imports every task file under `tasks_path` exactly once and sorts the
+    task classes they define by task type.
+
+    The result is cached so the PreTask, Task and PostTask phases of a run
+    share a single import of each task module.
+
+    :return: {task_type: [(task_file, task_class), ...]}
+    """
+    res = {task_type: [] for task_type in TASK_TYPES}
+    with _prepend_sys_path(tasks_path):
+        for task_file in discover_tasks(tasks_path):
+            task_module = _import_task_module(task_file)
+            for _, obj in inspect.getmembers(task_module, inspect.isclass):
+                for task_type in TASK_TYPES:
+                    if obj.__name__ == task_type.__name__:
+                        continue
+
+                    if issubclass(obj, task_type):
+                        res[task_type].append((task_file, obj))
+    return res
+
+
 def load_tasks(addons_factory, args, tasks_path, task_type, search):
-    sys.path.insert(0, str(tasks_path))
-
-    tasks_factory = []
-    for task_file in discover_tasks(tasks_path):
-        filename, filepath, fileinfo = imp.find_module(
-            task_file.stem, [str(task_file.parent)]
-        )
-        task_module = imp.load_module(
-            task_file.stem, filename, filepath, fileinfo
-        )
-        for _, obj in inspect.getmembers(task_module):
-            if not inspect.isclass(obj):
-                continue
-
-            if obj.__name__ == task_type.__name__:
-                continue
-
-            if not issubclass(obj, task_type):
-                continue
-
-            if task_type in [PreTask, PostTask]:
-                instance = obj(addons=addons_factory, args=args, path=task_file)
-                if search is None:
-                    tasks_factory.append(instance)
-                else:
-                    if search in instance.name:
-                        tasks_factory.append(instance)
-                continue
-
-            for addon in addons_factory:
-                instance = obj(
+    """
+    Lazily yields the tasks of `task_type` found in `tasks_path`: one instance
+    per PreTask/PostTask class and one instance per (Task class, addon) pair.
+
+    The `search` filter is applied on the task name before the task is
+    instantiated and all the tasks share the same Environment.
+    """
+    environment = Environment(environment=args.environment, args=args)
+
+    def matches(name):
+        return search is None or search in name
+
+    for task_file, obj in discover_task_classes(tasks_path)[task_type]:
+        if task_type in [PreTask, PostTask]:
+            name = obj.format_name(path=task_file, environment=environment)
+            if matches(name):
+                yield obj(
                     addons=addons_factory,
-                    addon=addon,
                     args=args,
                     path=task_file,
+                    environment=environment,
                 )
-                if search is None:
-                    tasks_factory.append(instance)
-                else:
-                    if search in instance.name:
-                        tasks_factory.append(instance)
-
-    if str(tasks_path) in sys.path:
-        sys.path.remove(str(tasks_path))
+            continue
 
-    return tasks_factory
+        for addon in addons_factory:
+            name = obj.format_name(
+                path=task_file, environment=environment, addon=addon
+            )
+            if matches(name):
+                yield obj(
+                    addons=addons_factory,
+                    addon=addon,
+                    args=args,
+                    path=task_file,
+                    environment=environment,
+                )
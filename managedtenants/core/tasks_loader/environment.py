@@ -1,7 +1,15 @@
+import requests
+
 from managedtenants.data.environments import ENVIRONMENTS
 
 
 class Environment:
+    """
+    Target environment of the tasks. The tasks share `session` for their
+    HTTP calls, e.g. OcmCli(..., session=self.environment.session), which is
+    how the run report counts them.
+    """
+
     def __init__(self, environment, args):
         self.name = environment
         self.ocm_api_insecure = args.ocm_api_insecure
@@ -9,6 +17,7 @@ class Environment:
             self.ocm_api = args.ocm_api
         else:
             self.ocm_api = ENVIRONMENTS[self.name]["ocm_api"]
+        self.session = requests.Session()
 
     def __repr__(self):
         return f"{self.__class__.__name__}({repr(self.name)})"
@@ -7,10 +7,14 @@ from managedtenants.core.tasks_loader.exceptions import TaskFail, TaskSkip
 
 
 class PostTask(ABC):
-    def __init__(self, addons, args, path):
+    def __init__(self, addons, args, path, environment=None):
         self.addons = addons
 
-        self.environment = Environment(environment=args.environment, args=args)
+        self.environment = (
+            environment
+            if environment is not None
+            else Environment(environment=args.environment, args=args)
+        )
         self.dry_run = args.dry_run
 
         self.path = path
@@ -23,7 +27,11 @@ class PostTask(ABC):
 
     @property
     def name(self):
-        return f"{self.path}:{self.__class__.__name__}:{self.environment.name}"
+        return self.format_name(path=self.path, environment=self.environment)
+
+    @classmethod
+    def format_name(cls, path, environment):
+        return f"{path}:{cls.__name__}:{environment.name}"
 
     @staticmethod
     def fail(message=""):
@@ -7,11 +7,15 @@ from managedtenants.core.tasks_loader.exceptions import TaskFail, TaskSkip
 
 
 class Task(ABC):
-    def __init__(self, addons, addon, args, path):
+    def __init__(self, addons, addon, args, path, environment=None):
         self.addons = addons
         self.addon = addon
 
-        self.environment = Environment(environment=args.environment, args=args)
+        self.environment = (
+            environment
+            if environment is not None
+            else Environment(environment=args.environment, args=args)
+        )
         self.dry_run = args.dry_run
 
         self.path = path
@@ -24,13 +28,14 @@ class Task(ABC):
 
     @property
     def name(self):
-        return (
-            f"{self.path}:"
-            f"{self.__class__.__name__}:"
-            f"{self.addon.name}:"
-            f"{self.environment.name}"
+        return self.format_name(
+            path=self.path, environment=self.environment, addon=self.addon
         )
 
+    @classmethod
+    def format_name(cls, path, environment, addon):
+        return f"{path}:{cls.__name__}:{addon.name}:{environment.name}"
+
     @staticmethod
     def fail(message=""):
         raise TaskFail(message)
@@ -0,0 +1,123 @@
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import yaml
+from sretoolbox.utils.logger import get_text_logger
+
+from managedtenants.core.version import VERSION
+from managedtenants.utils.schema import (
+    SCHEMA_NAMES,
+    format_error_path,
+    pooled_validator,
+)
+
+# Payloads are single addon.yaml/imageset/config.yaml files.
+MAX_PAYLOAD_SIZE = 4 * 1024 * 1024
+
+LOG = get_text_logger("managedtenants-serve")
+
+
+def validate_payload(schema_name, data):
+    """
+    Validates `data` against the `schema_name` schema.
+
+    :return: every validation error as a dict, sorted by path. An empty list
+        means the payload is valid.
+    """
+    # each connection has its own thread, validators are pooled instead
+    with pooled_validator(schema_name) as validator:
+        errors = [
+            {
+                "path": format_error_path(error.absolute_path),
+                "message": error.message,
+                "validator": error.validator,
+            }
+            for error in validator.iter_errors(data)
+        ]
+    return sorted(errors, key=lambda e: (e["path"], e["message"]))
+
+
+class ValidationHandler(BaseHTTPRequestHandler):
+    """
+    GET  /healthz
+    POST /validate/{metadata,imageset,mtbundles} with a YAML or JSON body
+
+    Validation results are always returned with a 200:
+        {"valid": false, "errors": [{"path", "message", "validator"}, ...]}
+    """
+
+    # keep-alive, clients can reuse their connection
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately, without TCP_NODELAY each
+    # response would wait for the client's delayed ACK (~40ms)
+    disable_nagle_algorithm = True
+    server_version = f"managedtenants/{VERSION}"
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        if self.path == "/healthz":
+            self._reply(200, {"status": "ok"})
+            return
+        self._reply(404, {"error": f"not found: {self.path}"})
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            # the body can't be drained
+            self.close_connection = True
+            self._reply(400, {"error": "invalid Content-Length"})
+            return
+
+        # always drain the body to keep the connection usable
+        body = self.rfile.read(min(length, MAX_PAYLOAD_SIZE))
+        if length > MAX_PAYLOAD_SIZE:
+            self.close_connection = True
+            self._reply(413, {"error": "payload too large"})
+            return
+
+        prefix, _, schema_name = self.path.strip("/").partition("/")
+        if prefix != "validate" or schema_name not in SCHEMA_NAMES:
+            self._reply(
+                404,
+                {
+                    "error": (
+                        f"not found: {self.path}. Please use one of:"
+                        f" {','.join(f'/validate/{n}' for n in SCHEMA_NAMES)}"
+                    )
+                },
+            )
+            return
+
+        try:
+            data = yaml.load(body, Loader=yaml.CSafeLoader)
+        except yaml.YAMLError as details:
+            self._reply(400, {"error": f"invalid yaml: {details}"})
+            return
+
+        errors = validate_payload(schema_name, data)
+        self._reply(200, {"valid": not errors, "errors": errors})
+
+    def _reply(self, status, content):
+        body = json.dumps(content).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        LOG.debug(format, *args)
+
+
+def make_server(host="127.0.0.1", port=8080):
+    """
+    Returns an HTTP server handling each connection in its own thread.
+    Use port 0 to bind a random free port.
+    """
+    server = ThreadingHTTPServer((host, port), ValidationHandler)
+    server.daemon_threads = True
+    return server
@@ -1,6 +1,6 @@
-import pkg_resources
+from importlib.metadata import PackageNotFoundError, version
 
 try:
-    VERSION = pkg_resources.get_distribution("managedtenants_cli").version
-except pkg_resources.DistributionNotFound:
+    VERSION = version("managedtenants_cli")
+except PackageNotFoundError:
     VERSION = "unknown.unknown"
@@ -0,0 +1,123 @@
+import os
+import time
+
+from managedtenants.core.addons_loader import instantiate_addon
+
+
+def snapshot(path):
+    """
+    Returns {relative file path: (mtime_ns, size)} for every file under
+    `path`. Comparing two snapshots tells whether anything changed.
+    """
+    res = {}
+    for root, _, files in os.walk(path):
+        for name in files:
+            file_path = os.path.join(root, name)
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                # removed while walking, the next poll will catch it
+                continue
+            res[os.path.relpath(file_path, path)] = (
+                stat.st_mtime_ns,
+                stat.st_size,
+            )
+    return res
+
+
+class AddonsWatcher:
+    """
+    Keeps the addons of an addons dir loaded and reloads only the addons whose
+    files changed (metadata, imagesets, extra resources, bundles...).
+
+    :param addons_dir: Path to the addons directory.
+    :param environment: Environment to load the addons for.
+    :param log: Logger receiving the load results.
+    :param addon_name: Only watch the given addon.
+    """
+
+    def __init__(self, addons_dir, environment, log, addon_name=None):
+        self.addons_dir = addons_dir
+        self.environment = environment
+        self.log = log
+        self.addon_name = addon_name
+        # {addon name: Addon}, only for the addons that loaded successfully
+        self.addons = {}
+        # {addon name: error message}
+        self.errors = {}
+        # {addon name: snapshot}
+        self._snapshots = {}
+
+    def _candidates(self):
+        res = {}
+        for candidate in self.addons_dir.iterdir():
+            if (
+                self.addon_name is not None
+                and candidate.name != self.addon_name
+            ):
+                continue
+            if (candidate / "metadata" / self.environment).is_dir():
+                res[candidate.name] = candidate
+        return res
+
+    def load_all(self):
+        for name, addon_dir in sorted(self._candidates().items()):
+            self._snapshots[name] = snapshot(addon_dir)
+            self.reload(name, addon_dir)
+
+    def poll(self):
+        """
+        Returns the names of the addons that were added, changed or removed
+        since the previous poll.
+        """
+        candidates = self._candidates()
+        changed = set(self._snapshots) - set(candidates)
+        for name in changed:
+            del self._snapshots[name]
+
+        for name, addon_dir in candidates.items():
+            current = snapshot(addon_dir)
+            if self._snapshots.get(name) != current:
+                self._snapshots[name] = current
+                changed.add(name)
+        return changed
+
+    def reload(self, name, addon_dir=None):
+        """
+        (Re)loads a single addon, forgetting it when its directory is gone.
+
+        :return: the error message, None on success.
+        """
+        self.addons.pop(name, None)
+        self.errors.pop(name, None)
+
+        addon_dir = addon_dir or self.addons_dir / name
+        if not (addon_dir / "metadata" / self.environment).is_dir():
+            self.log.info("[%s] removed", name)
+            return None
+
+        start = time.perf_counter()
+        try:
+            self.addons[name] = instantiate_addon((addon_dir, self.environment))
+        except Exception as details:  # pylint: disable=broad-except
+            self.errors[name] = f"[{type(details).__name__}] {details}"
+        elapsed = (time.perf_counter() - start) * 1000
+
+        if name in self.errors:
+            self.log.error("[%s] %s (%.0fms)", name, self.errors[name], elapsed)
+            return self.errors[name]
+
+        self.log.info("[%s] OK (%.0fms)", name, elapsed)
+        return None
+
+    def watch(self, interval=0.5, iterations=None):
+        """
+        Polls the addons dir every `interval` seconds and reloads the changed
+        addons. Runs forever unless `iterations` is given.
+        """
+        count = 0
+        while iterations is None or count < iterations:
+            time.sleep(interval)
+            for name in sorted(self.poll()):
+                self.reload(name)
+            count += 1
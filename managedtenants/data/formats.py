@@ -0,0 +1,5 @@
+# Kept apart from the modules using them so the CLI can build its argument
+# parser without importing the addons loader or the tasks runner.
+SSS_OUTPUT_FORMATS = ("yaml", "json", "ndjson")
+
+REPORT_FORMATS = ("json", "junit")
@@ -0,0 +1,50 @@
+import os
+from pathlib import Path
+
+CACHE_DIR_ENV = "MANAGEDTENANTS_CACHE_DIR"
+
+
+def cache_dir():
+    """
+    Root of the persistent caches: $MANAGEDTENANTS_CACHE_DIR, or
+    managedtenants/ under $XDG_CACHE_HOME (default: ~/.cache).
+    """
+    path = os.getenv(CACHE_DIR_ENV)
+    if path:
+        return Path(path)
+    xdg_cache_home = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(xdg_cache_home) / "managedtenants"
+
+
+class ResultCache:
+    """
+    Persistent set of keys, e.g. the content hashes that passed a validation.
+    Each key is an empty file under `path`, so concurrent processes can
+    share the directory and CI can save and restore it as an artifact.
+
+    :param path: directory holding the keys, created on the first add().
+    :param enabled: when False, nothing is ever found nor recorded.
+    """
+
+    def __init__(self, path, enabled=True):
+        self.path = Path(path)
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key):
+        found = self.enabled and (self.path / key).is_file()
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return found
+
+    def add(self, key):
+        if not self.enabled:
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        (self.path / key).touch()
+
+    def __str__(self):
+        return f"{self.hits} hits, {self.misses} misses"
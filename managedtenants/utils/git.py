@@ -1,4 +1,9 @@
 import os
+import subprocess
+import tarfile
+import tempfile
+from datetime import datetime, timezone
+from functools import cached_property
 from pathlib import Path
 
 from sretoolbox.utils.logger import get_text_logger
@@ -77,3 +82,158 @@ def get_short_hash(size=7):
     """
     cmd = ["git", "rev-parse", f"--short={size}", "HEAD"]
     return run(cmd=cmd).stdout.decode().strip()
+
+
+class GitError(Exception):
+    """
+    Used when a git command fails.
+    """
+
+
+class BuildContext:
+    """
+    Describes the revision the bundles pipeline builds from. Created once per
+    run and shared by all the builders.
+
+    Nothing runs at creation time: git is only called the first time the
+    commit hash or the dirty flag is read and the result is memoized.
+
+    :param path: Any path inside the git repository. Default: cwd.
+    :param size: Length of the abbreviated commit hash.
+    """
+
+    def __init__(self, path=".", size=7):
+        self.path = path
+        self.size = size
+        self.timestamp = datetime.now(timezone.utc)
+
+    @cached_property
+    def commit_hash(self):
+        return _git(self.path, "rev-parse", "HEAD").strip()
+
+    @cached_property
+    def short_hash(self):
+        return _git(
+            self.path, "rev-parse", f"--short={self.size}", "HEAD"
+        ).strip()
+
+    @cached_property
+    def dirty(self):
+        """True when tracked files have uncommitted changes."""
+        out = _git(self.path, "status", "--porcelain", "--untracked-files=no")
+        return bool(out.strip())
+
+    def __str__(self):
+        dirty = ", dirty" if self.dirty else ""
+        return f"{self.short_hash} ({self.timestamp.isoformat()}{dirty})"
+
+
+def _git(path, *args):
+    # stderr is kept apart: git warnings must not be parsed as output
+    cmd = ["git", "-C", str(path), *args]
+    result = subprocess.run(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False
+    )
+    if result.returncode != 0:
+        raise GitError(
+            f"{' '.join(cmd)} failed: {result.stderr.decode().strip()}"
+        )
+    return result.stdout.decode()
+
+
+def get_changed_entries(path, ref):
+    """
+    Returns the names of the top-level entries of `path` (e.g. the addons of
+    an addons dir) that differ between `ref` and the working tree, including
+    the untracked ones.
+
+    :param path: Directory inside a git repository.
+    :param ref: Any git revision, e.g. "HEAD~1" or "origin/main".
+    """
+    changed = _git(
+        path, "diff", "--name-only", "--relative", "-z", ref, "--", "."
+    )
+    untracked = _git(path, "ls-files", "--others", "--exclude-standard", "-z")
+    return {
+        Path(name).parts[0]
+        for name in f"{changed}\0{untracked}".split("\0")
+        if name
+    }
+
+
+def list_entries(path, ref):
+    """
+    Returns the names of the top-level entries of `path` as they exist in
+    `ref`.
+    """
+    root, tree_ish = _tree_ish(path, ref)
+    return set(_git(root, "ls-tree", "--name-only", tree_ish).splitlines())
+
+
+def export_entries(path, ref, names, dest):
+    """
+    Extracts the given top-level entries of `path` at revision `ref` into the
+    `dest` directory, reading git objects directly instead of checking out a
+    worktree.
+
+    :raise GitError: git failed, or the archive has a member that would be
+        extracted outside of `dest`.
+    """
+    if not names:
+        return
+    root, tree_ish = _tree_ish(path, ref)
+    cmd = ["git", "-C", root, "archive", tree_ish, "--", *names]
+    # stderr goes to a file: a pipe nobody reads could fill up and block git
+    with tempfile.TemporaryFile() as stderr:
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr) as p:
+            try:
+                with tarfile.open(fileobj=p.stdout, mode="r|") as tar:
+                    _extract(tar, dest)
+            except tarfile.ReadError:
+                # nothing to read when git fails, report its error instead
+                if p.wait() == 0:
+                    raise
+        if p.returncode != 0:
+            stderr.seek(0)
+            raise GitError(
+                f"{' '.join(cmd)} failed: {stderr.read().decode().strip()}"
+            )
+
+
+def _extract(tar, dest):
+    if hasattr(tarfile, "data_filter"):
+        try:
+            tar.extractall(dest, filter="data")
+        except tarfile.FilterError as e:
+            raise GitError(f"refusing to extract the archive: {e}") from e
+        return
+
+    # no extraction filters before python 3.9.17
+    for member in tar:
+        if not _is_safe(member):
+            raise GitError(
+                f"refusing to extract the archive: unsafe member {member.name}"
+            )
+        tar.extract(member, dest)
+
+
+def _is_safe(member):
+    if not (member.isfile() or member.isdir() or member.issym()):
+        return False
+    names = [member.name]
+    if member.issym():
+        names.append(str(Path(member.name).parent / member.linkname))
+    return all(
+        not Path(name).is_absolute() and ".." not in Path(name).parts
+        for name in names
+    )
+
+
+def _tree_ish(path, ref):
+    """
+    Returns the repository root and the "<ref>:<prefix>" tree-ish that points
+    to `path` inside `ref`.
+    """
+    root = _git(path, "rev-parse", "--show-toplevel").strip()
+    prefix = _git(path, "rev-parse", "--show-prefix").strip()
+    return root, f"{ref}:{prefix}"
@@ -90,17 +90,24 @@ class OcmCli:
         offline_token=None,
         api=API,
         api_insecure=False,
+        session=None,
     ):  # pylint: disable=too-many-arguments
         """Accepts client_id and client_secret or offline token
         to authenticate against OCM. client_id and client_secret
         take precedence.
+
+        The requests go through `session`, e.g. the session of the task
+        environment so that the run report counts them. Default: a new
+        requests.Session.
         """
+        self.session = session if session is not None else requests.Session()
         self._token_provider = _TokenProvider.from_options(
             options=_TokenProviderOptions(
                 client_id=client_id,
                 client_secret=client_secret,
                 offline_token=offline_token,
-            )
+            ),
+            session=self.session,
         )
 
         self.api_insecure = api_insecure
@@ -624,16 +631,16 @@ class OcmCli:
         return response
 
     def _post(self, path, **kwargs):
-        return self._api(requests.post, path, **kwargs)
+        return self._api(self.session.post, path, **kwargs)
 
     def _get(self, path, **kwargs):
-        return self._api(requests.get, path, **kwargs)
+        return self._api(self.session.get, path, **kwargs)
 
     def _delete(self, path, **kwargs):
-        return self._api(requests.delete, path, **kwargs)
+        return self._api(self.session.delete, path, **kwargs)
 
     def _patch(self, path, **kwargs):
-        return self._api(requests.patch, path, **kwargs)
+        return self._api(self.session.patch, path, **kwargs)
 
     def _pool_items(self, path):
         items = []
@@ -656,20 +663,21 @@ def _camel_to_snake_case(val):
 
 
 class _TokenProvider(abc.ABC):
-    def __init__(self, options):
+    def __init__(self, options, session):
         self._token_endpoint = options.token_endpoint
         self._request_timeout = options.request_timeout
+        self._session = session
 
         self._token = None
 
     @staticmethod
-    def from_options(options):
+    def from_options(options, session):
         # https://github.com/PyCQA/pylint/issues/3268
         # pylint: disable=no-value-for-parameter
         if options.client_secret:
-            return _ClientCredentialTokenProvider(options)
+            return _ClientCredentialTokenProvider(options, session)
 
-        return _OfflineTokenProvider(options)
+        return _OfflineTokenProvider(options, session)
 
     @retry(hook=retry_hook, max_attempts=10)
     def retrieve_access_token(self):
@@ -677,7 +685,7 @@ class _TokenProvider(abc.ABC):
         if self._token and self._token.still_valid():
             return self._token.access_token
 
-        method = requests.post
+        method = self._session.post
         response = method(
             self._token_endpoint,
             data=self._token_request_body(),
@@ -750,8 +758,8 @@ class _TokenProviderOptions:
 
 
 class _ClientCredentialTokenProvider(_TokenProvider):
-    def __init__(self, options):
-        super().__init__(options)
+    def __init__(self, options, session):
+        super().__init__(options, session)
 
         self._client_id = options.client_id
         self._client_secret = options.client_secret
@@ -765,8 +773,8 @@ class _ClientCredentialTokenProvider(_TokenProvider):
 
 
 class _OfflineTokenProvider(_TokenProvider):
-    def __init__(self, options):
-        super().__init__(options)
+    def __init__(self, options, session):
+        super().__init__(options, session)
 
         self._client_id = options.client_id or "cloud-services"
         self._offline_token = options.offline_token
@@ -0,0 +1,110 @@
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+
+ADDON_FRAME_PREFIX = "addon:"
+
+# Sink receiving the timings, profiling is disabled while it is None.
+_SINK = None
+_NULL_PHASE = nullcontext()
+_local = threading.local()
+
+
+def set_sink(sink):
+    """
+    Enables profiling by sending every finished phase to `sink`, which must
+    implement `record(stack, duration, self_duration)`. Pass None to disable.
+    """
+    global _SINK  # pylint: disable=global-statement
+    _SINK = sink
+
+
+def get_sink():
+    return _SINK
+
+
+def phase(name):
+    """
+    Context manager timing the wrapped block as `name`. Nested phases build a
+    stack, e.g. ("addon:foo", "load_metadata", "schema"). This is a no-op
+    unless a sink has been set.
+    """
+    if _SINK is None:
+        return _NULL_PHASE
+    return _Phase(name, _SINK)
+
+
+class _Phase:
+    __slots__ = ("name", "sink", "start", "children")
+
+    def __init__(self, name, sink):
+        self.name = name
+        self.sink = sink
+        self.start = None
+        self.children = 0.0
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        duration = time.perf_counter() - self.start
+        stack = _local.stack
+        self.sink.record(
+            tuple(p.name for p in stack), duration, duration - self.children
+        )
+        stack.pop()
+        if stack:
+            stack[-1].children += duration
+
+
+class PhaseProfile:
+    """
+    Sink aggregating the phase timings into:
+      - a per-addon breakdown of the time spent in each phase
+      - collapsed stacks, the input format of flamegraph.pl/speedscope
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # {stack: self time in seconds}
+        self.collapsed = defaultdict(float)
+        # {addon: {phase path: [calls, total time in seconds]}}
+        self.addons = defaultdict(lambda: defaultdict(lambda: [0, 0.0]))
+
+    def record(self, stack, duration, self_duration):
+        with self.lock:
+            self.collapsed[stack] += self_duration
+
+            if not stack[0].startswith(ADDON_FRAME_PREFIX):
+                return
+            addon = stack[0].removeprefix(ADDON_FRAME_PREFIX)
+            key = "/".join(stack[1:]) or "total"
+            self.addons[addon][key][0] += 1
+            self.addons[addon][key][1] += duration
+
+    def breakdown(self):
+        return {
+            addon: {
+                key: {"calls": calls, "duration": round(total, 6)}
+                for key, (calls, total) in sorted(phases.items())
+            }
+            for addon, phases in sorted(self.addons.items())
+        }
+
+    def write_breakdown(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.breakdown(), f, indent=4)
+
+    def write_collapsed(self, path):
+        """Values are self times in microseconds."""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, self_duration in sorted(self.collapsed.items()):
+                frames = ";".join(frame.replace(";", ":") for frame in stack)
+                f.write(f"{frames} {round(self_duration * 1e6)}\n")
@@ -1,11 +1,17 @@
+import json
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 
 import yaml
-from jsonschema import Draft7Validator
+from jsonschema import Draft7Validator, RefResolver
 from jsonschema.exceptions import SchemaError
 
 from managedtenants.data.paths import SCHEMAS_DIR
 
+SCHEMA_NAMES = ("metadata", "imageset", "mtbundles")
+
 
 def load_schema(name):
     """
@@ -13,15 +19,83 @@ def load_schema(name):
 
     Acceptable names: metadata, imageset and mtbundles.
     """
-    valid_schema_names = ("metadata", "imageset", "mtbundles")
-    if name not in valid_schema_names:
+    if name not in SCHEMA_NAMES:
         raise ValueError(
             f"Invalid schema name '{name}' provided. Please use a valid schema"
-            f" name: {','.join(valid_schema_names)}"
+            f" name: {','.join(SCHEMA_NAMES)}"
         )
     return SchemaLoader(name)
 
 
+# RefResolver keeps a scope stack while validating, validators can't be
+# shared across threads.
+_validators = threading.local()
+# {name: [idle validator, ...]}, see pooled_validator()
+_validator_pool = {}
+_validator_pool_lock = threading.Lock()
+
+
+def get_validator(name):
+    """
+    Returns a Draft7Validator for a recognized schema name. It is built once
+    per thread, along with the resolver caching the referenced schemas.
+
+    :raise ValueError: unknown schema name.
+    :raise SchemaError: the schema is not a valid Draft7 schema. It is only
+        checked once, when it is first loaded.
+    """
+    cache = _validators.__dict__
+    if name not in cache:
+        cache[name] = _new_validator(name)
+    return cache[name]
+
+
+@contextmanager
+def pooled_validator(name):
+    """
+    Lends a Draft7Validator for a recognized schema name, for threads too
+    short-lived to benefit from get_validator(), e.g. one per connection.
+    Validators are only built when all the pooled ones are in use.
+
+    :raise: same as get_validator().
+    """
+    with _validator_pool_lock:
+        idle = _validator_pool.setdefault(name, [])
+        validator = idle.pop() if idle else None
+    if validator is None:
+        validator = _new_validator(name)
+    try:
+        yield validator
+    finally:
+        with _validator_pool_lock:
+            _validator_pool[name].append(validator)
+
+
+def _new_validator(name):
+    return Draft7Validator(
+        load_schema(name),
+        # required to resolve $ref: *.json
+        resolver=RefResolver(
+            base_uri=f"file://{SCHEMAS_DIR}/",
+            referrer=f"{name}.schema.yaml",
+            store=_shared_schemas(),
+        ),
+    )
+
+
+@lru_cache(maxsize=None)
+def _shared_schemas():
+    """
+    Schemas referenced with `$ref: shared/*.json`, keyed by URI, so that the
+    resolvers never have to read them from disk.
+    """
+    res = {}
+    for path in sorted((SCHEMAS_DIR / "shared").glob("*.json")):
+        with open(path, encoding="utf-8") as f:
+            res[f"file://{path}"] = json.load(f)
+    return res
+
+
 # Accept path or file for easier testing
 def load_draft7_schema(path_or_file):
     """
@@ -58,7 +132,7 @@ class SchemaLoader:
     """Singleton wrapper to load schemas only once."""
 
     _instances = {}
-    _SUPPORTED_SCHEMAS = ["metadata", "imageset", "mtbundles"]
+    _SUPPORTED_SCHEMAS = SCHEMA_NAMES
 
     def __new__(cls, schema_type):
         if schema_type in cls._SUPPORTED_SCHEMAS:
@@ -70,3 +144,49 @@ class SchemaLoader:
             raise SchemaError(f"{schema_type} schema is not supported")
 
         return cls._instances[schema_type]
+
+
+def format_error_path(path):
+    """
+    Formats the absolute_path of a jsonschema error, e.g. ".config.env[0]".
+    """
+    res = "".join(f"[{p}]" if isinstance(p, int) else f".{p}" for p in path)
+    return res or "."
+
+
+def load_documents(content):
+    """
+    Parses every document of a YAML stream, keeping the node tree next to the
+    data so that errors can be mapped back to lines with `locate()`.
+
+    :return: [(node, data), ...]
+    """
+    loader = yaml.CSafeLoader(content)
+    try:
+        res = []
+        while loader.check_node():
+            node = loader.get_node()
+            res.append((node, loader.construct_document(node)))
+        return res
+    finally:
+        loader.dispose()
+
+
+def locate(node, path):
+    """
+    Returns the 1-based line of the deepest node found following `path`, the
+    absolute_path of a jsonschema error, from the `node` document root.
+    """
+    for key in path:
+        if isinstance(node, yaml.MappingNode):
+            child = next(
+                (v for k, v in node.value if k.value == str(key)), None
+            )
+        elif isinstance(node, yaml.SequenceNode) and isinstance(key, int):
+            child = node.value[key] if key < len(node.value) else None
+        else:
+            child = None
+        if child is None:
+            break
+        node = child
+    return node.start_mark.line + 1
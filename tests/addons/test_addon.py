@@ -1,9 +1,18 @@
+import shutil
+import threading
+
 import pytest
 import yaml
+from jsonschema.exceptions import SchemaError
 from sretoolbox.container import Image
 
-from managedtenants.core.addons_loader.addon import Addon
-from managedtenants.core.addons_loader.exceptions import AddonLoadError
+from managedtenants.core.addons_loader import collect_addon_errors
+from managedtenants.core.addons_loader.addon import Addon, UniqueYAMLKeyLoader
+from managedtenants.core.addons_loader.exceptions import (
+    AddonLoadError,
+    AddonValidationError,
+)
+from managedtenants.utils import schema
 from tests.testutils.addon_helpers import addon_with_indeximage  # noqa: F401
 from tests.testutils.addon_helpers import addon_with_secrets  # noqa: F401
 from tests.testutils.addon_helpers import (  # noqa: F401; noqa: F401; noqa: F401; flake8: noqa: F401
@@ -275,3 +284,86 @@ def test_env_value_validation():
 def test_addon_unique_keys_validation():
     with pytest.raises(AddonLoadError):
         Addon(addon_with_duplicate_keys_path(), "stage")
+
+
+def test_collect_errors():
+    addon = Addon(addon_with_secrets_path(), "stage", collect_errors=True)
+    metadata = addon.metadata
+    metadata["id"] = 1
+    metadata["label"] = 2
+    metadata["config"]["secrets"].append(metadata["config"]["secrets"][0])
+    metadata["pullSecretName"] = "5daad7e9-dea7-4b3a-9fe5-a773df8ec57c"
+
+    with pytest.raises(AddonValidationError) as schema_errors:
+        addon._validate_schema_instance(metadata, "metadata")
+    assert len(schema_errors.value.errors) == 2
+
+    with pytest.raises(AddonValidationError) as errors:
+        addon._run_validations(
+            addon._validate_secret_names, addon._validate_pullSecretName
+        )
+    assert len(errors.value.errors) == 2
+
+    # fail fast by default
+    addon.collect_errors = False
+    with pytest.raises(AddonLoadError) as first_error:
+        addon._run_validations(
+            addon._validate_secret_names, addon._validate_pullSecretName
+        )
+    assert not isinstance(first_error.value, AddonValidationError)
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "a: 1\nb: [1, 2.5, true, null, {c: d}]\n",
+        "a: &anchor {b: 1}\nc: *anchor\n",
+        "'1': a\n1: b\n",
+        "d: 2001-12-14\ns: !!set {a, b}\n",
+        "",
+    ],
+)
+def test_unique_yaml_key_loader(content):
+    expected = yaml.load(content, Loader=yaml.CSafeLoader)
+    assert yaml.load(content, Loader=UniqueYAMLKeyLoader) == expected
+
+
+@pytest.mark.parametrize(
+    "content,duplicates",
+    [
+        ("a: 1\nb: 2\na: 3\nb: 4\n", "['a', 'b']"),
+        ("a:\n  - {b: 1, b: 2}\n", "['b']"),
+        ("1: a\n0x1: b\n", "[1]"),
+    ],
+)
+def test_unique_yaml_key_loader_duplicates(content, duplicates):
+    with pytest.raises(yaml.error.MarkedYAMLError) as exc:
+        yaml.load(content, Loader=UniqueYAMLKeyLoader)
+    assert (
+        str(exc.value) == f"Duplicate key(s) found in addon.yaml : {duplicates}"
+    )
+
+
+def test_collect_errors_schema_invalid_extra_resources(tmp_path):
+    path = tmp_path / addon_with_secrets_path().name
+    shutil.copytree(addon_with_secrets_path(), path)
+    metadata_path = path / "metadata" / "stage" / "addon.yaml"
+    metadata = yaml.load(metadata_path.read_text(), Loader=yaml.CSafeLoader)
+    metadata["id"] = 123
+    metadata["extraResources"] = 5
+    metadata_path.write_text(yaml.dump(metadata))
+
+    _, errors = collect_addon_errors((path, "stage"))
+    assert len(errors) == 2
+    assert not any("TypeError" in error for error in errors)
+
+
+def test_invalid_schema(monkeypatch):
+    def broken(path_or_file):
+        raise SchemaError("broken schema")
+
+    monkeypatch.setattr(schema, "_validators", threading.local())
+    monkeypatch.setattr(schema.SchemaLoader, "_instances", {})
+    monkeypatch.setattr(schema, "load_draft7_schema", broken)
+    with pytest.raises(AddonLoadError, match="metadata schema error"):
+        Addon(addon_with_secrets_path(), "stage")
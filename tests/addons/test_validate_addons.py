@@ -0,0 +1,35 @@
+import argparse
+import shutil
+from pathlib import Path
+
+import yaml
+
+from managedtenants.core.addons_loader import validate_addons
+
+TEST_OPERATOR = Path("tests/testdata/addons/test-operator")
+
+
+def test_validate_addons(tmp_path):
+    for name in ["valid", "invalid-schema", "invalid-yaml"]:
+        shutil.copytree(TEST_OPERATOR, tmp_path / name)
+
+    metadata_path = tmp_path / "invalid-schema/metadata/stage/addon.yaml"
+    metadata = yaml.safe_load(metadata_path.read_text())
+    metadata.update(id=1, label=2, extraResources=["missing.yaml"])
+    metadata_path.write_text(yaml.safe_dump(metadata))
+
+    with open(
+        tmp_path / "invalid-yaml/metadata/stage/addon.yaml",
+        "a",
+        encoding="utf-8",
+    ) as f:
+        f.write("foo: [\n")
+
+    args = argparse.Namespace(only_changed=False, dry_run=True)
+    res = validate_addons(tmp_path, "stage", None, args)
+
+    assert set(res) == {"invalid-schema", "invalid-yaml"}
+    # every error is reported at once
+    assert len(res["invalid-schema"]) == 3
+    assert any("missing.yaml" in error for error in res["invalid-schema"])
+    assert len(res["invalid-yaml"]) == 1
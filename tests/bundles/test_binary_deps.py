@@ -0,0 +1,151 @@
+import os
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from semver import VersionInfo
+from sretoolbox.binaries.base import Binary
+
+from managedtenants.bundles.binary_deps import (
+    LazyBin,
+    _sha256,
+    platform_key,
+    prefetch,
+)
+from managedtenants.bundles.exceptions import BinaryError
+
+SCRIPT = "#!/bin/sh\necho 1.2.3\n"
+
+
+class _CountingHandler(SimpleHTTPRequestHandler):
+    downloads = []
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        self.downloads.append(self.path)
+        super().do_GET()
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+@pytest.fixture
+def file_server(tmp_path):
+    """Serves tmp_path/www over http, stand-in for the release downloads."""
+    www = tmp_path / "www"
+    www.mkdir()
+    (www / "fake-tool").write_text(SCRIPT)
+    _CountingHandler.downloads = []
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), partial(_CountingHandler, directory=str(www))
+    )
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", _CountingHandler.downloads
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def _fake_tool_class(url):
+    class FakeTool(Binary):
+        binary_template = "fake-tool-{version}"
+        download_url_template = f"{url}/fake-tool"
+
+        def get_version_command(self):
+            return [self.command]
+
+        def parse_version(self, version):
+            return VersionInfo.parse(version.strip())
+
+        def process_download(self, path):
+            os.chmod(path, 0o755)
+            return path
+
+    return FakeTool
+
+
+def test_prefetch_shared_cache(tmp_path, file_server):
+    url, downloads = file_server
+    fake_tool = _fake_tool_class(url)
+    tools = tmp_path / "bin" / "faketool-1.2.3"
+
+    # several LazyBins sharing a directory, as separate processes would
+    binaries = [LazyBin(fake_tool, "1.2.3", tmp_path / "bin") for _ in range(8)]
+    commands = prefetch(binaries)
+    assert commands == {"fake-tool-1.2.3": str(tools / "fake-tool-1.2.3")}
+    assert len(downloads) == 1
+    assert (tools / "fake-tool-1.2.3.sha256").read_text() == _sha256(
+        tools / "fake-tool-1.2.3"
+    )
+
+    # a corrupted binary is downloaded again
+    (tools / "fake-tool-1.2.3").write_text(SCRIPT + "# tampered\n")
+    LazyBin(fake_tool, "1.2.3", tmp_path / "bin").fetch()
+    assert len(downloads) == 2
+    assert (tools / "fake-tool-1.2.3").read_text() == SCRIPT
+
+
+def test_lazy_bin_pinned_checksum(tmp_path, file_server):
+    url, downloads = file_server
+    fake_tool = _fake_tool_class(url)
+    tools = tmp_path / "bin" / "faketool-1.2.3"
+
+    with pytest.raises(BinaryError):
+        LazyBin(
+            fake_tool, "1.2.3", tmp_path / "bin", sha256={platform_key(): "0"}
+        ).fetch()
+    assert not (tools / "fake-tool-1.2.3").exists()
+    assert not (tools / "fake-tool-1.2.3.sha256").exists()
+
+    published = _sha256(tmp_path / "www" / "fake-tool")
+    pinned = {platform_key(): published}
+    LazyBin(fake_tool, "1.2.3", tmp_path / "bin", sha256=pinned).fetch()
+    assert (tools / "fake-tool-1.2.3.sha256").read_text() == published
+
+    # the recorded checksum cannot vouch for a binary that does not match
+    # the published one
+    (tools / "fake-tool-1.2.3").write_text(SCRIPT + "# tampered\n")
+    (tools / "fake-tool-1.2.3.sha256").write_text(
+        _sha256(tools / "fake-tool-1.2.3")
+    )
+    LazyBin(fake_tool, "1.2.3", tmp_path / "bin", sha256=pinned).fetch()
+    assert (tools / "fake-tool-1.2.3").read_text() == SCRIPT
+    assert len(downloads) == 3
+
+
+class _UnversionedTool:
+    """
+    Stand-in for an sretoolbox Binary whose file name has no version, e.g.
+    kubectl-package: it (re)downloads over whatever is there.
+    """
+
+    binary_template = "unversioned-tool"
+    downloads = 0
+
+    def __init__(self, version, download_path):
+        self.command = str(download_path / self.binary_template)
+        path = download_path / self.binary_template
+        if not path.is_file() or path.read_text() != version:
+            _UnversionedTool.downloads += 1
+            path.write_text(version)
+
+
+def test_lazy_bin_version_bump(tmp_path):
+    _UnversionedTool.downloads = 0
+    for version in ["1.0.0", "1.1.0", "1.1.0", "1.0.0"]:
+        LazyBin(_UnversionedTool, version, tmp_path).fetch()
+    assert _UnversionedTool.downloads == 2
+
+    # a binary replaced by the tool itself gets a new checksum
+    tools = tmp_path / "_unversionedtool-1.1.0"
+    (tools / "unversioned-tool").write_text("stale")
+    (tools / "unversioned-tool.sha256").write_text(
+        _sha256(tools / "unversioned-tool")
+    )
+    LazyBin(_UnversionedTool, "1.1.0", tmp_path).fetch()
+    LazyBin(_UnversionedTool, "1.1.0", tmp_path).fetch()
+    assert (tools / "unversioned-tool.sha256").read_text() == _sha256(
+        tools / "unversioned-tool"
+    )
+    assert _UnversionedTool.downloads == 3
@@ -0,0 +1,48 @@
+import shutil
+
+from managedtenants.bundles import bundle as bundle_module
+from managedtenants.bundles.bundle import Bundle
+from managedtenants.utils.cache import ResultCache
+
+BUNDLE_DIR = "tests/testdata/addons/reference-addon-multiple-bundles/main/0.1.5"
+
+
+def test_bundle_validation_cache(tmp_path, monkeypatch):
+    runs = []
+    monkeypatch.setattr(bundle_module.OPERATOR_SDK, "run", runs.append)
+    monkeypatch.setattr(bundle_module.MTCLI, "run", runs.append)
+    path = tmp_path / "reference-addon" / "main" / "0.1.5"
+    shutil.copytree(BUNDLE_DIR, path)
+    cache = ResultCache(tmp_path / "cache")
+
+    def new_bundle():
+        return Bundle(
+            addon_name="reference-addon",
+            path=path,
+            operator_name="reference-addon",
+            version="0.1.5",
+            validation_cache=cache,
+        )
+
+    new_bundle()
+    assert len(runs) == 2
+    new_bundle()
+    assert len(runs) == 2
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # new content or new tool version: validated again
+    (path / "manifests" / "extra.yaml").write_text("kind: ConfigMap\n")
+    new_bundle()
+    assert len(runs) == 4
+    monkeypatch.setattr(bundle_module.MTCLI, "version", "0.0.0")
+    new_bundle()
+    assert len(runs) == 6
+
+    # no cache, always validated
+    Bundle(
+        addon_name="reference-addon",
+        path=path,
+        operator_name="reference-addon",
+        version="0.1.5",
+    )
+    assert len(runs) == 8
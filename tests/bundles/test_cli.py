@@ -0,0 +1,37 @@
+import argparse
+
+import pytest
+
+from managedtenants.bundles.cli import MtbundlesCLI
+from managedtenants.bundles.exceptions import MtbundlesCLIError
+
+
+def _args(**kwargs):
+    defaults = {
+        "addons_dir": "tests/testdata/addons",
+        "debug": False,
+        "dry_run": True,
+        "daemonless": False,
+        "mirror": [],
+        "local_registry": False,
+        "no_validation_cache": False,
+        "enable_gitlab": False,
+    }
+    return argparse.Namespace(**{**defaults, **kwargs})
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        _args(mirror=["quay.io/osd-addons-staging"]),
+        _args(local_registry=True, enable_gitlab=True),
+        _args(
+            local_registry=True,
+            daemonless=True,
+            mirror=["quay.io/osd-addons-staging"],
+        ),
+    ],
+)
+def test_invalid_flag_combinations(args):
+    with pytest.raises(MtbundlesCLIError):
+        MtbundlesCLI(args)
@@ -0,0 +1,82 @@
+import hashlib
+import os
+import tarfile
+
+from managedtenants.bundles.context_tar import (
+    DOCKERFILE,
+    context_tar,
+    layer_tar,
+    tree_digest,
+)
+
+DOCKERFILE_CONTENT = "FROM scratch\nCOPY manifests /manifests/\n"
+
+
+def _write_bundle(path):
+    (path / "manifests").mkdir(parents=True)
+    (path / "metadata").mkdir()
+    (path / "manifests" / "csv.yaml").write_text("kind: CSV\n")
+    (path / "manifests" / "crd.yaml").write_text("kind: CRD\n")
+    (path / "metadata" / "annotations.yaml").write_text("annotations: {}\n")
+    (path / "README.md").write_text("not part of the image\n")
+
+
+def _sources(path):
+    return {
+        "manifests": path / "manifests",
+        "metadata": path / "metadata",
+    }
+
+
+def test_context_tar_content(tmp_path):
+    _write_bundle(tmp_path)
+    before = sorted(os.listdir(tmp_path))
+
+    with tarfile.open(
+        fileobj=context_tar(DOCKERFILE_CONTENT, _sources(tmp_path))
+    ) as tar:
+        assert tar.getnames() == [
+            DOCKERFILE,
+            "manifests",
+            "manifests/crd.yaml",
+            "manifests/csv.yaml",
+            "metadata",
+            "metadata/annotations.yaml",
+        ]
+        assert tar.extractfile(DOCKERFILE).read().decode() == (
+            DOCKERFILE_CONTENT
+        )
+        assert tar.extractfile("manifests/csv.yaml").read() == b"kind: CSV\n"
+        for member in tar.getmembers():
+            assert member.mtime == 0
+            assert (member.uid, member.gid) == (0, 0)
+            assert (member.uname, member.gname) == ("", "")
+
+    # nothing was written to the source directory
+    assert sorted(os.listdir(tmp_path)) == before
+
+
+def test_context_tar_is_reproducible(tmp_path):
+    first, second = tmp_path / "first", tmp_path / "second"
+    _write_bundle(first)
+    _write_bundle(second)
+    os.utime(second / "manifests" / "csv.yaml", (1, 1))
+    os.chmod(second / "metadata" / "annotations.yaml", 0o600)
+
+    assert (
+        context_tar(DOCKERFILE_CONTENT, _sources(first)).getvalue()
+        == context_tar(DOCKERFILE_CONTENT, _sources(second)).getvalue()
+    )
+
+    (second / "manifests" / "csv.yaml").write_text("kind: Changed\n")
+    assert (
+        context_tar(DOCKERFILE_CONTENT, _sources(first)).getvalue()
+        != context_tar(DOCKERFILE_CONTENT, _sources(second)).getvalue()
+    )
+
+
+def test_tree_digest(tmp_path):
+    _write_bundle(tmp_path)
+
+    expected = hashlib.sha256(layer_tar(_sources(tmp_path)).getvalue())
+    assert tree_digest(_sources(tmp_path)) == expected.hexdigest()
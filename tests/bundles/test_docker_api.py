@@ -0,0 +1,65 @@
+import base64
+import json
+
+import pytest
+from sretoolbox.container import Image
+
+from managedtenants.bundles import docker_api
+from managedtenants.bundles.docker_api import _PODMAN_IMAGE_ID
+
+IMAGE_ID = "4f6ef7a4b1c7a9f3d1e0b6f3c2a8d9e7f1b2c3d4e5f60718293a4b5c6d7e8f90"
+
+
+@pytest.mark.parametrize(
+    "stream,expected",
+    [
+        (f"{IMAGE_ID}\n", IMAGE_ID),
+        # build log lines that only hold hex characters
+        ("1234\n", None),
+        ("deadbeef\n", None),
+        (f"--> {IMAGE_ID[:12]}\n", None),
+        (f"{IMAGE_ID}0\n", None),
+    ],
+)
+def test_podman_image_id(stream, expected):
+    match = _PODMAN_IMAGE_ID.match(stream)
+    assert (match.group(1) if match else None) == expected
+
+
+def _write_dockercfg(path, host, username, password):
+    auth = base64.b64encode(f"{username}:{password}".encode()).decode()
+    (path / "config.json").write_text(
+        json.dumps({"auths": {host: {"auth": auth}}})
+    )
+
+
+def test_docker_remote_digest_credentials(tmp_path, monkeypatch):
+    _write_dockercfg(tmp_path, "quay.io", "robot", "secret")
+    monkeypatch.setattr(docker_api.docker, "from_env", lambda: None)
+    monkeypatch.setattr(docker_api.QuayAPI, "shared", lambda **kwargs: None)
+    clients = []
+
+    class _Client:
+        def __init__(self, host, *credentials, ssl_verify=True):
+            clients.append((host, credentials))
+
+        def manifest_digest(self, repo, tag):
+            return f"sha256:{repo}:{tag}"
+
+    monkeypatch.setattr(docker_api, "RegistryClient", _Client)
+    runtime = docker_api.DockerAPI(
+        registry="quay.io/osd-addons",
+        dockercfg_path=str(tmp_path),
+        quay_org="osd-addons",
+        debug=False,
+        force_push=False,
+    )
+
+    digest = runtime.remote_digest(Image("quay.io/osd-addons/a-package:1"))
+    assert digest == "sha256:osd-addons/a-package:1"
+    runtime.remote_digest(Image("registry.example.com/osd-addons/a:1"))
+    assert clients == [
+        ("quay.io", ("robot", "secret")),
+        # no credentials for that registry: anonymous
+        ("registry.example.com", ()),
+    ]
@@ -0,0 +1,256 @@
+import gzip
+import io
+import json
+import tarfile
+from types import SimpleNamespace
+
+import pytest
+
+from managedtenants.bundles.docker_api import OciAPI
+from managedtenants.bundles.exceptions import DockerError, RegistryError
+from managedtenants.bundles.oci import (
+    DOCKER_MANIFEST,
+    OCI_MANIFEST,
+    OciImage,
+    RegistryClient,
+    split_reference,
+)
+from tests.testutils.registry import FakeRegistry
+
+REPO = "osd-addons/mock-operator-bundle"
+LABELS = {"operators.operatorframework.io.bundle.package.v1": "mock-operator"}
+
+
+def _write_bundle(path, csv="kind: ClusterServiceVersion\n"):
+    (path / "manifests").mkdir(parents=True)
+    (path / "metadata").mkdir()
+    (path / "manifests" / "csv.yaml").write_text(csv)
+    (path / "metadata" / "annotations.yaml").write_text("annotations: {}\n")
+    return OciImage.from_sources(
+        {"manifests": path / "manifests", "metadata": path / "metadata"},
+        labels=LABELS,
+    )
+
+
+def test_oci_image(tmp_path):
+    image = _write_bundle(tmp_path / "first")
+
+    manifest = json.loads(image.manifest)
+    assert manifest["mediaType"] == OCI_MANIFEST
+    (layer_digest, layer), (config_digest, config) = image.blobs()
+    assert manifest["layers"][0]["digest"] == layer_digest
+    assert manifest["config"]["digest"] == config_digest
+    assert json.loads(config)["config"]["Labels"] == LABELS
+
+    with tarfile.open(fileobj=io.BytesIO(gzip.decompress(layer))) as tar:
+        assert tar.getnames() == [
+            "manifests",
+            "manifests/csv.yaml",
+            "metadata",
+            "metadata/annotations.yaml",
+        ]
+    assert image.n_files == 2
+
+    # same sources, same digest
+    assert _write_bundle(tmp_path / "second").digest == image.digest
+    assert _write_bundle(tmp_path / "third", csv="changed").digest != (
+        image.digest
+    )
+
+
+def test_push_image(tmp_path):
+    image = _write_bundle(tmp_path)
+
+    with FakeRegistry() as registry:
+        client = RegistryClient(registry.host, insecure=True)
+        assert client.manifest_digest(REPO, "1.0.0") is None
+
+        stats = client.push_image(REPO, "1.0.0", image)
+        assert (stats.uploaded, stats.mounted, stats.skipped) == (
+            len(image.layer) + len(image.config),
+            0,
+            0,
+        )
+        assert client.manifest_digest(REPO, "1.0.0") == image.digest
+        assert registry.manifests[(REPO, "1.0.0")][1] == image.manifest
+
+        # the blobs are already there, only the manifest is pushed
+        stats = client.push_image(REPO, "1.0.1", image)
+        assert (stats.uploaded, stats.skipped) == (
+            0,
+            len(image.layer) + len(image.config),
+        )
+        assert len(registry.uploaded_blobs()) == 2
+        assert client.manifest_digest(REPO, "1.0.1") == image.digest
+
+
+def test_manifest_digest_docker_manifest(tmp_path):
+    image = _write_bundle(tmp_path)
+
+    with FakeRegistry() as registry:
+        client = RegistryClient(registry.host, insecure=True)
+        client.push_image(REPO, "1.0.0", image)
+        # as pushed by docker or podman
+        client.put_manifest(
+            REPO, "docker", image.manifest, media_type=DOCKER_MANIFEST
+        )
+        assert client.manifest_digest(REPO, "docker") == image.digest
+
+
+def test_push_image_token_auth(tmp_path):
+    image = _write_bundle(tmp_path)
+
+    with FakeRegistry(credentials=("robot", "secret")) as registry:
+        client = RegistryClient(
+            registry.host, username="robot", password="secret", insecure=True
+        )
+        client.push_image(REPO, "1.0.0", image)
+        assert client.manifest_digest(REPO, "1.0.0") == image.digest
+        # a single token request, reused for the following requests
+        assert registry.requests.count(("GET", "/token")) == 1
+
+        # the token expired: a new one is requested
+        registry.token = "fake-registry-token-2"
+        client.push_image(REPO, "1.0.1", image)
+        assert client.manifest_digest(REPO, "1.0.1") == image.digest
+        assert registry.requests.count(("GET", "/token")) == 2
+
+        anonymous = RegistryClient(registry.host, insecure=True)
+        with pytest.raises(RegistryError):
+            anonymous.push_image(REPO, "1.0.0", image)
+
+
+def test_push_image_mount(tmp_path):
+    image = _write_bundle(tmp_path)
+    mirror = "osd-addons-staging/mock-operator-bundle"
+
+    with FakeRegistry() as registry:
+        client = RegistryClient(registry.host, insecure=True)
+        client.push_image(REPO, "1.0.0", image)
+
+        stats = client.push_image(mirror, "1.0.0", image, mount_from=REPO)
+        assert (stats.uploaded, stats.mounted) == (
+            0,
+            len(image.layer) + len(image.config),
+        )
+        assert len(registry.uploaded_blobs()) == 2
+        assert client.manifest_digest(mirror, "1.0.0") == image.digest
+
+        # nothing to mount from, the blobs are uploaded
+        stats = client.push_image("other/repo", "1.0.0", image, "missing/repo")
+        assert stats.mounted == 0 and stats.uploaded > 0
+
+
+@pytest.mark.parametrize(
+    "reference,expected",
+    [
+        (
+            "quay.io/osd-addons/foo-bundle:1.0.0-abc",
+            ("quay.io", "osd-addons/foo-bundle", "1.0.0-abc"),
+        ),
+        (
+            "localhost:5000/osd-addons/foo-index:abc",
+            ("localhost:5000", "osd-addons/foo-index", "abc"),
+        ),
+    ],
+)
+def test_split_reference(reference, expected):
+    assert split_reference(reference) == expected
+
+
+def test_registry_client_incomplete_credentials():
+    with pytest.raises(RegistryError):
+        RegistryClient("quay.io", username="robot")
+    with pytest.raises(RegistryError):
+        RegistryClient("quay.io", password="secret")
+
+
+def test_split_reference_invalid():
+    with pytest.raises(ValueError):
+        split_reference("localhost:5000/no-tag")
+
+
+def test_oci_api(tmp_path):
+    _write_bundle(tmp_path)
+
+    with FakeRegistry() as registry:
+        oci_api = OciAPI(
+            registry=f"{registry.host}/osd-addons",
+            quay_org="osd-addons",
+            debug=False,
+            force_push=False,
+            insecure=True,
+        )
+        url_tag = f"{registry.host}/{REPO}:1.0.0"
+        bundle = SimpleNamespace(
+            path=tmp_path,
+            annotations=LABELS,
+            image=SimpleNamespace(url_tag=url_tag, image=REPO.split("/")[1]),
+        )
+
+        image = oci_api.build_bundle(bundle)
+        oci_api.push(bundle.image)
+        assert registry.manifests[(REPO, "1.0.0")][1] == image.manifest
+
+        # the tag already exists, nothing is pushed without force_push
+        oci_api.build_bundle(bundle)
+        oci_api.push(bundle.image)
+        assert [r for r in registry.requests if r[0] == "PUT"] == [
+            *[("PUT", path) for path in registry.uploaded_blobs()],
+            ("PUT", f"/v2/{REPO}/manifests/1.0.0"),
+        ]
+
+        with pytest.raises(DockerError):
+            oci_api.push(SimpleNamespace(url_tag=f"{registry.host}/x/y:z"))
+
+    # connection errors are DockerErrors too
+    oci_api = OciAPI(
+        registry="127.0.0.1:1/osd-addons",
+        quay_org="osd-addons",
+        debug=False,
+        force_push=False,
+        insecure=True,
+    )
+    bundle.image.url_tag = f"127.0.0.1:1/{REPO}:1.0.0"
+    oci_api.build_bundle(bundle)
+    with pytest.raises(DockerError):
+        oci_api.push(bundle.image)
+
+
+def test_oci_api_mirrors(tmp_path):
+    _write_bundle(tmp_path)
+
+    with FakeRegistry() as registry, FakeRegistry() as other:
+        oci_api = OciAPI(
+            registry=f"{registry.host}/osd-addons",
+            quay_org="osd-addons",
+            debug=False,
+            force_push=False,
+            mirrors=[
+                f"{registry.host}/osd-addons-staging",
+                f"{other.host}/osd-addons",
+            ],
+            insecure=True,
+        )
+        bundle = SimpleNamespace(
+            path=tmp_path,
+            annotations=LABELS,
+            image=SimpleNamespace(url_tag=f"{registry.host}/{REPO}:1.0.0"),
+        )
+        image = oci_api.build_bundle(bundle)
+        oci_api.push(bundle.image)
+
+        size = len(image.layer) + len(image.config)
+        for target, repo in [
+            (registry, REPO),
+            (registry, "osd-addons-staging/mock-operator-bundle"),
+            (other, REPO),
+        ]:
+            assert target.manifests[(repo, "1.0.0")][1] == image.manifest
+        # uploaded once per registry host, mounted for the staging org
+        assert len(registry.uploaded_blobs()) == 2
+        assert len(other.uploaded_blobs()) == 2
+        assert (oci_api.stats.uploaded, oci_api.stats.mounted) == (
+            2 * size,
+            size,
+        )
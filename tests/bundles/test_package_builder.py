@@ -0,0 +1,97 @@
+from managedtenants.bundles import package_builder
+from managedtenants.bundles.addon_package import AddonPackage
+from managedtenants.bundles.context_tar import tree_digest
+from managedtenants.bundles.docker_api import OciAPI
+from managedtenants.bundles.oci import DOCKER_MANIFEST, OciImage, RegistryClient
+from managedtenants.bundles.package_builder import PackageBuilder
+from managedtenants.utils.cache import ResultCache
+from tests.testutils.registry import FakeRegistry
+
+
+def _package(tmp_path, content="kind: PackageManifest\n"):
+    path = tmp_path / "mock-operator" / "package"
+    path.mkdir(parents=True, exist_ok=True)
+    (path / "manifest.yaml").write_text(content)
+    return AddonPackage(path)
+
+
+def test_package_builder_skips_unchanged(tmp_path, monkeypatch):
+    validated = []
+    monkeypatch.setattr(
+        package_builder.KUBECTL_PACKAGE, "run", validated.append
+    )
+
+    with FakeRegistry() as registry:
+        oci_api = OciAPI(
+            registry=f"{registry.host}/osd-addons",
+            quay_org="osd-addons",
+            debug=False,
+            force_push=False,
+            insecure=True,
+        )
+
+        def builder():
+            return PackageBuilder(
+                docker_api=oci_api,
+                validation_cache=ResultCache(tmp_path / "cache"),
+            )
+
+        first = builder().build_and_push(_package(tmp_path))
+        assert len(validated) == 1
+        repo, tag = "osd-addons/mock-operator-package", first.tag
+        assert (repo, tag) in registry.manifests
+
+        # same content: the pushed image is reused as is
+        n_requests = len(registry.requests)
+        second = builder().build_and_push(_package(tmp_path))
+        assert second.url_tag == first.url_tag
+        assert len(validated) == 1
+        assert registry.requests[n_requests:] == [
+            ("HEAD", f"/v2/{repo}/manifests/{tag}")
+        ]
+
+        # new content, new tag
+        third = builder().build_and_push(_package(tmp_path, "changed"))
+        assert third.tag != tag
+        assert len(validated) == 2
+
+        # validated, but never pushed (e.g. a dry run)
+        builder_ = builder()
+        builder_.dry_run = True
+        builder_.build_and_push(_package(tmp_path, "dry run"))
+        assert len(validated) == 3
+        builder().build_and_push(_package(tmp_path, "dry run"))
+        assert len(validated) == 3
+
+
+def test_package_builder_reuses_docker_manifest(tmp_path, monkeypatch):
+    validated = []
+    monkeypatch.setattr(
+        package_builder.KUBECTL_PACKAGE, "run", validated.append
+    )
+    addon_package = _package(tmp_path)
+    repo = "osd-addons/mock-operator-package"
+    tag = tree_digest({"package": addon_package.path})[:12]
+
+    with FakeRegistry() as registry:
+        # pushed by a previous docker or podman run
+        image = OciImage.from_sources({"package": addon_package.path})
+        client = RegistryClient(registry.host, insecure=True)
+        for digest, content in image.blobs():
+            client.upload_blob(repo, digest, content)
+        client.put_manifest(repo, tag, image.manifest, DOCKER_MANIFEST)
+
+        oci_api = OciAPI(
+            registry=f"{registry.host}/osd-addons",
+            quay_org="osd-addons",
+            debug=False,
+            force_push=False,
+            insecure=True,
+        )
+        builder = PackageBuilder(
+            docker_api=oci_api,
+            validation_cache=ResultCache(tmp_path / "cache"),
+        )
+        assert builder.build_and_push(addon_package).tag == tag
+        assert validated == []
+        assert oci_api.images == {}
@@ -0,0 +1,94 @@
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from managedtenants.bundles.exceptions import QuayAPIError
+from managedtenants.bundles.quay_api import QuayAPI
+
+PAGES = {
+    None: {"repositories": [{"name": "a-bundle"}], "next_page": "p2"},
+    "p2": {"repositories": [{"name": "a-index"}, {"name": "a-package"}]},
+}
+
+
+def _quay_api(monkeypatch):
+    quay_api = QuayAPI(org="osd-addons", token="token")
+    calls = []
+
+    def fake_api(method, url, dont_raise_for=None, **kwargs):
+        calls.append((method.__name__, url, kwargs))
+        if method.__name__ == "get":
+            page = PAGES[kwargs["params"].get("next_page")]
+            return SimpleNamespace(status_code=200, json=lambda: page)
+        return SimpleNamespace(status_code=201, json=dict)
+
+    monkeypatch.setattr(quay_api, "_api", fake_api)
+    return quay_api, calls
+
+
+def test_repo_inventory(monkeypatch):
+    quay_api, calls = _quay_api(monkeypatch)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        found = list(
+            executor.map(
+                quay_api.repo_exists, ["a-bundle", "a-index", "a-package"] * 4
+            )
+        )
+    assert all(found)
+    assert not quay_api.repo_exists("b-bundle")
+    # a single listing, one request per page
+    assert [call[0] for call in calls] == ["get", "get"]
+    assert calls[0][2]["params"] == {"namespace": "osd-addons"}
+
+    quay_api.ensure_repo("b-bundle")
+    quay_api.ensure_repo("b-bundle")
+    assert quay_api.repo_exists("b-bundle")
+    assert [call[0] for call in calls] == ["get", "get", "post"]
+
+
+def test_repo_create_already_exists(monkeypatch):
+    quay_api, calls = _quay_api(monkeypatch)
+    assert not quay_api.repo_exists("b-bundle")
+
+    def fake_post(method, url, dont_raise_for=None, **kwargs):
+        calls.append((method.__name__, url, kwargs))
+        assert 400 in dont_raise_for
+        body = {"error_message": "Repository already exists"}
+        return SimpleNamespace(status_code=400, json=lambda: body)
+
+    # created by a concurrent job after the listing
+    monkeypatch.setattr(quay_api, "_api", fake_post)
+    assert quay_api.ensure_repo("b-bundle")
+    assert quay_api.repo_exists("b-bundle")
+
+
+def test_repo_create_bad_request(monkeypatch):
+    quay_api = QuayAPI(org="osd-addons", token="token")
+    body = {"error_message": "Invalid repository name"}
+    response = SimpleNamespace(
+        status_code=400,
+        json=lambda: body,
+        text=str(body),
+        raise_for_status=_raise(requests.exceptions.HTTPError("400")),
+    )
+    monkeypatch.setattr(quay_api, "_api", lambda *args, **kwargs: response)
+    with pytest.raises(QuayAPIError):
+        quay_api.repo_create("B-bundle")
+
+
+def test_shared(monkeypatch):
+    monkeypatch.setenv("QUAY_APIKEY", "token")
+    monkeypatch.setattr(QuayAPI, "_shared", {})
+    quay_api = QuayAPI.shared(org="osd-addons")
+    assert QuayAPI.shared(org="osd-addons") is quay_api
+    assert QuayAPI.shared(org="other-org") is not quay_api
+
+
+def _raise(exception):
+    def raise_for_status():
+        raise exception
+
+    return raise_for_status
@@ -0,0 +1,137 @@
+import io
+import os
+import sqlite3
+import tarfile
+import tempfile
+
+import pytest
+
+from managedtenants.bundles.docker_api import _extract_from_archive
+from managedtenants.bundles.exceptions import DockerError
+from managedtenants.bundles.sql_catalog import (
+    CatalogBundle,
+    Channel,
+    Package,
+    SQLCatalog,
+    UpgradeEdge,
+)
+
+BUNDLES = [
+    ("mock-operator.v0.1.0", "0.1.0", "127.0.0.1:5555/org/mock-bundle:0.1.0"),
+    ("mock-operator.v0.2.0", "0.2.0", "127.0.0.1:5555/org/mock-bundle:0.2.0"),
+]
+
+
+def _index_db(tmp_path):
+    """A minimal opm sqlite catalog: one package, two bundles, one edge."""
+    path = tmp_path / "index.db"
+    db = sqlite3.connect(path)
+    db.executescript(
+        """
+        CREATE TABLE package (name TEXT PRIMARY KEY, default_channel TEXT);
+        CREATE TABLE channel (
+            name TEXT, package_name TEXT, head_operatorbundle_name TEXT
+        );
+        CREATE TABLE operatorbundle (
+            name TEXT PRIMARY KEY, version TEXT, bundlepath TEXT
+        );
+        CREATE TABLE channel_entry (
+            entry_id INTEGER PRIMARY KEY, channel_name TEXT,
+            package_name TEXT, operatorbundle_name TEXT, replaces INTEGER
+        );
+        CREATE TABLE properties (type TEXT, operatorbundle_name TEXT);
+        INSERT INTO package VALUES ('mock-operator', 'alpha');
+        INSERT INTO channel
+            VALUES ('alpha', 'mock-operator', 'mock-operator.v0.2.0');
+        INSERT INTO channel_entry
+            VALUES (1, 'alpha', 'mock-operator', 'mock-operator.v0.1.0', NULL);
+        INSERT INTO channel_entry
+            VALUES (2, 'alpha', 'mock-operator', 'mock-operator.v0.2.0', 1);
+        """
+    )
+    for bundle in BUNDLES:
+        db.execute("INSERT INTO operatorbundle VALUES (?, ?, ?)", bundle)
+        for prop in ["olm.package", "olm.gvk", "olm.bundle.object"]:
+            db.execute(
+                "INSERT INTO properties VALUES (?, ?)", (prop, bundle[0])
+            )
+    db.commit()
+    db.close()
+    return io.BytesIO(path.read_bytes())
+
+
+def test_sql_catalog(tmp_path):
+    with SQLCatalog.from_fileobj(_index_db(tmp_path)) as catalog:
+        assert catalog.packages() == [Package("mock-operator", "alpha")]
+        assert catalog.channels() == [
+            Channel("mock-operator", "alpha", "mock-operator.v0.2.0")
+        ]
+        assert catalog.channels("other-operator") == []
+        assert catalog.bundles() == [CatalogBundle(*b) for b in BUNDLES]
+        assert catalog.bundles("mock-operator") == catalog.bundles()
+        assert catalog.upgrade_edges() == [
+            UpgradeEdge(
+                "mock-operator",
+                "alpha",
+                "mock-operator.v0.1.0",
+                "mock-operator.v0.2.0",
+            )
+        ]
+        # one row per bundle, not per property
+        assert catalog.get_bundles() == [(b[0], b[2]) for b in BUNDLES]
+        assert (
+            catalog.describe()[0]
+            == "package mock-operator (default channel: alpha)"
+        )
+        workdir = catalog._workdir.name
+
+    assert not os.path.exists(workdir)
+
+
+def test_sql_catalog_unexpected_schema(tmp_path, monkeypatch):
+    path = tmp_path / "index.db"
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE operatorbundle (name TEXT)")
+    db.commit()
+    db.close()
+
+    workdirs = []
+    temporary_directory = tempfile.TemporaryDirectory
+
+    def tracked_temporary_directory():
+        workdirs.append(temporary_directory())
+        return workdirs[-1]
+
+    monkeypatch.setattr(
+        tempfile, "TemporaryDirectory", tracked_temporary_directory
+    )
+    with pytest.raises(sqlite3.Error):
+        SQLCatalog.from_fileobj(io.BytesIO(path.read_bytes()))
+    assert not os.path.exists(workdirs[0].name)
+
+
+def _archive_chunks(files, chunk_size=100):
+    fileobj = io.BytesIO()
+    with tarfile.open(fileobj=fileobj, mode="w") as tar:
+        for name, content in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+    fileobj.seek(0)
+    return iter(lambda: fileobj.read(chunk_size), b"")
+
+
+def test_extract_from_archive():
+    content = os.urandom(5000)
+    dest = io.BytesIO()
+    _extract_from_archive(
+        _archive_chunks({"index.db": content}), "/database/index.db", dest
+    )
+    assert dest.getvalue() == content
+
+    with pytest.raises(DockerError):
+        _extract_from_archive(
+            _archive_chunks({"other.db": content}),
+            "/database/index.db",
+            io.BytesIO(),
+        )
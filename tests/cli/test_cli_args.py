@@ -0,0 +1,20 @@
+import sys
+
+import pytest
+
+from managedtenants.cli import Cli
+
+
+@pytest.mark.parametrize(
+    "argv", [["tools", "prefetch"], ["serve", "--port", "0"]]
+)
+def test_addons_dir_not_required(argv, monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["managedtenants", *argv])
+    assert Cli().args.addons_dir is None
+
+
+@pytest.mark.parametrize("argv", [["load"], ["bundles"]])
+def test_addons_dir_required(argv, monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["managedtenants", *argv])
+    with pytest.raises(SystemExit):
+        Cli()
@@ -0,0 +1,85 @@
+import re
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Generous budgets (in seconds) catching a heavy dependency creeping back into
+# the import chain, not small fluctuations between machines.
+VERSION_BUDGET = 0.3
+LOAD_BUDGET = 1.0
+
+# Only needed by the `bundles` subcommand.
+BUNDLES_ONLY_MODULES = {
+    "docker",
+    "podman",
+    "gitlab",
+    "sretoolbox.binaries",
+    "sretoolbox.container",
+    "managedtenants.bundles",
+}
+
+IMPORTTIME_RE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)")
+
+
+def _importtime(argv):
+    """
+    Runs the managedtenants entry point with `-X importtime`.
+
+    :return: ({module: cumulative import time in seconds}, total in seconds)
+    """
+    code = (
+        "import sys;"
+        f"sys.argv = {['managedtenants', *argv]!r};"
+        "from managedtenants.cli import main;"
+        "main()"
+    )
+    # warm up the bytecode cache, the first import compiles the modules
+    for _ in range(2):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    assert proc.returncode == 0, proc.stderr
+
+    modules = {}
+    total = 0
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match is None:
+            continue
+        cumulative, indent, module = match.groups()
+        modules[module] = int(cumulative) / 1e6
+        # interpreter startup is not ours to optimize
+        if not indent and module != "site":
+            total += int(cumulative) / 1e6
+    return modules, total
+
+
+@pytest.fixture
+def addons_dir(tmp_path):
+    shutil.copytree(
+        Path("tests/testdata/addons/test-operator"),
+        tmp_path / "test-operator",
+    )
+    return tmp_path
+
+
+def test_version_import_time():
+    modules, total = _importtime(["--version"])
+
+    assert "managedtenants.core.addons_loader" not in modules
+    assert not BUNDLES_ONLY_MODULES & set(modules)
+    assert total < VERSION_BUDGET
+
+
+def test_load_import_time(addons_dir):
+    modules, total = _importtime(["--addons-dir", str(addons_dir), "load"])
+
+    assert "managedtenants.core.addons_loader" in modules
+    assert not BUNDLES_ONLY_MODULES & set(modules)
+    assert total < LOAD_BUDGET
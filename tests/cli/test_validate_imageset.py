@@ -0,0 +1,82 @@
+import io
+import shutil
+from pathlib import Path
+
+import pytest
+
+from managedtenants.cli.validate_imageset import (
+    expand_paths,
+    main,
+    validate_content,
+)
+
+IMAGESETS_DIR = Path(
+    "tests/testdata/addons/mock-operator-with-imagesets/addonimagesets/stage"
+)
+VALID = IMAGESETS_DIR / "mock-operator.v1.0.0.yml"
+INVALID = IMAGESETS_DIR / "test-invalid-imageset.yml"
+
+
+def test_validate_content_multi_documents():
+    content = "\n".join(
+        [VALID.read_text(), "---", "name: INVALID", "relatedImages: [1]", ""]
+    )
+    first_line = content.splitlines().index("name: INVALID") + 1
+
+    errors, documents = validate_content(content, "imagesets.yaml")
+
+    assert documents == 2
+    assert [(line, msg.split(":")[1].strip()) for _, line, msg in errors] == [
+        (
+            first_line,
+            "'INVALID' does not match '^[a-z-]+.v[0-9A-Za-z\\\\.-]+$'",
+        ),
+        (first_line, "'indexImage' is a required property"),
+        (first_line + 1, "1 is not of type 'string'"),
+    ]
+
+
+def test_validate_content_invalid_yaml():
+    errors, documents = validate_content("name: foo\nfoo: [\n", "bad.yaml")
+
+    assert documents == 0
+    assert len(errors) == 1
+    assert errors[0][0] == "bad.yaml"
+    assert errors[0][2].startswith("Invalid yaml")
+
+
+def test_expand_paths(tmp_path):
+    shutil.copytree(IMAGESETS_DIR, tmp_path / "stage")
+
+    paths = expand_paths(
+        [str(tmp_path), str(tmp_path / "stage" / "*.v1.0.*.yml"), "-"]
+    )
+
+    assert len(paths) == len(list(IMAGESETS_DIR.iterdir())) + 1
+    assert paths[-1] == "-"
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_main_batch(tmp_path, capsys, jobs):
+    for i in range(20):
+        shutil.copy(VALID, tmp_path / f"valid-{i}.yml")
+    shutil.copy(INVALID, tmp_path / "invalid.yml")
+
+    with pytest.raises(SystemExit) as exc:
+        main(["--jobs", jobs, str(tmp_path)])
+
+    assert exc.value.code == 1
+    out, err = capsys.readouterr()
+    assert out.splitlines() == [
+        f"{tmp_path / 'invalid.yml'}:1: Schema validation failed: 'name' is a"
+        " required property"
+    ]
+    assert "1 errors in 21 imagesets from 21 files" in err
+
+
+def test_main_stdin(monkeypatch, capsys):
+    monkeypatch.setattr("sys.stdin", io.StringIO(VALID.read_text()))
+
+    main([])
+
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,114 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from managedtenants.core import runner
+from managedtenants.core.report import RunReport
+from managedtenants.core.tasks_loader.exceptions import TaskFail, TaskSkip
+
+PAYLOAD = b'{"kind": "AddonList"}'
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):  # pylint: disable=invalid-name
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+
+    def log_message(self, *args):  # silence the test output
+        pass
+
+
+@pytest.fixture
+def http_server():
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+class FakeTask:
+    def __init__(self, name, func, session=None):
+        self.name = name
+        self.run = func
+        self.environment = SimpleNamespace(
+            session=session if session is not None else requests.Session()
+        )
+
+
+def _skip():
+    raise TaskSkip("nothing to do")
+
+
+def _fail():
+    raise TaskFail("broken")
+
+
+def test_report_records_http_calls(http_server):
+    session = requests.Session()
+
+    def call_api():
+        session.get(http_server)
+        session.get(http_server)
+        # not issued through the task session
+        requests.get(http_server)
+
+    report = RunReport()
+    runner.run(
+        [FakeTask("api", call_api, session), FakeTask("skip", _skip, session)],
+        title="TASKS",
+        report=report,
+    )
+
+    api, skip = report.records
+    assert (api.status, skip.status) == ("OK", "SKIP")
+    assert api.phase == "TASKS"
+    assert api.total_http_calls == 2
+    assert api.http_bytes_received == 2 * len(PAYLOAD)
+    assert skip.total_http_calls == 0
+    assert skip.message == "nothing to do"
+    # the hook is only installed while the task runs
+    assert not session.hooks["response"]
+
+
+def test_report_keeps_patched_send(monkeypatch):
+    def fake_send(self, request, **kwargs):
+        return requests.Response()
+
+    def patch_send():
+        monkeypatch.setattr(requests.Session, "send", fake_send)
+
+    report = RunReport()
+    runner.run([FakeTask("patch", patch_send)], report=report)
+    assert requests.Session.send is fake_send
+
+
+def test_report_on_failure(tmp_path):
+    report = RunReport()
+    with pytest.raises(SystemExit):
+        runner.run([FakeTask("fail", _fail)], report=report)
+
+    report.write(tmp_path / "report.json", "json")
+    with open(tmp_path / "report.json", encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["tasks"][0]["status"] == "FAIL"
+    assert data["tasks"][0]["message"] == "broken"
+
+    junit = report.to_junit().getroot()
+    assert junit.get("failures") == "1"
+    assert junit.find("testcase/failure").get("message") == "broken"
+
+
+def test_slowest():
+    report = RunReport()
+    for name in ("a", "b", "c"):
+        with report.trace(name=name, phase=None) as record:
+            pass
+        record.duration = {"a": 1.0, "b": 3.0, "c": 2.0}[name]
+    assert [r.name for r in report.slowest(2)] == ["b", "c"]
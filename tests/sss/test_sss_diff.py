@@ -0,0 +1,91 @@
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from managedtenants.core.sss_diff import (
+    ADDED,
+    CHANGED,
+    REMOVED,
+    DiffEntry,
+    diff_addons,
+    structural_diff,
+)
+from tests.testutils.addon_helpers import addon_with_indeximage  # noqa: F401
+
+ADDON = Path("tests/testdata/addons/test-operator")
+
+
+def test_structural_diff_identical(addon_with_indeximage):
+    data = addon_with_indeximage.sss.data
+    assert not list(structural_diff(data, data))
+
+
+def test_structural_diff_mappings():
+    old = {"a": 1, "b": {"c": 2}, "d": 3}
+    new = {"a": 1, "b": {"c": 4}, "e": 5}
+    assert list(structural_diff(old, new)) == [
+        DiffEntry(CHANGED, "b.c", 2, 4),
+        DiffEntry(REMOVED, "d", 3, None),
+        DiffEntry(ADDED, "e", None, 5),
+    ]
+
+
+def test_structural_diff_matches_resources_by_kind_and_name():
+    ns_a = {"kind": "Namespace", "metadata": {"name": "a"}}
+    ns_b = {"kind": "Namespace", "metadata": {"name": "b"}}
+    secret = {"kind": "Secret", "metadata": {"name": "a"}, "data": {"x": "1"}}
+    new_secret = {"kind": "Secret", "metadata": {"name": "a"}, "data": {}}
+
+    old = {"resources": [ns_a, secret]}
+    new = {"resources": [ns_b, ns_a, new_secret]}
+    assert list(structural_diff(old, new)) == [
+        DiffEntry(REMOVED, "resources[Secret/a].data.x", "1", None),
+        DiffEntry(ADDED, "resources[Namespace/b]", None, ns_b),
+    ]
+
+
+def test_structural_diff_positional_lists():
+    assert list(structural_diff({"l": [1, 2]}, {"l": [1, 3, 4]})) == [
+        DiffEntry(CHANGED, "l[1]", 2, 3),
+        DiffEntry(ADDED, "l[2]", None, 4),
+    ]
+
+
+def _git(path, *args):
+    subprocess.run(["git", "-C", str(path), *args], check=True)
+
+
+@pytest.fixture
+def addons_repo(tmp_path):
+    """A repository with a committed addons/mock-operator."""
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "config", "user.email", "test@example.com")
+    _git(tmp_path, "config", "user.name", "test")
+    shutil.copytree(ADDON, tmp_path / "addons" / "mock-operator")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "init")
+    return tmp_path / "addons"
+
+
+def test_diff_addons(addons_repo):
+    assert not diff_addons(addons_repo, "stage", "HEAD")
+
+    addon_yaml = addons_repo / "mock-operator" / "metadata/stage/addon.yaml"
+    addon_yaml.write_text(
+        addon_yaml.read_text().replace(
+            "namespaceLabels: {}", "namespaceLabels: {team: mt-sre}"
+        )
+    )
+    # a new addon, not committed yet
+    shutil.copytree(ADDON, addons_repo / "new-operator")
+
+    diffs = dict(diff_addons(addons_repo, "stage", "HEAD"))
+    assert sorted(diffs) == ["mock-operator", "new-operator"]
+    assert {entry.op for entry in diffs["new-operator"]} == {ADDED}
+    changed = [str(entry) for entry in diffs["mock-operator"]]
+    assert changed and all('"mt-sre"' in line for line in changed)
+
+    only = diff_addons(addons_repo, "stage", "HEAD", addon_name="new-operator")
+    assert [name for name, _ in only] == ["new-operator"]
@@ -0,0 +1,130 @@
+import pytest
+
+from managedtenants.core.addons_loader.sss import SssIndex
+from tests.testutils.addon_helpers import addon_with_indeximage  # noqa: F401
+
+ADDON_NAME = "test-operator"
+NAMESPACE = "redhat-test-operator"
+DELETE_LABEL = {"api.openshift.com/addon-test-operator-delete": "true"}
+
+
+def _sss(addon_name, resources, delete_resources=()):
+    return {
+        "items": [
+            {
+                "kind": "SelectorSyncSet",
+                "metadata": {"name": f"addon-{addon_name}"},
+                "spec": {"resources": list(resources)},
+            },
+            {
+                "kind": "SelectorSyncSet",
+                "metadata": {"name": f"addon-{addon_name}-delete"},
+                "spec": {"resources": list(delete_resources) or None},
+            },
+            {
+                "kind": "PagerDutyIntegration",
+                "metadata": {"name": f"addon-{addon_name}"},
+            },
+        ]
+    }
+
+
+def _resource(kind, name, namespace=None, labels=None):
+    metadata = {"name": name}
+    if namespace is not None:
+        metadata["namespace"] = namespace
+    if labels is not None:
+        metadata["labels"] = labels
+    return {"kind": kind, "metadata": metadata}
+
+
+def test_sss_index_typed_accessors(addon_with_indeximage):  # noqa: F811
+    index = addon_with_indeximage.sss.index()
+
+    assert [r.name for r in index.namespaces()] == [NAMESPACE]
+    assert [r.name for r in index.catalog_sources()] == [
+        f"addon-{ADDON_NAME}-catalog"
+    ]
+    assert [r.name for r in index.operator_groups()] == [
+        "redhat-layered-product-og"
+    ]
+    (subscription,) = index.subscriptions(addon=ADDON_NAME)
+    assert subscription.addon == ADDON_NAME
+    assert subscription.namespace == NAMESPACE
+    assert subscription.resource["spec"]["name"] is not None
+
+
+def test_sss_index_matches_walker(addon_with_indeximage):  # noqa: F811
+    walker = addon_with_indeximage.sss.walker()
+
+    for key, delete in [("sss_deploy", False), ("sss_delete", True)]:
+        index = addon_with_indeximage.sss.index(delete=delete)
+        resources = walker[key]["spec"]["resources"]
+        assert index.kinds() == sorted(resources)
+        for kind, entries in resources.items():
+            assert [(r.name, r.resource) for r in index.by_kind(kind)] == (
+                entries
+            )
+
+
+def test_sss_index_delete_labels(addon_with_indeximage):  # noqa: F811
+    index = addon_with_indeximage.sss.index(delete=True)
+
+    assert {r.kind for r in index.select(DELETE_LABEL)} == {
+        "Namespace",
+        "ConfigMap",
+    }
+    assert [r.kind for r in index.select(DELETE_LABEL, kind="ConfigMap")] == [
+        "ConfigMap"
+    ]
+    assert index.select({**DELETE_LABEL, "missing": "label"}) == []
+
+
+def test_sss_index_fleet():
+    index = SssIndex()
+    for name in ["foo", "bar"]:
+        index.add(
+            name,
+            _sss(
+                name,
+                [
+                    _resource("Namespace", f"redhat-{name}"),
+                    _resource("OperatorGroup", "og", f"redhat-{name}"),
+                    _resource(
+                        "Secret",
+                        "shared",
+                        f"redhat-{name}",
+                        labels={"app": name, "tier": "backend"},
+                    ),
+                ],
+            ),
+        )
+
+    assert len(index) == 6
+    assert [r.addon for r in index.by_name("OperatorGroup", "og")] == [
+        "foo",
+        "bar",
+    ]
+    assert (
+        index.get("OperatorGroup", "og", addon="bar").namespace == "redhat-bar"
+    )
+    with pytest.raises(LookupError):
+        index.get("OperatorGroup", "og")
+    assert index.get("OperatorGroup", "missing") is None
+
+    assert [r.addon for r in index.by_namespace("Secret", "redhat-foo")] == [
+        "foo"
+    ]
+    assert [r.name for r in index.by_namespace("Namespace", None)] == [
+        "redhat-foo",
+        "redhat-bar",
+    ]
+    assert [r.addon for r in index.select({"tier": "backend"})] == [
+        "foo",
+        "bar",
+    ]
+    assert [
+        r.addon for r in index.select({"tier": "backend", "app": "bar"})
+    ] == ["bar"]
+    assert len(index.select({})) == 6
+    assert index.namespaces(addon="missing") == []
@@ -3,6 +3,7 @@ from hypothesis import given
 
 import tests.testutils.strategies as custom_strategies
 from managedtenants.core.addons_loader.sss import Sss
+from tests.testutils.addon_helpers import addon_with_indeximage  # noqa: F401
 
 
 @given(hypothesis_strategies.data())
@@ -63,6 +64,26 @@ def test_sss_delete(data):
     assert target_ns == resources["ConfigMap"][0][1]["metadata"]["namespace"]
 
 
+def test_sss_walker_does_not_copy_data(addon_with_indeximage):  # noqa: F811
+    sss = addon_with_indeximage.sss
+    resources = sss.data["items"][0]["spec"]["resources"]
+    walker = sss.walker()
+    walked = walker["sss_deploy"]["spec"]["resources"]
+
+    # the walked resources are the ones of the rendered data
+    assert any(r is resources[0] for _, r in walked[resources[0]["kind"]])
+    # and the rendered data was left untouched
+    assert sss.data["items"][0]["spec"]["resources"] is resources
+
+
+def test_sss_data_is_parsed_once(addon_with_indeximage):  # noqa: F811
+    sss = addon_with_indeximage.sss
+    assert sss.data is sss.data
+    # the rendered text is dropped once parsed
+    assert sss._content is None
+    assert not hasattr(addon_with_indeximage, "__dict__")
+
+
 # TODO
 # @given(hypothesis_strategies.data())
 # def test_pagerduty(data):
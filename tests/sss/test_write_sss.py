@@ -0,0 +1,34 @@
+import json
+from io import StringIO
+
+import pytest
+import yaml
+
+from managedtenants.core.addons_loader.sss import write_sss
+from tests.testutils.addon_helpers import addon_with_indeximage  # noqa: F401
+
+
+def _parse(output_format, content):
+    if output_format == "yaml":
+        return list(yaml.load_all(content, Loader=yaml.CSafeLoader))
+    if output_format == "json":
+        return json.loads(content)
+    return [json.loads(line) for line in content.splitlines()]
+
+
+@pytest.mark.parametrize("output_format", ["yaml", "json", "ndjson"])
+@pytest.mark.parametrize("n_addons", [0, 1, 3])
+def test_write_sss(addon_with_indeximage, output_format, n_addons):
+    stream = StringIO()
+    addons = (addon_with_indeximage for _ in range(n_addons))
+
+    count = write_sss(addons, output_format, stream)
+
+    assert count == n_addons
+    documents = _parse(output_format, stream.getvalue())
+    assert documents == [addon_with_indeximage.sss.data] * n_addons
+
+
+def test_write_sss_invalid_format(addon_with_indeximage):
+    with pytest.raises(ValueError):
+        write_sss([addon_with_indeximage], "xml", StringIO())
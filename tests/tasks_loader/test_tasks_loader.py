@@ -0,0 +1,111 @@
+import argparse
+import sys
+
+import pytest
+
+from managedtenants import PostTask, PreTask, Task
+from managedtenants.core.tasks_loader import discover_task_classes, load_tasks
+from tests.testutils.addon_helpers import addon_with_indeximage  # noqa: F401
+
+TASKS = """
+from managedtenants import PostTask, PreTask, Task
+
+import helper
+
+helper.IMPORTS += 1
+
+
+class CheckPre(PreTask):
+    def run(self):
+        pass
+
+
+class CheckAddon(Task):
+    def run(self):
+        pass
+
+
+class CheckPost(PostTask):
+    def run(self):
+        pass
+"""
+
+
+def cli_args():
+    return argparse.Namespace(
+        environment="stage",
+        ocm_api=None,
+        ocm_api_insecure=False,
+        dry_run=False,
+    )
+
+
+@pytest.fixture
+def tasks_dir(tmp_path):
+    (tmp_path / "helper.py").write_text("IMPORTS = 0\n")
+    (tmp_path / "check_things.py").write_text(TASKS)
+    yield tmp_path
+    discover_task_classes.cache_clear()
+    for name in ("helper", "check_things"):
+        sys.modules.pop(name, None)
+
+
+def test_task_modules_imported_once(tasks_dir, addon_with_indeximage):
+    args = cli_args()
+    for task_type in (PreTask, Task, PostTask):
+        tasks = list(
+            load_tasks(
+                addons_factory=[addon_with_indeximage],
+                args=args,
+                tasks_path=tasks_dir,
+                task_type=task_type,
+                search=None,
+            )
+        )
+        assert len(tasks) == 1
+        assert isinstance(tasks[0], task_type)
+
+    assert sys.modules["helper"].IMPORTS == 1
+    assert str(tasks_dir) not in sys.path
+
+
+def test_discover_task_classes(tasks_dir):
+    classes = discover_task_classes(tasks_dir)
+    assert {
+        task_type: [obj.__name__ for _, obj in found]
+        for task_type, found in classes.items()
+    } == {
+        PreTask: ["CheckPre"],
+        Task: ["CheckAddon"],
+        PostTask: ["CheckPost"],
+    }
+
+
+def test_search_applied_before_instantiation(tasks_dir, addon_with_indeximage):
+    instances = []
+    task_cls = discover_task_classes(tasks_dir)[Task][0][1]
+    task_cls.__init__ = lambda self, **kwargs: instances.append(self)
+
+    tasks = load_tasks(
+        addons_factory=[addon_with_indeximage] * 3,
+        args=cli_args(),
+        tasks_path=tasks_dir,
+        task_type=Task,
+        search="NoSuchTask",
+    )
+    assert not list(tasks)
+    assert not instances
+
+
+def test_tasks_share_environment(tasks_dir, addon_with_indeximage):
+    tasks = list(
+        load_tasks(
+            addons_factory=[addon_with_indeximage] * 3,
+            args=cli_args(),
+            tasks_path=tasks_dir,
+            task_type=Task,
+            search="CheckAddon",
+        )
+    )
+    assert len(tasks) == 3
+    assert len({id(task.environment) for task in tasks}) == 1
@@ -0,0 +1,236 @@
+import base64
+import hashlib
+import json
+import re
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+BLOB = re.compile(r"^/v2/(?P<repo>.+)/blobs/(?P<digest>sha256:[0-9a-f]+)$")
+UPLOADS = re.compile(r"^/v2/(?P<repo>.+)/blobs/uploads/(?P<upload>[^/]*)$")
+MANIFEST = re.compile(r"^/v2/(?P<repo>.+)/manifests/(?P<reference>[^/]+)$")
+
+
+class FakeRegistry:
+    """
+    In-process stand-in for a registry v2 API, enough to push and inspect
+    images. Blobs and manifests are stored per repository, as a real
+    registry does.
+
+    :param credentials: (optional) (username, password). When set, the
+        registry uses token auth: /v2 requests need a bearer token obtained
+        from /token with these credentials. Changing `token` expires the
+        tokens handed out so far.
+    """
+
+    def __init__(self, credentials=None):
+        self.credentials = credentials
+        self.token = "fake-registry-token"
+        # {(repo, digest): bytes}
+        self.blobs = {}
+        # {(repo, tag or digest): (media type, bytes)}
+        self.manifests = {}
+        # [(method, path)] of every request received
+        self.requests = []
+        # {upload id: repo}
+        self._uploads = {}
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(
+            ("127.0.0.1", 0), _handler_class(self)
+        )
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def host(self):
+        return f"127.0.0.1:{self.server.server_port}"
+
+    def uploaded_blobs(self):
+        return [
+            path
+            for method, path in self.requests
+            if method == "PUT" and "/blobs/uploads/" in path
+        ]
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.server.serve_forever)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+        self._thread.join()
+
+
+def _handler_class(registry):
+    class Handler(_RegistryHandler):
+        pass
+
+    Handler.registry = registry
+    return Handler
+
+
+class _RegistryHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    registry = None
+
+    # pylint: disable=invalid-name
+    def do_HEAD(self):
+        self._dispatch(head=True)
+
+    def do_GET(self):
+        self._dispatch()
+
+    def do_POST(self):
+        self._dispatch()
+
+    def do_PUT(self):
+        self._dispatch()
+
+    def _dispatch(self, head=False):
+        url = urlparse(self.path)
+        with self.registry.lock:
+            self.registry.requests.append((self.command, url.path))
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        if url.path == "/token":
+            self._token()
+            return
+        if not self._authorized():
+            return
+
+        match = BLOB.match(url.path)
+        if match and self.command in ("HEAD", "GET"):
+            blob = self.registry.blobs.get((match["repo"], match["digest"]))
+            if blob is None:
+                self._reply(404)
+                return
+            self._reply(200, blob, head=head)
+            return
+
+        match = UPLOADS.match(url.path)
+        if match and self.command == "POST":
+            if self._mount(match["repo"], parse_qs(url.query)):
+                return
+            upload = uuid.uuid4().hex
+            self.registry._uploads[upload] = match["repo"]
+            self._reply(
+                202,
+                headers={
+                    "Location": f"/v2/{match['repo']}/blobs/uploads/{upload}"
+                },
+            )
+            return
+        if match and self.command == "PUT":
+            digest = parse_qs(url.query)["digest"][0]
+            if self.registry._uploads.pop(match["upload"], None) is None:
+                self._reply(404)
+                return
+            if f"sha256:{hashlib.sha256(body).hexdigest()}" != digest:
+                self._reply(400, b"digest mismatch")
+                return
+            self.registry.blobs[(match["repo"], digest)] = body
+            self._reply(201, headers={"Docker-Content-Digest": digest})
+            return
+
+        match = MANIFEST.match(url.path)
+        if match and self.command in ("HEAD", "GET"):
+            stored = self.registry.manifests.get(
+                (match["repo"], match["reference"])
+            )
+            if stored is None:
+                self._reply(404)
+                return
+            media_type, manifest = stored
+            accept = self.headers.get("Accept", "")
+            if media_type not in [t.strip() for t in accept.split(",")]:
+                # no conversion between manifest formats
+                self._reply(404)
+                return
+            self._reply(
+                200,
+                manifest,
+                headers={
+                    "Content-Type": media_type,
+                    "Docker-Content-Digest": _digest(manifest),
+                },
+                head=head,
+            )
+            return
+        if match and self.command == "PUT":
+            self._put_manifest(match["repo"], match["reference"], body)
+            return
+
+        self._reply(404)
+
+    def _mount(self, repo, query):
+        """Cross-repository mount, when the source repository has the blob."""
+        if "mount" not in query or "from" not in query:
+            return False
+        digest = query["mount"][0]
+        blob = self.registry.blobs.get((query["from"][0], digest))
+        if blob is None:
+            return False
+        self.registry.blobs[(repo, digest)] = blob
+        self._reply(
+            201,
+            headers={
+                "Location": f"/v2/{repo}/blobs/{digest}",
+                "Docker-Content-Digest": digest,
+            },
+        )
+        return True
+
+    def _put_manifest(self, repo, reference, body):
+        manifest = json.loads(body)
+        for descriptor in [manifest["config"], *manifest["layers"]]:
+            if (repo, descriptor["digest"]) not in self.registry.blobs:
+                self._reply(400, b"manifest blob unknown")
+                return
+        stored = (self.headers["Content-Type"], body)
+        self.registry.manifests[(repo, reference)] = stored
+        self.registry.manifests[(repo, _digest(body))] = stored
+        self._reply(201, headers={"Docker-Content-Digest": _digest(body)})
+
+    def _token(self):
+        expected = base64.b64encode(
+            ":".join(self.registry.credentials).encode()
+        ).decode()
+        if self.headers.get("Authorization") != f"Basic {expected}":
+            self._reply(401)
+            return
+        self._reply(200, json.dumps({"token": self.registry.token}).encode())
+
+    def _authorized(self):
+        if self.registry.credentials is None:
+            return True
+        if self.headers.get("Authorization") == f"Bearer {self.registry.token}":
+            return True
+        realm = f"http://{self.registry.host}/token"
+        self._reply(
+            401,
+            headers={
+                "WWW-Authenticate": (
+                    f'Bearer realm="{realm}",service="fake-registry"'
+                )
+            },
+        )
+        return False
+
+    def _reply(self, status, body=b"", headers=None, head=False):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+def _digest(content):
+    return f"sha256:{hashlib.sha256(content).hexdigest()}"
@@ -0,0 +1,57 @@
+import subprocess
+
+import pytest
+
+from managedtenants.utils import git
+from managedtenants.utils.git import BuildContext, GitError
+
+
+def _git(path, *args):
+    subprocess.run(["git", "-C", str(path), *args], check=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "config", "user.email", "test@example.com")
+    _git(tmp_path, "config", "user.name", "test")
+    (tmp_path / "file").write_text("a")
+    _git(tmp_path, "add", "file")
+    _git(tmp_path, "commit", "-q", "-m", "init")
+    return tmp_path
+
+
+def test_build_context(repo):
+    ctx = BuildContext(path=repo, size=9)
+
+    assert len(ctx.short_hash) == 9
+    assert ctx.commit_hash.startswith(ctx.short_hash)
+    assert not ctx.dirty
+    assert ctx.short_hash in str(ctx)
+
+
+def test_build_context_dirty(repo):
+    (repo / "file").write_text("b")
+
+    assert BuildContext(path=repo).dirty
+
+
+def test_build_context_is_lazy_and_memoized(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        git, "_git", lambda path, *args: calls.append(args) or "abc1234\n"
+    )
+
+    ctx = BuildContext(path=tmp_path)
+    assert not calls
+
+    for _ in range(3):
+        assert ctx.short_hash == "abc1234"
+    assert len(calls) == 1
+
+
+def test_build_context_outside_git_repo(tmp_path):
+    ctx = BuildContext(path=tmp_path)
+
+    with pytest.raises(GitError):
+        _ = ctx.short_hash
@@ -0,0 +1,24 @@
+from managedtenants.utils.cache import ResultCache, cache_dir
+
+
+def test_result_cache(tmp_path):
+    cache = ResultCache(tmp_path / "cache")
+    assert "abc" not in cache
+    cache.add("abc")
+    assert "abc" in ResultCache(tmp_path / "cache")
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert "abc" in cache
+    assert str(cache) == "1 hits, 1 misses"
+
+    disabled = ResultCache(tmp_path / "cache", enabled=False)
+    assert "abc" not in disabled
+    disabled.add("def")
+    assert not (tmp_path / "cache" / "def").exists()
+
+
+def test_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv("MANAGEDTENANTS_CACHE_DIR", raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert cache_dir() == tmp_path / "managedtenants"
+    monkeypatch.setenv("MANAGEDTENANTS_CACHE_DIR", str(tmp_path / "ci"))
+    assert cache_dir() == tmp_path / "ci"
@@ -0,0 +1,104 @@
+import io
+import subprocess
+import tarfile
+
+import pytest
+
+from managedtenants.utils import git
+from managedtenants.utils.git import (
+    GitError,
+    export_entries,
+    get_changed_entries,
+    list_entries,
+)
+
+
+def _git(path, *args):
+    subprocess.run(["git", "-C", str(path), *args], check=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """A repository with addons/a and addons/b committed."""
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "config", "user.email", "test@example.com")
+    _git(tmp_path, "config", "user.name", "test")
+    for name in ("a", "b"):
+        (tmp_path / "addons" / name).mkdir(parents=True)
+        (tmp_path / "addons" / name / "addon.yaml").write_text(name)
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "init")
+    return tmp_path
+
+
+def test_get_changed_entries(repo):
+    addons = repo / "addons"
+    assert get_changed_entries(addons, "HEAD") == set()
+
+    (addons / "a" / "addon.yaml").write_text("changed")
+    # new addon, not added to the index yet
+    (addons / "new addon").mkdir()
+    (addons / "new addon" / "addon.yaml").write_text("new")
+    # ignored files are not changes
+    (repo / ".gitignore").write_text("*.swp\n")
+    (addons / "b" / ".addon.yaml.swp").write_text("")
+
+    assert get_changed_entries(addons, "HEAD") == {"a", "new addon"}
+
+
+def test_get_changed_entries_ignores_git_warnings(repo, monkeypatch):
+    # warnings on stderr, e.g. about the line endings, are not entries
+    monkeypatch.setenv("GIT_TRACE", "1")
+    (repo / "addons" / "a" / "addon.yaml").write_text("changed")
+
+    assert get_changed_entries(repo / "addons", "HEAD") == {"a"}
+
+
+def test_get_changed_entries_bad_ref(repo):
+    with pytest.raises(GitError, match="unknown-ref"):
+        get_changed_entries(repo / "addons", "unknown-ref")
+
+
+def test_export_entries(repo, tmp_path_factory):
+    addons = repo / "addons"
+    (addons / "a" / "addon.yaml").write_text("changed")
+    dest = tmp_path_factory.mktemp("dest")
+
+    assert list_entries(addons, "HEAD") == {"a", "b"}
+    export_entries(addons, "HEAD", ["a"], dest)
+    assert (dest / "a" / "addon.yaml").read_text() == "a"
+    assert not (dest / "b").exists()
+
+    with pytest.raises(GitError):
+        export_entries(addons, "HEAD", ["missing"], dest)
+
+
+def _symlink(name, target):
+    member = tarfile.TarInfo(name)
+    member.type = tarfile.SYMTYPE
+    member.linkname = target
+    return member
+
+
+@pytest.mark.parametrize(
+    "member",
+    [tarfile.TarInfo("../escaped"), _symlink("a/link", "../../escaped")],
+)
+def test_extract_unsafe_member(member, tmp_path):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tar:
+        tar.addfile(member, io.BytesIO(b""))
+    buf.seek(0)
+
+    with tarfile.open(fileobj=buf, mode="r|") as tar:
+        with pytest.raises(GitError):
+            git._extract(tar, tmp_path / "dest")
+    assert not (tmp_path / "escaped").exists()
+
+
+def test_is_safe():
+    assert not git._is_safe(tarfile.TarInfo("../a/addon.yaml"))
+    assert not git._is_safe(tarfile.TarInfo("/a/addon.yaml"))
+    assert not git._is_safe(_symlink("a/link", "../../etc/passwd"))
+    assert git._is_safe(_symlink("a/link", "addon.yaml"))
+    assert git._is_safe(tarfile.TarInfo("a/addon.yaml"))
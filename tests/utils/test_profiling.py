@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+from managedtenants.utils import profiling
+from managedtenants.utils.profiling import PhaseProfile, phase, set_sink
+
+
+@pytest.fixture
+def profile():
+    sink = PhaseProfile()
+    set_sink(sink)
+    yield sink
+    set_sink(None)
+
+
+def test_phase_disabled():
+    assert profiling.get_sink() is None
+    with phase("foo") as ctx:
+        assert ctx is None
+
+
+def test_phase_nesting(profile):
+    with phase("addon:foo"):
+        with phase("load_metadata"):
+            with phase("yaml"):
+                time.sleep(0.01)
+            with phase("yaml"):
+                pass
+        with phase("sss"):
+            pass
+
+    assert set(profile.collapsed) == {
+        ("addon:foo",),
+        ("addon:foo", "load_metadata"),
+        ("addon:foo", "load_metadata", "yaml"),
+        ("addon:foo", "sss"),
+    }
+    breakdown = profile.breakdown()["foo"]
+    assert breakdown["load_metadata/yaml"]["calls"] == 2
+    assert breakdown["load_metadata/yaml"]["duration"] >= 0.01
+    # self time excludes the time spent in the nested phases
+    assert profile.collapsed[("addon:foo", "load_metadata")] < 0.01
+    assert breakdown["total"]["duration"] >= 0.01
+
+
+def test_write_collapsed(profile, tmp_path):
+    with phase("addon:foo"):
+        with phase("sss"):
+            pass
+
+    path = tmp_path / "profile.collapsed"
+    profile.write_collapsed(path)
+
+    lines = path.read_text().splitlines()
+    assert [line.rsplit(" ", 1)[0] for line in lines] == [
+        "addon:foo",
+        "addon:foo;sss",
+    ]
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
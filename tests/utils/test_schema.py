@@ -8,6 +8,7 @@ from managedtenants.utils.schema import (
     SchemaLoader,
     load_draft7_schema,
     load_schema,
+    pooled_validator,
 )
 
 invalid_type_value = """
@@ -43,3 +44,15 @@ def test_load_draft7_schema(case):
 )
 def test_schemas_are_singletons(schema_name):
     assert id(load_schema(schema_name)) == id(load_schema(schema_name))
+
+
+def test_pooled_validator():
+    with pooled_validator("imageset") as first:
+        # in use, another one is built
+        with pooled_validator("imageset") as second:
+            assert second is not first
+        assert not first.is_valid({})
+
+    # reused from the pool
+    with pooled_validator("imageset") as validator:
+        assert validator in (first, second)
@@ -0,0 +1,105 @@
+import http.client
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+import requests
+
+from managedtenants.core.validation_server import make_server, validate_payload
+
+METADATA = Path("tests/testdata/addons/test-operator/metadata/stage/addon.yaml")
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    server = make_server(port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    yield f"http://{host}:{port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_healthz(server_url):
+    resp = requests.get(f"{server_url}/healthz")
+    assert resp.status_code == 200
+    assert resp.json() == {"status": "ok"}
+
+
+def test_validate_valid_metadata(server_url):
+    resp = requests.post(
+        f"{server_url}/validate/metadata", data=METADATA.read_bytes()
+    )
+    assert resp.status_code == 200
+    assert resp.json() == {"valid": True, "errors": []}
+
+
+def test_validate_invalid_imageset(server_url):
+    resp = requests.post(
+        f"{server_url}/validate/imageset",
+        json={"name": "INVALID", "relatedImages": [{"foo": "bar"}]},
+    )
+    assert resp.status_code == 200
+
+    content = resp.json()
+    assert not content["valid"]
+    # all the errors are reported, not only the first one
+    assert {(e["path"], e["validator"]) for e in content["errors"]} >= {
+        (".", "required"),
+        (".name", "pattern"),
+        (".relatedImages[0]", "type"),
+    }
+
+
+@pytest.mark.parametrize(
+    "path,data,status",
+    [
+        ("/validate/metadata", b"a: [", 400),
+        ("/validate/unknown", b"{}", 404),
+        ("/unknown", b"{}", 404),
+    ],
+)
+def test_validate_bad_requests(server_url, path, data, status):
+    resp = requests.post(f"{server_url}{path}", data=data)
+    assert resp.status_code == status
+    assert "error" in resp.json()
+
+
+@pytest.mark.parametrize("length", ["abc", "-1"])
+def test_validate_invalid_content_length(server_url, length):
+    conn = http.client.HTTPConnection(server_url.split("//", 1)[1])
+    conn.putrequest("POST", "/validate/metadata")
+    conn.putheader("Content-Length", length)
+    conn.endheaders()
+    resp = conn.getresponse()
+    assert resp.status == 400
+    assert resp.getheader("Connection") == "close"
+    conn.close()
+
+    # the server is still serving
+    assert requests.get(f"{server_url}/healthz").status_code == 200
+
+
+def test_concurrent_requests(server_url):
+    payload = METADATA.read_bytes()
+
+    def validate(_):
+        with requests.Session() as session:
+            return [
+                session.post(
+                    f"{server_url}/validate/metadata", data=payload
+                ).json()["valid"]
+                for _ in range(5)
+            ]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(validate, range(8)))
+
+    assert results == [[True] * 5] * 8
+
+
+def test_validate_payload_matches_schema_names():
+    with pytest.raises(ValueError):
+        validate_payload("unknown", {})
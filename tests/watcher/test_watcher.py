@@ -0,0 +1,52 @@
+import logging
+import shutil
+from pathlib import Path
+
+import pytest
+
+from managedtenants.core.watcher import AddonsWatcher
+
+TEST_OPERATOR = Path("tests/testdata/addons/test-operator")
+
+
+@pytest.fixture
+def watcher(tmp_path):
+    for name in ["addon-one", "addon-two"]:
+        shutil.copytree(TEST_OPERATOR, tmp_path / name)
+    res = AddonsWatcher(
+        addons_dir=tmp_path,
+        environment="stage",
+        log=logging.getLogger("test-watcher"),
+    )
+    res.load_all()
+    return res
+
+
+def test_load_all(watcher):
+    assert set(watcher.addons) == {"addon-one", "addon-two"}
+    assert not watcher.errors
+    assert watcher.poll() == set()
+
+
+def test_reload_changed_addon(watcher):
+    untouched = watcher.addons["addon-two"]
+    metadata = watcher.addons_dir / "addon-one/metadata/stage/addon.yaml"
+    metadata.write_text(metadata.read_text() + "\nfoo: [\n")
+
+    watcher.watch(interval=0, iterations=1)
+
+    assert "addon-one" in watcher.errors
+    assert "addon-one" not in watcher.addons
+    # only the changed addon is reloaded
+    assert watcher.addons["addon-two"] is untouched
+
+
+def test_added_and_removed_addons(watcher):
+    shutil.rmtree(watcher.addons_dir / "addon-one")
+    shutil.copytree(TEST_OPERATOR, watcher.addons_dir / "addon-three")
+
+    assert watcher.poll() == {"addon-one", "addon-three"}
+
+    for name in ["addon-one", "addon-three"]:
+        watcher.reload(name)
+    assert set(watcher.addons) == {"addon-two", "addon-three"}